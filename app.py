@@ -2,15 +2,50 @@ from __future__ import annotations
 
 import io
 import json
-from typing import Dict, List
+import tempfile
+import time
+from typing import Dict, Iterator, List
 
 import pandas as pd
-from flask import Flask, jsonify, render_template, request, send_file
+from flask import Flask, Request, Response, jsonify, render_template, request, send_file, stream_with_context
+
+from documents import Document
+from extraction_cache import ExtractionCache
+from extractor import ExtractionPipelineError, ExtractionResult, LangExtractAdapter
+from gazetteer import GazetteerExtractor, LearnedGazetteer
+from jobs import Job, JobRunner, JobStore
+from local_model import LocalModelExtractor
+from settings import env_float, env_int
+
+UPLOAD_SPOOL_BYTES = env_int("EXTRACT_UPLOAD_SPOOL_BYTES", 8 * 1024 * 1024)
+MAX_CONTENT_LENGTH = env_int("EXTRACT_MAX_CONTENT_LENGTH", 1024 * 1024 * 1024)
+
+
+class SpoolingRequest(Request):
+    """Keeps each uploaded file in memory up to ``UPLOAD_SPOOL_BYTES``, then spools it to disk."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode="w+b")
 
-from extractor import ExtractionPipelineError, LangExtractAdapter
 
 app = Flask(__name__)
-extractor = LangExtractAdapter()
+app.request_class = SpoolingRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH or None
+gazetteer = GazetteerExtractor.from_env()
+extractor = LangExtractAdapter(
+    cache=ExtractionCache.from_env(),
+    gazetteer=gazetteer,
+    learned=LearnedGazetteer.from_env(),
+    local_model=LocalModelExtractor.from_env(),
+)
+jobs = JobStore(max_document_bytes=env_int("EXTRACT_JOB_MAX_DOCUMENT_BYTES", 512 * 1024 * 1024))
+runner = JobRunner(max_workers=env_int("EXTRACT_JOB_WORKERS", 2))
+SSE_KEEPALIVE_SECONDS = env_float("EXTRACT_SSE_KEEPALIVE_SECONDS", 15.0)
+
+
+@app.errorhandler(413)
+def upload_too_large(_error):
+    return jsonify({"error": f"Upload exceeds the {MAX_CONTENT_LENGTH} byte limit."}), 413
 
 
 @app.route("/")
@@ -20,48 +55,253 @@ def index():
 
 @app.route("/api/extract", methods=["POST"])
 def extract():
+    if request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"]) == "application/x-ndjson":
+        return _extract_ndjson()
+
+    job, work, error = _prepare_job()
+    if error is not None:
+        return error
+
+    try:
+        result = runner.run(job, work)
+    except ExtractionPipelineError as err:
+        return jsonify({"error": str(err)}), 400
+    except Exception as err:  # noqa: BLE001
+        return jsonify({"error": f"Unexpected extraction failure: {err}"}), 500
+
+    return jsonify(
+        {
+            "runId": job.job_id,
+            "fields": ["document", *job.fields],
+            "records": result.records,
+            "logs": result.logs,
+            "engine": result.engine,
+            "timings": result.timings,
+            "status": "completed",
+        }
+    )
+
+
+@app.route("/api/jobs", methods=["POST"])
+def create_job():
+    job, work, error = _prepare_job()
+    if error is not None:
+        return error
+
+    runner.submit(job, work)
+    return jsonify({"jobId": job.job_id, "status": job.status, "total": len(job.documents)}), 202
+
+
+@app.route("/api/jobs/<job_id>")
+def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job ID."}), 404
+    return jsonify(job.snapshot())
+
+
+@app.route("/api/jobs/<job_id>/events")
+def job_events(job_id: str):
+    """Server-Sent Events feed of a job's lifecycle; resumes after ``Last-Event-ID``."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job ID."}), 404
+
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("lastEventId", "")).strip()
+    cursor = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+
+    def stream() -> Iterator[str]:
+        nonlocal cursor
+        yield "retry: 2000\n\n"
+        while True:
+            events, done = job.wait_events(cursor, timeout=SSE_KEEPALIVE_SECONDS)
+            for event in events:
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            cursor += len(events)
+            if done and not events:
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _extract_ndjson():
+    """Stream one JSON line per document as it finishes, then a summary line.
+
+    Streamed runs are not registered as jobs, so they cannot be extended with ``priorRunId``.
+    """
+    if request.form.get("priorRunId", "").strip():
+        return jsonify({"error": "priorRunId is not supported for streamed (NDJSON) runs."}), 400
+    fields, documents, sizing, error = _parse_extraction_form()
+    if error is not None:
+        return error
+    api_key_override = request.form.get("apiKey", "").strip()
+
+    def stream() -> Iterator[str]:
+        started = time.perf_counter()
+        index = -1
+        try:
+            for index, (record, logs) in enumerate(
+                extractor.extract_iter(documents, fields, api_key_override, sizing=sizing)
+            ):
+                yield json.dumps({"type": "record", "index": index, "record": record, "logs": logs}) + "\n"
+        except Exception as err:  # noqa: BLE001
+            yield json.dumps({"type": "error", "error": str(err)}) + "\n"
+            return
+        finally:
+            for document in documents:
+                document.close()
+        yield json.dumps(
+            {
+                "type": "summary",
+                "fields": ["document", *fields],
+                "documents": index + 1,
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+        ) + "\n"
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _parse_fields():
     raw_fields = request.form.get("fields", "[]")
     try:
         parsed_fields = json.loads(raw_fields)
     except json.JSONDecodeError:
-        return jsonify({"error": "Invalid fields format. Send a JSON array."}), 400
+        return None, (jsonify({"error": "Invalid fields format. Send a JSON array."}), 400)
 
     fields: List[str] = []
     for field in parsed_fields if isinstance(parsed_fields, list) else []:
         cleaned = str(field).strip()
         if cleaned and cleaned not in fields:
             fields.append(cleaned)
+    return fields, None
 
-    api_key_override = request.form.get("apiKey", "").strip()
 
-    uploaded_files = request.files.getlist("documents")
-    documents: List[Dict[str, str]] = []
+def _parse_extraction_form():
+    """Parse fields, uploaded documents and sizing overrides for a fresh run."""
+    fields, error = _parse_fields()
+    if error is not None:
+        return None, None, None, error
 
-    for file in uploaded_files:
-        text = file.read().decode("utf-8", errors="ignore")
-        documents.append({"name": file.filename or "unnamed.txt", "text": text})
+    documents = [Document.from_upload(file) for file in request.files.getlist("documents")]
 
     if not fields:
-        return jsonify({"error": "Please provide at least one valid field."}), 400
+        return None, None, None, (jsonify({"error": "Please provide at least one valid field."}), 400)
     if not documents:
-        return jsonify({"error": "Please upload at least one document."}), 400
+        return None, None, None, (jsonify({"error": "Please upload at least one document."}), 400)
+
+    sizing: Dict[str, int] = {}
+    sizing_options = (
+        ("maxCharBuffer", "max_char_buffer"),
+        ("maxWorkers", "max_workers"),
+        ("batchLength", "batch_length"),
+    )
+    for form_key, option in sizing_options:
+        raw_value = request.form.get(form_key, "").strip()
+        if raw_value:
+            if not raw_value.isdigit() or int(raw_value) < 1:
+                return None, None, None, (jsonify({"error": f"{form_key} must be a positive integer."}), 400)
+            sizing[option] = int(raw_value)
+
+    return fields, documents, sizing, None
+
+
+def _prepare_job():
+    """Parse an extraction form into a registered job and the work that fills it."""
+    api_key_override = request.form.get("apiKey", "").strip()
+    prior_run_id = request.form.get("priorRunId", "").strip()
+
+    if prior_run_id:
+        fields, error = _parse_fields()
+        if error is not None:
+            return None, None, error
+        return _prepare_added_fields_job(prior_run_id, fields, api_key_override)
+
+    fields, documents, sizing, error = _parse_extraction_form()
+    if error is not None:
+        return None, None, error
+
+    def work(job: Job) -> ExtractionResult:
+        return extractor.extract(
+            documents=documents,
+            fields=fields,
+            api_key_override=api_key_override,
+            on_document=job.record_document,
+            on_document_start=job.record_document_start,
+            sizing=sizing,
+        )
+
+    return jobs.create(documents, fields), work, None
+
+
+def _prepare_added_fields_job(prior_run_id: str, added_fields: List[str], api_key_override: str):
+    prior = jobs.get(prior_run_id)
+    if prior is None:
+        return None, None, (jsonify({"error": "Unknown or expired priorRunId. Upload the documents again."}), 404)
+    if prior.status != "completed":
+        return None, None, (jsonify({"error": "The prior run has not completed yet."}), 409)
+
+    new_fields = [field for field in added_fields if field not in prior.fields]
+
+    def work(job: Job) -> ExtractionResult:
+        if not new_fields:
+            return ExtractionResult(
+                records=prior.records,
+                logs=["No new fields requested; returning the prior run unchanged."],
+                engine=prior.engine,
+            )
+        return extractor.extract_added_fields(
+            documents=prior.documents,
+            records=prior.records,
+            new_fields=new_fields,
+            api_key_override=api_key_override,
+            on_document=job.record_document,
+            on_document_start=job.record_document_start,
+        )
 
+    return jobs.create(prior.documents, [*prior.fields, *new_fields]), work, None
+
+
+@app.route("/api/gazetteers")
+def list_gazetteers():
+    return jsonify({"fields": gazetteer.fields()})
+
+
+@app.route("/api/gazetteers", methods=["POST"])
+def upload_gazetteer():
+    """Add a term list (one term per line) for ``field``; that field then skips the model."""
+    field = request.form.get("field", "").strip()
+    terms_file = request.files.get("terms")
+    if not field:
+        return jsonify({"error": "Please provide the field the terms belong to."}), 400
+    if terms_file is None:
+        return jsonify({"error": "Please upload a term list file."}), 400
+
+    document = Document.from_upload(terms_file)
     try:
-        result = extractor.extract(documents=documents, fields=fields, api_key_override=api_key_override)
-    except ExtractionPipelineError as err:
-        return jsonify({"error": str(err)}), 400
-    except Exception as err:  # noqa: BLE001
-        return jsonify({"error": f"Unexpected extraction failure: {err}"}), 500
+        count = gazetteer.add_terms(field, document["text"].splitlines())
+    finally:
+        document.close()
+    try:
+        gazetteer.save_terms(field)
+    except OSError as err:
+        return jsonify({"field": field, "terms": count, "warning": f"Term list not persisted: {err}"})
+    return jsonify({"field": field, "terms": count})
 
-    return jsonify(
-        {
-            "fields": ["document", *fields],
-            "records": result.records,
-            "logs": result.logs,
-            "engine": result.engine,
-            "status": "completed",
-        }
-    )
+
+@app.route("/api/metrics")
+def metrics():
+    return jsonify(extractor.metrics())
 
 
 @app.route("/api/export/csv", methods=["POST"])
@@ -0,0 +1,89 @@
+"""Throughput of the regex fallback from one process up to N cores.
+
+Generates synthetic documents, runs ``RegexFallbackExtractor`` in-process
+(1) and on its shared process pool with 2, 4, ... up to ``--max-processes``
+workers (default: every CPU), checks every run returns the same records and
+prints documents per second and speed-up over the single process::
+
+    python benchmarks/fallback_scaling.py --documents 800 --words 20000
+
+Speed-up is bounded by the number of physical cores; on a single-core
+machine every pooled run is expected to be slower than in-process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor import RegexFallbackExtractor  # noqa: E402
+
+FILLER = ["lorem", "ipsum", "dolor", "sit", "amet", "on", "the", "and", "per", "terms"]
+ENTITIES = [
+    "Alice Smith", "Acme Corp", "March 3, 2024", "$1,200.00", "billing@acme.com", "+1 415 555 0100", "12.5%",
+]
+FIELDS = ["Person", "Company", "Email", "Invoice Date", "Total Amount", "Phone", "Growth Rate"]
+
+
+def make_documents(count: int, words: int, seed: int) -> List[Dict[str, str]]:
+    """Filler text with the entities at the end, so every scan runs over the whole document (the worst case)."""
+    rng = random.Random(seed)
+    documents = []
+    for index in range(count):
+        body = " ".join(rng.choice(FILLER) for _ in range(words))
+        tail = " ".join(rng.sample(ENTITIES, len(ENTITIES)))
+        documents.append({"name": f"doc-{index}.txt", "text": f"{body}. {tail}"})
+    return documents
+
+
+def process_counts(maximum: int) -> List[int]:
+    counts = [1]
+    while counts[-1] * 2 <= maximum:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != maximum:
+        counts.append(maximum)
+    return counts
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=400)
+    parser.add_argument("--words", type=int, default=20000, help="words per document")
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=16, help="documents per pool task")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    documents = make_documents(args.documents, args.words, args.seed)
+    megabytes = sum(len(doc["text"]) for doc in documents) / 1e6
+    print(f"{len(documents)} documents, {megabytes:.1f} MB, {os.cpu_count()} CPU(s)")
+    print(f"{'processes':>9} {'seconds':>8} {'docs/s':>8} {'MB/s':>7} {'speed-up':>8}")
+
+    expected = None
+    baseline = None
+    for processes in process_counts(max(1, args.max_processes)):
+        extractor = RegexFallbackExtractor(processes=0 if processes == 1 else processes, chunk_size=args.chunk_size)
+        extractor.extract(documents[: args.chunk_size * 2], FIELDS)  # start the pool's workers
+        started = time.perf_counter()
+        records = extractor.extract(documents, FIELDS).records
+        elapsed = time.perf_counter() - started
+        if expected is None:
+            expected, baseline = records, elapsed
+        elif records != expected:
+            print(f"records differ with {processes} processes", file=sys.stderr)
+            return 1
+        print(
+            f"{processes:>9} {elapsed:>8.2f} {len(documents) / elapsed:>8.1f} "
+            f"{megabytes / elapsed:>7.1f} {baseline / elapsed:>7.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+"""Tail latency of model calls with and without request hedging.
+
+Simulates a model whose calls usually take ``--base-ms`` but sometimes
+(``--tail-rate``) stall for ``--tail-ms``, behind a governor that admits
+``--concurrency`` calls at a time, and reports p50/p95/p99 of end-to-end
+call latency plus the hedge rate::
+
+    python benchmarks/hedging_p99.py --calls 2000 --percentile 95
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import GeminiGovernor  # noqa: E402
+from resilience import Hedger  # noqa: E402
+
+
+def percentile(ordered: List[float], value: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(value / 100.0 * len(ordered))) - 1)]
+
+
+def simulate(args: argparse.Namespace, hedge_percentile: float | None) -> Dict[str, float]:
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    governor = GeminiGovernor(requests_per_minute=0, tokens_per_minute=0, max_concurrency=args.concurrency)
+    hedger = Hedger(percentile=hedge_percentile, budget=args.budget)
+    latencies: List[float] = []
+    next_call = iter(range(args.calls))
+    lock = threading.Lock()
+
+    def model_call(granted: int) -> None:
+        with rng_lock:
+            stalled = rng.random() < args.tail_rate
+        time.sleep((args.tail_ms if stalled else args.base_ms * rng.uniform(0.8, 1.2)) / 1000.0)
+
+    def client() -> None:
+        while True:
+            with lock:
+                if next(next_call, None) is None:
+                    return
+            started = time.perf_counter()
+            hedger.run(model_call, admit=lambda: governor.slot("bench"))
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    stats = hedger.stats()
+    return {
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "hedge_rate": stats["hedges"] / max(1, stats["calls"]),
+        "hedge_wins": stats["hedge_wins"],
+        "throughput": len(latencies) / elapsed,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=16, help="governor concurrency limit")
+    parser.add_argument("--base-ms", type=float, default=20.0)
+    parser.add_argument("--tail-ms", type=float, default=400.0)
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--percentile", type=float, default=95.0, help="hedge after this latency percentile")
+    parser.add_argument("--budget", type=float, default=0.05, help="max hedges per primary call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hedges':>8} {'wins':>6} {'calls/s':>8}")
+    for mode, hedge_percentile in (("baseline", None), (f"hedge p{args.percentile:g}", args.percentile)):
+        result = simulate(args, hedge_percentile)
+        print(
+            f"{mode:<10} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+            f"{result['hedge_rate']:>8.1%} {result['hedge_wins']:>6} {result['throughput']:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+"""Lazy document handles backed by in-memory text or spooled upload streams."""
+
+from __future__ import annotations
+
+import codecs
+from contextlib import contextmanager
+import io
+import mmap
+import threading
+from typing import IO, TYPE_CHECKING, Iterator, Mapping, Union
+
+if TYPE_CHECKING:
+    from werkzeug.datastructures import FileStorage
+
+
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
+
+class Document(Mapping[str, str]):
+    """Read-only ``{"name", "text"}`` mapping over either a ``str`` or a byte stream.
+
+    For stream-backed documents the raw bytes stay in the (possibly
+    disk-spooled) stream they were uploaded into; ``doc["text"]`` decodes them
+    in one pass over :meth:`buffer` (``iter_text`` in ``chunk_bytes`` pieces)
+    and is not cached, so holding many handles costs no decoded copies.
+    :meth:`buffer` exposes the raw bytes without decoding at all,
+    memory-mapped when the stream lives on disk.
+    """
+
+    KEYS = ("name", "text")
+
+    def __init__(
+        self,
+        name: str,
+        stream: IO[bytes] | None = None,
+        text: str | None = None,
+        chunk_bytes: int = 1 << 20,
+    ) -> None:
+        if (stream is None) == (text is None):
+            raise ValueError("A document needs exactly one of stream or text.")
+        self.name = name
+        self.chunk_bytes = max(1024, chunk_bytes)
+        self._stream = stream
+        self._text = text
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_upload(cls, file: FileStorage, chunk_bytes: int = 1 << 20) -> "Document":
+        """Take over ``file``'s stream so it outlives the request that uploaded it."""
+        stream, file.stream = file.stream, io.BytesIO()
+        return cls(file.filename or "unnamed.txt", stream=stream, chunk_bytes=chunk_bytes)
+
+    @classmethod
+    def from_text(cls, name: str, text: str) -> "Document":
+        return cls(name, text=text)
+
+    def __getitem__(self, key: str) -> str:
+        if key == "name":
+            return self.name
+        if key == "text":
+            if self._text is not None:
+                return self._text
+            # One decode straight from the buffer: joining ``iter_text`` chunks peaks at twice the text size.
+            with self.buffer() as view:
+                return codecs.decode(view, "utf-8", "ignore")
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __reduce__(self):
+        """Pickle as an in-memory copy of the raw bytes (used to ship documents to worker processes)."""
+        if self._stream is None:
+            return (Document, (self.name, None, self._text, self.chunk_bytes))
+        with self.buffer() as buffer:
+            raw = bytes(buffer)
+        return (Document, (self.name, io.BytesIO(raw), None, self.chunk_bytes))
+
+    def __repr__(self) -> str:
+        return f"Document(name={self.name!r}, size={self.size})"
+
+    @property
+    def stream_backed(self) -> bool:
+        return self._stream is not None
+
+    @property
+    def size(self) -> int:
+        """Size of the raw document in bytes (characters for text documents)."""
+        if self._stream is None:
+            return len(self._text or "")
+        with self._lock:
+            return self._stream.seek(0, io.SEEK_END)
+
+    def iter_text(self) -> Iterator[str]:
+        """Decode the document as UTF-8 (ignoring invalid bytes) one chunk at a time."""
+        if self._stream is None:
+            yield self._text or ""
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        position = 0
+        while True:
+            with self._lock:
+                self._stream.seek(position)
+                chunk = self._stream.read(self.chunk_bytes)
+            if not chunk:
+                break
+            position += len(chunk)
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    @contextmanager
+    def buffer(self) -> Iterator[Buffer]:
+        """Zero-copy view of the raw UTF-8 bytes: an ``mmap`` for on-disk streams.
+
+        Text documents are encoded once for the duration of the block.
+        """
+        if self._stream is None:
+            yield (self._text or "").encode("utf-8")
+            return
+        # SpooledTemporaryFile keeps its data in ``_file``: a BytesIO until it rolls over to disk.
+        raw = getattr(self._stream, "_file", self._stream)
+        if isinstance(raw, io.BytesIO):
+            with raw.getbuffer() as view:
+                yield view
+            return
+        if self.size == 0:
+            yield b""
+            return
+        with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
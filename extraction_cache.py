@@ -0,0 +1,188 @@
+"""Content-addressed cache for per-document extraction results."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator
+
+from documents import Buffer
+from settings import env_flag, env_float, env_int, env_path
+
+
+class ExtractionCache:
+    """Two-tier cache: an in-memory LRU in front of an optional SQLite file.
+
+    Entries expire after ``ttl_seconds``. The memory tier is bounded by entry
+    count and the disk tier by total payload bytes; both evict least recently
+    used entries first. With ``store_text`` callers also keep the document
+    text in each entry, which makes the cache usable as training data.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_memory_entries: int = 1024,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        store_text: bool = False,
+    ) -> None:
+        self.path = path
+        self.store_text = store_text
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.max_disk_bytes = max(0, max_disk_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple[float, Dict[str, object]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db: sqlite3.Connection | None = None
+
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "ExtractionCache":
+        return cls(
+            path=env_path("EXTRACT_CACHE_PATH", os.path.join(".cache", "extractions.sqlite3")),
+            max_memory_entries=env_int("EXTRACT_CACHE_MAX_MEMORY_ENTRIES", 1024),
+            max_disk_bytes=env_int("EXTRACT_CACHE_MAX_DISK_BYTES", 256 * 1024 * 1024),
+            ttl_seconds=env_float("EXTRACT_CACHE_TTL_SECONDS", 7 * 24 * 3600),
+            store_text=env_flag("EXTRACT_CACHE_STORE_TEXT", False),
+        )
+
+    @staticmethod
+    def make_key(content: str | Buffer, model_id: str, prompt: str, params: Dict[str, object]) -> str:
+        """Key a document's raw extractions; the field list is stored in the entry, not the key.
+
+        ``content`` is the document text or, to avoid an encoded copy, its raw
+        UTF-8 buffer (see :meth:`documents.Document.buffer`).
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8", errors="ignore")
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(content).digest())
+        digest.update(
+            json.dumps(
+                {"model": model_id, "prompt": prompt, "params": params},
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Dict[str, object] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if now - row[1] <= self.ttl_seconds:
+                        self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        value = json.loads(row[0])
+                        self._remember(key, row[1], value)
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, object]) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self._stats["stores"] += 1
+            if self._db is None:
+                return
+
+            payload = json.dumps(value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,))
+            self._evict_disk()
+            self._db.commit()
+
+    def iter_values(self) -> Iterator[Dict[str, object]]:
+        """Every unexpired entry (disk tier when configured, else memory) without touching LRU order."""
+        cutoff = time.time() - self.ttl_seconds
+        if self._db is None:
+            with self._lock:
+                values = [value for created, value in self._memory.values() if created >= cutoff]
+            yield from values
+            return
+
+        with self._lock:
+            keys = [key for (key,) in self._db.execute("SELECT key FROM entries WHERE created >= ?", (cutoff,))]
+        for key in keys:
+            with self._lock:
+                row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                yield json.loads(row[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = dict(self._stats)
+            lookups = self._stats["hits"] + self._stats["misses"]
+            stats["hit_rate"] = round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+            return stats
+
+    def _remember(self, key: str, created: float, value: Dict[str, object]) -> None:
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self) -> None:
+        assert self._db is not None
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_disk_bytes:
+            return
+
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall():
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._stats["evictions"] += 1
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
@@ -2,10 +2,35 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import bisect
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field as dataclass_field, replace
+import functools
+import itertools
+import math
+import multiprocessing
 import os
-import re
-from typing import Dict, Iterable, List
+import queue
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Callable, ContextManager, Deque, Dict, Iterable, Iterator, List, Set, Tuple
+
+from documents import Document
+from extraction_cache import ExtractionCache
+from recognizers import DEFAULT_RECOGNIZER, Recognizer, recognizer_for, registry, scanner_for, use_registry
+from rate_limit import GeminiGovernor, is_rate_limit_error, shared_governor
+from resilience import CircuitOpenError, Hedger, RetryPolicy, circuit_breaker, is_client_error, is_transient_error
+from relevance import Passages, RelevanceFilter
+from routing import ConfidenceRouter, RouteDecision, route_summary
+from settings import env_int
+
+if TYPE_CHECKING:
+    from gazetteer import GazetteerExtractor, LearnedGazetteer
+    from local_model import LocalModelExtractor
 
 
 @dataclass
@@ -13,6 +38,65 @@ class ExtractionResult:
     records: List[Dict[str, str]]
     logs: List[str]
     engine: str
+    timings: List[Dict[str, object]] = dataclass_field(default_factory=list)
+
+
+@dataclass
+class DocumentOutcome:
+    row: Dict[str, str]
+    logs: List[str]
+    seconds: float = 0.0
+    cache: str = ""
+    fallback: bool = False
+    route: str = ""
+    route_seconds: float = 0.0
+
+
+DocumentCallback = Callable[[int, DocumentOutcome], None]
+DocumentStartCallback = Callable[[int], None]
+
+
+@dataclass
+class DocumentTask:
+    """One document's progress through a run.
+
+    ``text`` is decoded on the worker that screens the task and dropped once
+    it finishes, so only in-flight documents hold a decoded copy; ``size`` is
+    the raw size used to plan bundles before that.
+    """
+
+    index: int
+    doc: Dict[str, str]
+    outcome: DocumentOutcome
+    started: float
+    size: int = 0
+    text: str | None = None
+    skipped: bool = False
+    cache_key: str | None = None
+    pairs: List[List[str]] = dataclass_field(default_factory=list)
+    covered: Set[str] = dataclass_field(default_factory=set)
+    missing: List[str] = dataclass_field(default_factory=list)
+    prefilled: List[List[str]] = dataclass_field(default_factory=list)
+    route: RouteDecision | None = None
+    passages: Passages | None = None
+    passages_key: str | None = None
+    screened: bool = False
+
+    @property
+    def model_text(self) -> str:
+        """What is sent to the model: the relevant passages when the pre-filter trimmed the text."""
+        return self.passages.text if self.passages is not None else self.text or ""
+
+
+@dataclass
+class RunContext:
+    fields: List[str]
+    prompt_description: str
+    api_key: str
+    sizing: Dict[str, int] | None = None
+    flow: str = ""
+    on_document: DocumentCallback | None = None
+    on_document_start: DocumentStartCallback | None = None
 
 
 class ExtractionPipelineError(RuntimeError):
@@ -20,20 +104,292 @@ class ExtractionPipelineError(RuntimeError):
 
 
 class BaseExtractor:
+    """Engines return one record per document in input order.
+
+    ``on_document_start(index)`` and ``on_document(index, outcome)`` report
+    progress as each document starts and finishes.
+    """
+
     def extract(
         self,
         documents: List[Dict[str, str]],
         fields: List[str],
         api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
     ) -> ExtractionResult:
         raise NotImplementedError
 
+    async def extract_async(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> ExtractionResult:
+        return await asyncio.to_thread(
+            self.extract,
+            documents,
+            fields,
+            api_key_override,
+            on_document,
+            on_document_start,
+        )
+
+    def extract_added_fields(
+        self,
+        documents: List[Dict[str, str]],
+        records: List[Dict[str, str]],
+        new_fields: List[str],
+        api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> ExtractionResult:
+        """Extract only ``new_fields`` and merge them into previously extracted ``records``."""
+        if len(records) != len(documents):
+            raise ExtractionPipelineError("Prior records do not match the documents of that run.")
+        return self._extract_into(
+            documents,
+            records,
+            new_fields,
+            f"Incremental run: extracting {len(new_fields)} added field(s) into {len(records)} existing record(s).",
+            api_key_override,
+            on_document,
+            on_document_start,
+        )
+
+    def _extract_into(
+        self,
+        documents: List[Dict[str, str]],
+        records: List[Dict[str, str]],
+        new_fields: List[str],
+        note: str,
+        api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+        **options: object,
+    ) -> ExtractionResult:
+        merged_callback: DocumentCallback | None = None
+        if on_document is not None:
+            callback = on_document
+
+            def merged_callback(index: int, outcome: DocumentOutcome) -> None:
+                callback(index, replace(outcome, row={**records[index], **outcome.row}))
+
+        result = self.extract(documents, new_fields, api_key_override, merged_callback, on_document_start, **options)
+        result.records = [
+            {**prior, **{field: row.get(field, "") for field in new_fields}}
+            for prior, row in zip(records, result.records)
+        ]
+        result.logs.insert(0, note)
+        return result
+
+    def extract_iter(
+        self,
+        documents: Iterable[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        **options: object,
+    ) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+        """Yield ``(record, log_entries)`` per document, in input order, as soon as each is ready.
+
+        ``documents`` may be any iterable and is pulled on demand: it goes
+        through :meth:`extract` in windows of ``EXTRACT_STREAM_WINDOW`` (default
+        64), so only one window of documents and records is held at a time.
+        Extra keyword ``options`` are passed through to :meth:`extract`.
+        """
+        source = iter(documents)
+        window = max(1, env_int("EXTRACT_STREAM_WINDOW", 64))
+        while True:
+            batch = list(itertools.islice(source, window))
+            if not batch:
+                return
+            yield from self._extract_window(batch, fields, api_key_override, options)
+
+    def _extract_window(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None,
+        options: Dict[str, object],
+    ) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+        finished: "queue.Queue[Tuple[int, DocumentOutcome | None]]" = queue.Queue()
+        outcome_box: List[ExtractionResult | BaseException] = []
+
+        def run() -> None:
+            try:
+                outcome_box.append(
+                    self.extract(
+                        documents,
+                        fields,
+                        api_key_override,
+                        on_document=lambda index, outcome: finished.put((index, outcome)),
+                        **options,
+                    )
+                )
+            except BaseException as err:  # noqa: BLE001
+                outcome_box.append(err)
+            finally:
+                finished.put((-1, None))
+
+        threading.Thread(target=run, name="extract-iter", daemon=True).start()
+        ready: Dict[int, DocumentOutcome] = {}
+        next_index = 0
+        while next_index < len(documents):
+            index, outcome = finished.get()
+            if outcome is None:
+                break
+            ready[index] = outcome
+            while next_index in ready:
+                outcome = ready.pop(next_index)
+                yield outcome.row, outcome.logs
+                next_index += 1
+
+        if next_index < len(documents):
+            result = outcome_box[0] if outcome_box else None
+            if not isinstance(result, ExtractionResult):
+                raise result or ExtractionPipelineError("Extraction stopped before every document finished.")
+            for index in range(next_index, len(documents)):
+                outcome = ready.get(index)
+                yield (outcome.row, outcome.logs) if outcome is not None else (result.records[index], [])
+
+
+@dataclass
+class CallSizing:
+    max_char_buffer: int
+    max_workers: int
+    batch_length: int
+
+    def as_options(self) -> Dict[str, int]:
+        return {
+            "max_char_buffer": self.max_char_buffer,
+            "max_workers": self.max_workers,
+            "batch_length": self.batch_length,
+        }
+
+
+class SizingPolicy:
+    """Picks LangExtract chunking and fan-out from document length and observed latency.
+
+    Chunk count follows from ``max_char_buffer``. Workers are sized so that the
+    chunks of one document finish within ``target_document_seconds`` given the
+    smoothed per-chunk latency seen so far, and every value is clamped to the
+    server-side caps regardless of per-request overrides.
+    """
+
+    def __init__(
+        self,
+        base_char_buffer: int = 1000,
+        max_char_buffer_cap: int = 4000,
+        max_workers_cap: int = 16,
+        batch_length_cap: int = 16,
+        target_document_seconds: float = 20.0,
+    ) -> None:
+        self.base_char_buffer = max(100, base_char_buffer)
+        self.max_char_buffer_cap = max(self.base_char_buffer, max_char_buffer_cap)
+        self.max_workers_cap = max(1, max_workers_cap)
+        self.batch_length_cap = max(1, batch_length_cap)
+        self.target_document_seconds = target_document_seconds
+        self._chunk_seconds: float | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SizingPolicy":
+        return cls(
+            base_char_buffer=env_int("EXTRACT_CHAR_BUFFER", 1000),
+            max_char_buffer_cap=env_int("EXTRACT_MAX_CHAR_BUFFER_CAP", 4000),
+            max_workers_cap=env_int("EXTRACT_MAX_WORKERS_CAP", 16),
+            batch_length_cap=env_int("EXTRACT_BATCH_LENGTH_CAP", 16),
+        )
+
+    def choose(self, text_length: int, overrides: Dict[str, int] | None = None) -> CallSizing:
+        overrides = overrides or {}
+        buffer = overrides.get("max_char_buffer") or self.base_char_buffer
+        buffer = min(max(100, buffer), self.max_char_buffer_cap)
+        chunks = max(1, math.ceil(text_length / buffer))
+
+        if chunks == 1:
+            workers = 1
+        else:
+            with self._lock:
+                chunk_seconds = self._chunk_seconds
+            workers = chunks
+            if chunk_seconds is not None:
+                workers = math.ceil(chunks * chunk_seconds / self.target_document_seconds)
+        workers = overrides.get("max_workers") or workers
+        workers = min(max(1, workers), chunks, self.max_workers_cap)
+
+        batch_length = overrides.get("batch_length") or max(workers, min(chunks, self.batch_length_cap))
+        batch_length = min(max(1, batch_length), self.batch_length_cap)
+        return CallSizing(max_char_buffer=buffer, max_workers=workers, batch_length=batch_length)
+
+    def observe(self, text_length: int, sizing: CallSizing, seconds: float) -> None:
+        chunks = max(1, math.ceil(text_length / sizing.max_char_buffer))
+        waves = math.ceil(chunks / max(1, min(sizing.max_workers, sizing.batch_length)))
+        per_chunk = seconds / waves
+        with self._lock:
+            if self._chunk_seconds is None:
+                self._chunk_seconds = per_chunk
+            else:
+                self._chunk_seconds = 0.8 * self._chunk_seconds + 0.2 * per_chunk
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            chunk_seconds = self._chunk_seconds
+        return {
+            "chunk_seconds_ewma": round(chunk_seconds, 4) if chunk_seconds is not None else None,
+            "base_char_buffer": self.base_char_buffer,
+            "max_workers_cap": self.max_workers_cap,
+            "batch_length_cap": self.batch_length_cap,
+        }
+
 
 class LangExtractAdapter(BaseExtractor):
     """Gemini-backed LangExtract adapter with deterministic fallback behavior."""
 
-    def __init__(self, model_id: str = "gemini-2.5-flash") -> None:
+    PACK_SEPARATOR = "\n\n=====\n\n"
+
+    def __init__(
+        self,
+        model_id: str = "gemini-2.5-flash",
+        max_concurrent_documents: int | None = None,
+        cache: ExtractionCache | None = None,
+        pack_max_document_chars: int | None = None,
+        pack_bundle_chars: int | None = None,
+        sizing_policy: SizingPolicy | None = None,
+        governor: GeminiGovernor | None = None,
+        retry_policy: RetryPolicy | None = None,
+        hedger: Hedger | None = None,
+        gazetteer: GazetteerExtractor | None = None,
+        learned: LearnedGazetteer | None = None,
+        local_model: LocalModelExtractor | None = None,
+        router: ConfidenceRouter | None = None,
+        relevance_filter: RelevanceFilter | None = None,
+    ) -> None:
         self.model_id = model_id
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.learned = learned
+        self.local_model = local_model
+        self.router = router or ConfidenceRouter.from_env(learned=learned, local_model=local_model)
+        self.relevance_filter = relevance_filter or RelevanceFilter.from_env()
+        self.sizing_policy = sizing_policy or SizingPolicy.from_env()
+        self.governor = governor or shared_governor()
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.breaker = circuit_breaker(model_id)
+        self.hedger = hedger or Hedger.from_env()
+        self._retries = 0
+        self._stats_lock = threading.Lock()
+        if max_concurrent_documents is None:
+            max_concurrent_documents = env_int("EXTRACT_MAX_CONCURRENT_DOCUMENTS", 8)
+        self.max_concurrent_documents = max(1, max_concurrent_documents)
+        if pack_max_document_chars is None:
+            pack_max_document_chars = env_int("EXTRACT_PACK_MAX_DOCUMENT_CHARS", 1000)
+        if pack_bundle_chars is None:
+            pack_bundle_chars = env_int("EXTRACT_PACK_BUNDLE_CHARS", 4000)
+        self.pack_max_document_chars = max(0, pack_max_document_chars)
+        self.pack_bundle_chars = max(0, pack_bundle_chars)
         self._langextract = None
         try:
             import langextract as lx  # type: ignore
@@ -47,80 +403,715 @@ class LangExtractAdapter(BaseExtractor):
         documents: List[Dict[str, str]],
         fields: List[str],
         api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+        sizing: Dict[str, int] | None = None,
+    ) -> ExtractionResult:
+        """``sizing`` may override ``max_char_buffer``, ``max_workers`` and ``batch_length`` up to the policy caps.
+
+        Fields with a gazetteer term list are filled by the gazetteer and never sent to the model.
+        """
+        self._validate(documents, fields)
+        gazetteer_fields = self.gazetteer.covered(fields) if self.gazetteer is not None else []
+        if gazetteer_fields:
+            return self._extract_with_gazetteer(
+                documents, fields, gazetteer_fields, api_key_override, on_document, on_document_start, sizing
+            )
+        api_key = self._resolve_api_key(api_key_override)
+        degraded = self._degraded_result(documents, fields, api_key, on_document, on_document_start)
+        if degraded is not None:
+            return degraded
+
+        run = RunContext(
+            fields=fields,
+            prompt_description=self._build_prompt(fields),
+            api_key=api_key,
+            sizing=sizing,
+            flow=uuid.uuid4().hex,
+            on_document=on_document,
+            on_document_start=on_document_start,
+        )
+        started = time.perf_counter()
+
+        tasks = [self._prepare_document(doc, fields, index) for index, doc in enumerate(documents)]
+        for task in tasks:
+            if not task.missing:
+                self._start_document(task, run)
+                self._finish_document(task, run)
+
+        units = self._plan_units([task for task in tasks if task.missing])
+        workers = max(1, min(self.max_concurrent_documents, sum(len(unit) for unit in units)))
+        if units:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract-doc") as pool:
+                pending = {pool.submit(self._run_unit, unit, run) for unit in units}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for retry in future.result():
+                            pending.add(pool.submit(self._run_unit, retry, run))
+
+        notes: List[str] = []
+        packed = [unit for unit in units if len(unit) > 1]
+        if packed:
+            notes.append(
+                f"Packed {sum(len(unit) for unit in packed)} small document(s) into "
+                f"{len(packed)} shared model call(s)."
+            )
+        outcomes = [task.outcome for task in tasks]
+        return self._assemble_result(documents, fields, outcomes, started, workers, notes)
+
+    def _extract_with_gazetteer(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        gazetteer_fields: List[str],
+        api_key_override: str | None,
+        on_document: DocumentCallback | None,
+        on_document_start: DocumentStartCallback | None,
+        sizing: Dict[str, int] | None,
     ) -> ExtractionResult:
+        assert self.gazetteer is not None
+        model_fields = [field for field in fields if field not in gazetteer_fields]
+        if not model_fields:
+            return self.gazetteer.extract(
+                documents, fields, on_document=on_document, on_document_start=on_document_start
+            )
+
+        def in_field_order(row: Dict[str, str]) -> Dict[str, str]:
+            return {"document": row["document"], **{field: row.get(field, "") for field in fields}}
+
+        ordered_callback: DocumentCallback | None = None
+        if on_document is not None:
+            callback = on_document
+
+            def ordered_callback(index: int, outcome: DocumentOutcome) -> None:
+                callback(index, replace(outcome, row=in_field_order(outcome.row)))
+
+        prior = self.gazetteer.extract(documents, gazetteer_fields)
+        result = self._extract_into(
+            documents,
+            prior.records,
+            model_fields,
+            f"Gazetteer filled {len(gazetteer_fields)} field(s); sending {len(model_fields)} to the model engine.",
+            api_key_override,
+            ordered_callback,
+            on_document_start,
+            sizing=sizing,
+        )
+        result.records = [in_field_order(row) for row in result.records]
+        result.logs[1:1] = prior.logs
+        result.engine = f"gazetteer+{result.engine}"
+        return result
+
+    def extract_iter(
+        self,
+        documents: Iterable[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        sizing: Dict[str, int] | None = None,
+    ) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+        """Stream records in input order through a sliding window of in-flight documents.
+
+        Up to ``max(EXTRACT_STREAM_WINDOW, max_concurrent_documents)`` documents are
+        pulled ahead of the one being yielded and each new document is pulled as
+        soon as the oldest is yielded, so memory is constant in the input size.
+        Streaming sends every document on its own (no packing).
+        """
+        if not fields:
+            raise ExtractionPipelineError("No extraction fields were provided.")
+        if self.gazetteer is not None and self.gazetteer.covered(fields):
+            yield from super().extract_iter(documents, fields, api_key_override, sizing=sizing)
+            return
+        api_key = self._resolve_api_key(api_key_override)
+        reason = self._degraded_reason(api_key)
+        if reason is not None:
+            notes = [reason]
+            for record, logs in self._fallback_extractor().extract_iter(documents, fields):
+                yield record, notes + logs
+                notes = []
+            return
+
+        run = RunContext(
+            fields=fields,
+            prompt_description=self._build_prompt(fields),
+            api_key=api_key,
+            sizing=sizing,
+            flow=uuid.uuid4().hex,
+        )
+        window = max(self.max_concurrent_documents, env_int("EXTRACT_STREAM_WINDOW", 64))
+        in_flight: Deque[Tuple[DocumentTask, Future | None]] = deque()
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrent_documents, thread_name_prefix="extract-iter")
+        pulled = 0
+        try:
+            for index, doc in enumerate(documents):
+                pulled += 1
+                task = self._prepare_document(doc, fields, index)
+                if task.missing:
+                    in_flight.append((task, pool.submit(self._run_unit, [task], run)))
+                else:
+                    self._finish_document(task, run)
+                    in_flight.append((task, None))
+                if len(in_flight) >= window:
+                    yield self._oldest_outcome(in_flight)
+            while in_flight:
+                yield self._oldest_outcome(in_flight)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if not pulled:
+            raise ExtractionPipelineError("No documents were provided for extraction.")
+
+    @staticmethod
+    def _oldest_outcome(in_flight: Deque[Tuple[DocumentTask, Future | None]]) -> Tuple[Dict[str, str], List[str]]:
+        task, future = in_flight.popleft()
+        if future is not None:
+            future.result()
+        return task.outcome.row, task.outcome.logs
+
+    @staticmethod
+    def _validate(documents: List[Dict[str, str]], fields: List[str]) -> None:
         if not documents:
             raise ExtractionPipelineError("No documents were provided for extraction.")
         if not fields:
             raise ExtractionPipelineError("No extraction fields were provided.")
 
-        if self._langextract is None:
-            fallback = RegexFallbackExtractor()
-            result = fallback.extract(documents, fields)
-            result.logs.insert(
-                0,
-                "langextract package unavailable. Running deterministic fallback engine.",
-            )
-            return result
+    @staticmethod
+    def _resolve_api_key(api_key_override: str | None) -> str:
+        return (
+            (api_key_override or "").strip()
+            or os.getenv("LANGEXTRACT_API_KEY")
+            or os.getenv("GEMINI_API_KEY")
+            or ""
+        )
+
+    def _degraded_result(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        api_key: str,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> ExtractionResult | None:
+        reason = self._degraded_reason(api_key)
+        if reason is None:
+            return None
+
+        result = self._fallback_extractor().extract(
+            documents,
+            fields,
+            on_document=on_document,
+            on_document_start=on_document_start,
+        )
+        result.logs.insert(0, reason)
+        return result
 
-        api_key = (api_key_override or "").strip() or os.getenv("LANGEXTRACT_API_KEY") or os.getenv("GEMINI_API_KEY")
+    def _degraded_reason(self, api_key: str) -> str | None:
+        if self._langextract is None:
+            return "langextract package unavailable. Running deterministic fallback engine."
         if not api_key:
-            fallback = RegexFallbackExtractor()
-            result = fallback.extract(documents, fields)
-            result.logs.insert(
-                0,
+            return (
                 "Gemini key not found (set LANGEXTRACT_API_KEY or GEMINI_API_KEY). "
-                "Running deterministic fallback engine.",
+                "Running deterministic fallback engine."
             )
-            return result
+        return None
 
+    def _fallback_extractor(self) -> BaseExtractor:
+        """The trained local tagger when one is loaded, else the regex recognizers."""
+        return self.local_model if self.local_model is not None else RegexFallbackExtractor()
+
+    def _assemble_result(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        outcomes: List[DocumentOutcome],
+        started: float,
+        concurrency: int,
+        notes: List[str] | None = None,
+    ) -> ExtractionResult:
         logs: List[str] = [
             f"LangExtract available. Using Gemini model '{self.model_id}'.",
             f"Processing {len(documents)} document(s) and {len(fields)} field(s).",
         ]
         records: List[Dict[str, str]] = []
+        timings: List[Dict[str, object]] = []
+
+        for doc, outcome in zip(documents, outcomes):
+            records.append(outcome.row)
+            logs.extend(outcome.logs)
+            timings.append({"document": doc["name"], "seconds": round(outcome.seconds, 4)})
+
+        if self.cache is not None:
+            hits = sum(1 for outcome in outcomes if outcome.cache == "hit")
+            partial = sum(1 for outcome in outcomes if outcome.cache == "partial")
+            misses = sum(1 for outcome in outcomes if outcome.cache == "miss")
+            logs.append(f"Cache: {hits} hit(s), {partial} partial hit(s), {misses} miss(es).")
+
+        routes = [
+            (outcome.route, outcome.route_seconds, outcome.seconds - outcome.route_seconds)
+            for outcome in outcomes
+            if outcome.route
+        ]
+        if routes:
+            logs.append(route_summary(routes))
+
+        logs.extend(notes or [])
+
+        logs.append(
+            f"Finished {len(documents)} document(s) in {time.perf_counter() - started:.2f}s "
+            f"with up to {concurrency} concurrent model call(s)."
+        )
+        return ExtractionResult(records=records, logs=logs, engine="langextract-gemini", timings=timings)
+
+    def _prepare_document(self, doc: Dict[str, str], fields: List[str], index: int = 0) -> DocumentTask:
+        """Look ``doc`` up in the cache without decoding it; the text is read later by :meth:`_screen_document`."""
+        task = DocumentTask(
+            index=index,
+            doc=doc,
+            outcome=DocumentOutcome(row=self._empty_row(doc, fields), logs=[]),
+            started=time.perf_counter(),
+            size=self._raw_size(doc),
+        )
+        if not task.size:
+            self._skip_empty(task)
+            return task
+
+        task.cache_key, task.pairs, task.covered = self._cache_lookup(task.outcome, doc, fields)
+        task.missing = [field for field in fields if field.lower() not in task.covered]
+        return task
+
+    @staticmethod
+    def _raw_size(doc: Dict[str, str]) -> int:
+        return doc.size if isinstance(doc, Document) else len(doc.get("text", ""))
+
+    @staticmethod
+    def _skip_empty(task: DocumentTask) -> None:
+        task.skipped = True
+        task.missing = []
+        task.outcome.cache = ""
+        task.outcome.logs.append(f"Skipped '{task.doc['name']}' because it is empty.")
+
+    def _screen_document(self, task: DocumentTask) -> None:
+        """Decode the text, route the missing fields locally and trim the model text.
+
+        Runs once per task, on its worker.
+        """
+        if task.screened:
+            return
+        task.screened = True
+        task.text = task.doc.get("text", "")
+        if not task.text or task.text.isspace():
+            self._skip_empty(task)
+            return
+        if self.router is not None and task.missing:
+            self._route_locally(task)
+        if self.relevance_filter is not None and task.missing:
+            task.passages = self.relevance_filter.select(task.text, task.missing)
+            if task.passages is not None and not self._passages_lookup(task):
+                task.outcome.logs.append(
+                    f"Sending {len(task.passages.spans)} of {task.passages.total} passage(s) of "
+                    f"'{task.doc['name']}' to the model ({len(task.passages.text) / len(task.text):.0%} of its text)."
+                )
+
+    def _route_locally(self, task: DocumentTask) -> None:
+        """Fill the missing fields the router is confident about; only the rest go to the model."""
+        assert self.router is not None
+        task.route = decision = self.router.route(task.text, task.missing)
+        task.outcome.route_seconds = decision.seconds
+        if not decision.local:
+            task.outcome.route = "model"
+            if decision.audited:
+                task.outcome.logs.append(f"Sending '{task.doc['name']}' to the model as a routing audit.")
+            return
+        task.prefilled = [[field, value] for field, values in decision.local.items() for value in values]
+        task.missing = [field for field in task.missing if field not in decision.local]
+        task.outcome.route = "partial" if task.missing else "local"
+        sources = ", ".join(f"{field}={source}" for field, source in decision.sources.items())
+        task.outcome.logs.append(
+            f"Routed {len(decision.local)} field(s) of '{task.doc['name']}' locally ({sources})"
+            + ("; skipping the model." if not task.missing else f"; sending {len(task.missing)} to the model.")
+        )
+
+    @staticmethod
+    def _start_document(task: DocumentTask, run: RunContext) -> None:
+        """Called when a worker picks ``task`` up; its reported time runs from here, not from the queue."""
+        task.started = time.perf_counter()
+        if run.on_document_start is not None:
+            run.on_document_start(task.index)
+
+    def _finish_document(
+        self,
+        task: DocumentTask,
+        run: RunContext,
+        new_pairs: List[List[str]] | None = None,
+        err: Exception | None = None,
+    ) -> DocumentOutcome:
+        fields = run.fields
+        outcome = task.outcome
+        if task.skipped:
+            pass
+        elif err is not None:
+            known = task.pairs + task.prefilled
+            self._fill_row(outcome.row, known, [field for field in fields if field not in task.missing])
+            self._apply_fallback(outcome, task.doc, task.missing, err)
+            if self.router is not None and task.route is not None:
+                self.router.record_model_time(time.perf_counter() - task.started - task.route.seconds)
+        else:
+            pairs = task.pairs + (new_pairs or [])
+            if task.missing and task.passages is None:
+                self._cache_store(task.cache_key, task.covered, task.missing, pairs, task.text)
+            elif task.missing:
+                # Trimmed results are not full-document results: they live under their own key.
+                self._cache_store(task.passages_key, set(), task.missing, new_pairs or [], task.passages.text)
+            if new_pairs is not None:
+                values = self._project_extractions(new_pairs, task.missing)
+                if self.learned is not None:
+                    self.learned.observe(values)
+                if self.router is not None and task.route is not None:
+                    model_seconds = time.perf_counter() - task.started - task.route.seconds
+                    self.router.observe(task.route, values, model_seconds)
+            self._apply_extractions(outcome, task.doc, pairs + task.prefilled, fields, task.started)
+
+        outcome.seconds = time.perf_counter() - task.started
+        task.text = task.passages = None
+        if run.on_document is not None:
+            run.on_document(task.index, outcome)
+        return outcome
+
+    def _plan_units(self, tasks: List[DocumentTask]) -> List[List[DocumentTask]]:
+        """Group small documents that need the same fields into size-bounded bundles.
+
+        Documents are not decoded yet, so bundles are sized by raw size (UTF-8
+        bytes for uploads, never fewer than characters). A bundle never exceeds
+        the sizing policy's largest ``max_char_buffer``, so :meth:`_call_bundle`
+        can send it as one chunk (one model request).
+        """
+        units: List[List[DocumentTask]] = []
+        open_bundles: Dict[Tuple[str, ...], Tuple[List[DocumentTask], int]] = {}
+        bundle_chars = min(self.pack_bundle_chars, self.sizing_policy.max_char_buffer_cap)
+
+        for task in tasks:
+            if not self.pack_max_document_chars or task.size > self.pack_max_document_chars:
+                units.append([task])
+                continue
+
+            group = tuple(task.missing)
+            bundle, size = open_bundles.get(group, ([], 0))
+            added = task.size + (len(self.PACK_SEPARATOR) if bundle else 0)
+            if bundle and size + added > bundle_chars:
+                bundle, size, added = [], 0, task.size
+            if not bundle:
+                units.append(bundle)
+            bundle.append(task)
+            open_bundles[group] = (bundle, size + added)
+
+        return units
 
-        prompt_description = self._build_prompt(fields)
+    def _run_unit(self, unit: List[DocumentTask], run: RunContext) -> List[List[DocumentTask]]:
+        """Screen ``unit`` and run one model call for it; returns units to resubmit.
 
-        for doc in documents:
-            row: Dict[str, str] = {"document": doc["name"]}
-            for field in fields:
-                row[field] = ""
+        Tasks the router fills completely finish here without a call. When
+        routing left the bundled tasks needing different fields they come back
+        regrouped by field set; after a failed bundle call, and for bundled
+        tasks whose extractions could not be attributed, one unit per task.
+        """
+        for task in unit:
+            if not task.screened:
+                self._start_document(task, run)
+                self._screen_document(task)
+        for task in unit:
+            if not task.missing:
+                self._finish_document(task, run)
+        groups: Dict[Tuple[str, ...], List[DocumentTask]] = {}
+        for task in unit:
+            if task.missing:
+                groups.setdefault(tuple(task.missing), []).append(task)
+        if len(groups) != 1:
+            return list(groups.values())
+        unit = next(iter(groups.values()))
+
+        missing = unit[0].missing
+        prompt = run.prompt_description if len(missing) == len(run.fields) else self._build_prompt(missing)
+        try:
+            if len(unit) == 1:
+                annotated = self._call_model(unit[0].model_text, prompt, run)
+                per_document = [self._collect_extractions(annotated)]
+            else:
+                per_document = self._call_bundle(unit, prompt, run)
+        except Exception as err:  # noqa: BLE001
+            if len(unit) > 1 and not isinstance(err, CircuitOpenError):
+                return [[task] for task in unit]
+            if len(unit) > 1:
+                for task in unit:
+                    self._finish_document(task, run, err=err)
+                return []
+            self._finish_document(unit[0], run, err=err)
+            return []
 
-            text = doc.get("text", "")
-            if not text.strip():
-                logs.append(f"Skipped '{doc['name']}' because it is empty.")
-                records.append(row)
+        retries: List[List[DocumentTask]] = []
+        for task, pairs in zip(unit, per_document):
+            if pairs is None:
+                retries.append([task])
+            else:
+                self._finish_document(task, run, new_pairs=pairs)
+        return retries
+
+    def _call_bundle(
+        self, unit: List[DocumentTask], prompt: str, run: RunContext
+    ) -> List[List[List[str]] | None]:
+        """Send several documents as one text and map extractions back by character offset.
+
+        The bundle goes out as a single chunk. An extraction without a
+        character offset is kept only when exactly one bundled document
+        contains its text; the documents it is ambiguous between come back as
+        ``None`` so they are extracted again on their own.
+        """
+        starts: List[int] = []
+        parts: List[str] = []
+        position = 0
+        for task in unit:
+            if parts:
+                parts.append(self.PACK_SEPARATOR)
+                position += len(self.PACK_SEPARATOR)
+            starts.append(position)
+            parts.append(task.model_text)
+            position += len(task.model_text)
+
+        # LangExtract re-chunks its input at max_char_buffer; raise it so the bundle stays one request.
+        single_chunk = replace(run, sizing={**(run.sizing or {}), "max_char_buffer": position})
+        annotated = self._call_model("".join(parts), prompt, single_chunk)
+        per_document: List[List[List[str]] | None] = [[] for _ in unit]
+        ambiguous: Set[int] = set()
+        for klass, text, start in self._iter_extractions(annotated):
+            if start is None:
+                holders = [index for index, task in enumerate(unit) if text in task.model_text]
+                if len(holders) == 1:
+                    per_document[holders[0]].append([klass, text])
+                else:
+                    ambiguous.update(holders)
                 continue
 
+            index = bisect.bisect_right(starts, start) - 1
+            if index >= 0 and start < starts[index] + len(unit[index].model_text):
+                per_document[index].append([klass, text])
+
+        return [None if index in ambiguous else pairs for index, pairs in enumerate(per_document)]
+
+    def _cache_params(self) -> Dict[str, object]:
+        return {"extraction_passes": 1}
+
+    def _cache_key(self, doc: Dict[str, str], params: Dict[str, object]) -> str:
+        """Cache key over ``doc``'s raw bytes (hashed in place, without decoding or copying them)."""
+        assert self.cache is not None
+        prompt_template = self._build_prompt(["{fields}"])
+        if isinstance(doc, Document):
+            with doc.buffer() as buffer:
+                return self.cache.make_key(buffer, self.model_id, prompt_template, params)
+        return self.cache.make_key(doc.get("text", ""), self.model_id, prompt_template, params)
+
+    def _cache_lookup(
+        self,
+        outcome: DocumentOutcome,
+        doc: Dict[str, str],
+        fields: List[str],
+    ) -> Tuple[str | None, List[List[str]], Set[str]]:
+        """Return the cache key plus any cached raw extractions and the fields they cover."""
+        if self.cache is None:
+            return None, [], set()
+
+        key = self._cache_key(doc, self._cache_params())
+        cached = self.cache.get(key)
+        if cached is None:
+            outcome.cache = "miss"
+            return key, [], set()
+
+        covered = {str(f).lower() for f in cached.get("fields", [])}
+        pairs = [list(pair) for pair in cached.get("extractions", []) if len(pair) == 2]
+        missing = [field for field in fields if field.lower() not in covered]
+        if not missing:
+            outcome.cache = "hit"
+            outcome.logs.append(f"Served '{doc['name']}' from the extraction cache.")
+        elif len(missing) < len(fields):
+            outcome.cache = "partial"
+            outcome.logs.append(
+                f"Reused cached extractions for {len(fields) - len(missing)} field(s) of '{doc['name']}'; "
+                f"requesting {len(missing)} new field(s)."
+            )
+        else:
+            outcome.cache = "miss"
+        return key, pairs, covered
+
+    def _passages_lookup(self, task: DocumentTask) -> bool:
+        """Serve ``task``'s missing fields from results cached for the same trimmed passages.
+
+        Those entries are keyed by the full text plus the pre-filter settings
+        and the exact field set the passages were selected for, so they never
+        stand in for a whole-document extraction.
+        """
+        if self.cache is None or self.relevance_filter is None:
+            return False
+        params = {
+            **self._cache_params(),
+            "prefilter": self.relevance_filter.settings(),
+            "fields": sorted(field.lower() for field in task.missing),
+        }
+        task.passages_key = self._cache_key(task.doc, params)
+        cached = self.cache.get(task.passages_key)
+        if cached is None:
+            return False
+        task.pairs = task.pairs + [list(pair) for pair in cached.get("extractions", []) if len(pair) == 2]
+        task.missing = []
+        task.outcome.cache = "hit"
+        task.outcome.logs.append(f"Served the relevant passages of '{task.doc['name']}' from the extraction cache.")
+        return True
+
+    def _cache_store(
+        self,
+        key: str | None,
+        covered: Set[str],
+        new_fields: List[str],
+        pairs: List[List[str]],
+        text: str | None = None,
+    ) -> None:
+        if self.cache is None or key is None:
+            return
+        all_fields = sorted(covered | {field.lower() for field in new_fields})
+        value: Dict[str, object] = {"fields": all_fields, "extractions": pairs}
+        if self.cache.store_text and text is not None:
+            value["text"] = text
+        self.cache.set(key, value)
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "sizing": self.sizing_policy.stats(),
+            "governor": self.governor.stats(),
+            "breaker": self.breaker.stats(),
+            "retries": self._retries,
+            "hedging": self.hedger.stats(),
+            "learned_gazetteer": self.learned.stats() if self.learned is not None else None,
+            "local_model": self.local_model.stats() if self.local_model is not None else None,
+            "routing": self.router.stats() if self.router is not None else None,
+        }
+
+    def _call_model(self, text: str, prompt_description: str, run: RunContext, **params: object) -> object:
+        chosen = self.sizing_policy.choose(len(text), run.sizing)
+        options: Dict[str, object] = {"extraction_passes": 1, **chosen.as_options()}
+        options.update(params)
+
+        passes = int(options.get("extraction_passes", 1))
+        chunks = max(1, math.ceil(len(text) / int(options.get("max_char_buffer", chosen.max_char_buffer))))
+        estimated_tokens = passes * (len(text) + chunks * len(prompt_description)) // 4
+
+        weight = min(chunks, int(options.get("max_workers", 1)))
+        batch_length = int(options.get("batch_length", 1))
+
+        def admit() -> ContextManager[int]:
+            return self.governor.slot(run.flow, requests=passes * chunks, tokens=estimated_tokens, weight=weight)
+
+        def waves(granted: int) -> float:
+            return passes * math.ceil(chunks / max(1, min(granted, batch_length)))
+
+        # (seconds inside the governor slot, granted weight) per successful call: queueing is not latency.
+        measured: List[Tuple[float, int]] = []
+
+        def invoke(granted: int) -> object:
+            # The AIMD window may admit fewer parallel calls than requested; never run more than granted.
+            call_options = dict(options)
+            for key in ("max_workers", "batch_length"):
+                if key in call_options:
+                    call_options[key] = max(1, min(int(call_options[key]), granted))
+            started = time.perf_counter()
+            annotated = self._langextract.extract(
+                text,
+                prompt_description=prompt_description,
+                api_key=run.api_key,
+                model_id=self.model_id,
+                show_progress=False,
+                **call_options,
+            )
+            measured.append((time.perf_counter() - started, granted))
+            return annotated
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"circuit open for model '{self.model_id}', skipping the model call")
             try:
-                annotated = self._langextract.extract(
-                    text,
-                    prompt_description=prompt_description,
-                    api_key=api_key,
-                    model_id=self.model_id,
-                    extraction_passes=1,
-                    max_workers=4,
-                    batch_length=4,
-                    show_progress=False,
-                )
-                extracted_map = self._map_entities_to_fields(annotated, fields)
-                for field in fields:
-                    values = extracted_map.get(field, [])
-                    row[field] = "; ".join(values)
-
-                total = sum(len(v) for v in extracted_map.values())
-                logs.append(f"Processed '{doc['name']}' successfully with {total} extracted mention(s).")
-            except Exception as err:  # noqa: BLE001
-                logs.append(
-                    f"LangExtract failed on '{doc['name']}' ({err}). "
-                    "Using deterministic fallback for this document."
+                annotated = self.hedger.run(invoke, scale=waves, admit=admit)
+            except Exception as err:
+                if not is_transient_error(err):
+                    if is_client_error(err):
+                        # The service answered; the failure is specific to this input.
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.record_failure()
+                    raise
+                if is_rate_limit_error(err):
+                    # Rate limiting means the service is up; back off and retry without tripping the breaker.
+                    self.breaker.record_rate_limited()
+                else:
+                    self.breaker.record_failure()
+                if not self.retry_policy.should_retry(err, attempt):
+                    raise
+                with self._stats_lock:
+                    self._retries += 1
+                time.sleep(self.retry_policy.backoff(attempt))
+                continue
+
+            self.breaker.record_success()
+            if not params and measured:
+                seconds, granted = measured[0]
+                ran = replace(
+                    chosen,
+                    max_workers=min(chosen.max_workers, granted),
+                    batch_length=min(chosen.batch_length, granted),
                 )
-                fallback_row = RegexFallbackExtractor().extract([doc], fields).records[0]
-                row.update({k: v for k, v in fallback_row.items() if k in fields})
+                self.sizing_policy.observe(len(text), ran, seconds)
+            return annotated
 
-            records.append(row)
+    @staticmethod
+    def _empty_row(doc: Dict[str, str], fields: List[str]) -> Dict[str, str]:
+        row: Dict[str, str] = {"document": doc["name"]}
+        for field in fields:
+            row[field] = ""
+        return row
 
-        return ExtractionResult(records=records, logs=logs, engine="langextract-gemini")
+    def _apply_extractions(
+        self,
+        outcome: DocumentOutcome,
+        doc: Dict[str, str],
+        pairs: List[List[str]],
+        fields: List[str],
+        started: float,
+    ) -> None:
+        total = self._fill_row(outcome.row, pairs, fields)
+        if outcome.cache == "hit":
+            return
+        elapsed = time.perf_counter() - started
+        outcome.logs.append(
+            f"Processed '{doc['name']}' successfully with {total} extracted mention(s) in {elapsed:.2f}s."
+        )
+
+    def _fill_row(self, row: Dict[str, str], pairs: List[List[str]], fields: List[str]) -> int:
+        extracted_map = self._project_extractions(pairs, fields)
+        for field in fields:
+            row[field] = "; ".join(extracted_map.get(field, []))
+        return sum(len(v) for v in extracted_map.values())
+
+    def _apply_fallback(
+        self,
+        outcome: DocumentOutcome,
+        doc: Dict[str, str],
+        fields: List[str],
+        err: Exception,
+    ) -> None:
+        outcome.logs.append(
+            f"LangExtract failed on '{doc['name']}' ({err}). "
+            "Using deterministic fallback for this document."
+        )
+        fallback_row = self._fallback_extractor().extract([doc], fields).records[0]
+        outcome.row.update({k: v for k, v in fallback_row.items() if k in fields})
+        outcome.fallback = True
 
     @staticmethod
     def _build_prompt(fields: List[str]) -> str:
@@ -133,11 +1124,17 @@ class LangExtractAdapter(BaseExtractor):
             "Do not invent fields. Do not include values outside the source text."
         )
 
-    @staticmethod
-    def _map_entities_to_fields(annotated_doc: object, fields: List[str]) -> Dict[str, List[str]]:
-        field_lookup = {f.lower(): f for f in fields}
-        output: Dict[str, List[str]] = {f: [] for f in fields}
+    @classmethod
+    def _map_entities_to_fields(cls, annotated_doc: object, fields: List[str]) -> Dict[str, List[str]]:
+        return cls._project_extractions(cls._collect_extractions(annotated_doc), fields)
+
+    @classmethod
+    def _collect_extractions(cls, annotated_doc: object) -> List[List[str]]:
+        """Flatten annotated output into raw ``[extraction_class, extraction_text]`` pairs."""
+        return [[klass, text] for klass, text, _ in cls._iter_extractions(annotated_doc)]
 
+    @staticmethod
+    def _iter_extractions(annotated_doc: object) -> Iterator[Tuple[str, str, int | None]]:
         docs: Iterable[object]
         if isinstance(annotated_doc, list):
             docs = annotated_doc
@@ -151,38 +1148,348 @@ class LangExtractAdapter(BaseExtractor):
                 text = str(getattr(ex, "extraction_text", "")).strip()
                 if not klass or not text:
                     continue
+                start = getattr(getattr(ex, "char_interval", None), "start_pos", None)
+                yield klass, text, start if isinstance(start, int) else None
 
-                key = field_lookup.get(klass.lower())
-                if not key:
-                    continue
+    @staticmethod
+    def _project_extractions(pairs: List[List[str]], fields: List[str]) -> Dict[str, List[str]]:
+        field_lookup = {f.lower(): f for f in fields}
+        output: Dict[str, List[str]] = {f: [] for f in fields}
+
+        for klass, text in pairs:
+            key = field_lookup.get(klass.lower())
+            if not key:
+                continue
 
-                if text not in output[key]:
-                    output[key].append(text)
+            if text not in output[key]:
+                output[key].append(text)
 
         return output
 
 
+class AsyncLangExtractAdapter(LangExtractAdapter):
+    """Event-loop driven adapter that bounds in-flight model calls with a semaphore.
+
+    Documents are split into chunks and every chunk becomes one single-worker
+    ``lx.extract`` call, so the only threads involved are the adapter's shared
+    executor instead of a fresh pool per document and per request.
+    """
+
+    def __init__(
+        self,
+        model_id: str = "gemini-2.5-flash",
+        max_in_flight: int | None = None,
+        chunk_chars: int = 1000,
+        cache: ExtractionCache | None = None,
+        governor: GeminiGovernor | None = None,
+    ) -> None:
+        if max_in_flight is None:
+            max_in_flight = env_int("EXTRACT_ASYNC_MAX_IN_FLIGHT", 32)
+        super().__init__(
+            model_id=model_id,
+            max_concurrent_documents=max_in_flight,
+            cache=cache,
+            governor=governor,
+        )
+        self.chunk_chars = max(100, chunk_chars)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_documents,
+            thread_name_prefix="extract-async",
+        )
+
+    def extract(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> ExtractionResult:
+        return asyncio.run(self.extract_async(documents, fields, api_key_override, on_document, on_document_start))
+
+    extract_iter = BaseExtractor.extract_iter
+
+    async def extract_async(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> ExtractionResult:
+        self._validate(documents, fields)
+        api_key = self._resolve_api_key(api_key_override)
+        degraded = self._degraded_result(documents, fields, api_key, on_document, on_document_start)
+        if degraded is not None:
+            return degraded
+
+        run = RunContext(
+            fields=fields,
+            prompt_description=self._build_prompt(fields),
+            api_key=api_key,
+            flow=uuid.uuid4().hex,
+            on_document=on_document,
+            on_document_start=on_document_start,
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrent_documents)
+        started = time.perf_counter()
+
+        outcomes = await asyncio.gather(
+            *(self._extract_document_async(index, doc, run, semaphore) for index, doc in enumerate(documents))
+        )
+        return self._assemble_result(documents, fields, list(outcomes), started, self.max_concurrent_documents)
+
+    async def _extract_document_async(
+        self,
+        index: int,
+        doc: Dict[str, str],
+        run: RunContext,
+        semaphore: asyncio.Semaphore,
+    ) -> DocumentOutcome:
+        # Cache lookups and commits hit SQLite; keep them off the event loop.
+        fields = run.fields
+        task = await asyncio.to_thread(self._prepare_document, doc, fields, index)
+        self._start_document(task, run)
+        await asyncio.to_thread(self._screen_document, task)
+        if not task.missing:
+            return await asyncio.to_thread(self._finish_document, task, run)
+
+        prompt = run.prompt_description if len(task.missing) == len(fields) else self._build_prompt(task.missing)
+        loop = asyncio.get_running_loop()
+
+        async def run_chunk(chunk: str) -> object:
+            async with semaphore:
+                call = functools.partial(
+                    self._call_model,
+                    chunk,
+                    prompt,
+                    run,
+                    max_workers=1,
+                    batch_length=1,
+                    max_char_buffer=self.chunk_chars,
+                )
+                return await loop.run_in_executor(self._executor, call)
+
+        try:
+            chunks = self._split_text(task.model_text, self.chunk_chars)
+            annotated = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        except Exception as err:  # noqa: BLE001
+            return await asyncio.to_thread(self._finish_document, task, run, None, err)
+        pairs = self._collect_extractions(list(annotated))
+        return await asyncio.to_thread(self._finish_document, task, run, pairs)
+
+    def _cache_params(self) -> Dict[str, object]:
+        return {"extraction_passes": 1, "chunk_chars": self.chunk_chars}
+
+    @staticmethod
+    def _split_text(text: str, max_chars: int) -> List[str]:
+        chunks: List[str] = []
+        start = 0
+        while start < len(text):
+            end = min(start + max_chars, len(text))
+            if end < len(text):
+                for boundary in ("\n\n", "\n", ". ", " "):
+                    cut = text.rfind(boundary, start + max_chars // 2, end)
+                    if cut != -1:
+                        end = cut + len(boundary)
+                        break
+            if text[start:end].strip():
+                chunks.append(text[start:end])
+            start = end
+        return chunks
+
+
 class RegexFallbackExtractor(BaseExtractor):
-    """Deterministic extractor used when model access is not available."""
+    """Deterministic extractor used when model access is not available.
+
+    Each field is matched to a typed recognizer by name (see
+    :mod:`recognizers`), and all recognizers a run needs are scanned in one
+    pass. Stream-backed :class:`documents.Document` handles are scanned with a
+    bytes pattern over their raw buffer (an ``mmap`` once spooled to disk) and
+    only the matches are decoded.
+
+    With ``processes`` > 1 (``EXTRACT_FALLBACK_PROCESSES``), inputs longer than
+    one chunk are split into ``chunk_size`` documents per task
+    (``EXTRACT_FALLBACK_CHUNK_SIZE``, default 64) and scanned on a shared
+    process pool; records still come back in input order. Each task carries
+    the parent's recognizer registry, so recognizers added with
+    :func:`recognizers.register_recognizer` apply in the workers too. If the
+    pool breaks (a worker died), it is discarded, the run finishes in-thread
+    and the next run starts a fresh pool.
+    """
+
+    # Kept for callers of the old single-pattern fallback: the ``name`` recognizer's compiled patterns.
+    ENTITY_PATTERN = scanner_for([DEFAULT_RECOGNIZER]).pattern
+    ENTITY_BYTES_PATTERN = scanner_for([DEFAULT_RECOGNIZER]).bytes_pattern
 
-    ENTITY_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b")
+    def __init__(self, processes: int | None = None, chunk_size: int | None = None) -> None:
+        self.processes = env_int("EXTRACT_FALLBACK_PROCESSES", 0) if processes is None else processes
+        self.chunk_size = max(1, chunk_size or env_int("EXTRACT_FALLBACK_CHUNK_SIZE", 64))
 
     def extract(
         self,
         documents: List[Dict[str, str]],
         fields: List[str],
         api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
     ) -> ExtractionResult:
-        logs = ["Running fallback extraction engine."]
+        kinds = [recognizer_for(field) for field in fields]
+        logs = [
+            "Running fallback extraction engine.",
+            "Fallback recognizers: " + ", ".join(f"{field}={kind}" for field, kind in zip(fields, kinds)) + ".",
+        ]
         records: List[Dict[str, str]] = []
+        timings: List[Dict[str, object]] = []
 
-        for doc in documents:
-            row: Dict[str, str] = {"document": doc["name"]}
-            entities = self.ENTITY_PATTERN.findall(doc.get("text", ""))
-            uniq_entities = list(dict.fromkeys(entities))
-            for i, field in enumerate(fields):
-                row[field] = uniq_entities[i] if i < len(uniq_entities) else ""
+        for index, (row, elapsed) in enumerate(self._iter_rows(documents, fields, on_document_start)):
             records.append(row)
+            timings.append({"document": row["document"], "seconds": round(elapsed, 4)})
+            if on_document is not None:
+                on_document(index, DocumentOutcome(row=row, logs=[], seconds=elapsed, fallback=True))
 
+        if self._use_pool(len(documents)):
+            logs.append(f"Fallback scanned {len(documents)} document(s) on {self.processes} processes.")
         logs.append(f"Fallback generated {len(records)} record(s).")
-        return ExtractionResult(records=records, logs=logs, engine="fallback-regex")
+        return ExtractionResult(records=records, logs=logs, engine="fallback-regex", timings=timings)
+
+    def extract_iter(
+        self,
+        documents: Iterable[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        **options: object,
+    ) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+        for row, _elapsed in self._iter_rows(documents, fields):
+            yield row, []
+
+    def _use_pool(self, count: int | None) -> bool:
+        return self.processes > 1 and (count is None or count > self.chunk_size)
+
+    def _iter_rows(
+        self,
+        documents: Iterable[Dict[str, str]],
+        fields: List[str],
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> Iterator[Tuple[Dict[str, str], float]]:
+        """``(row, seconds)`` per document in input order, in-thread or on the process pool."""
+        count = len(documents) if isinstance(documents, (list, tuple)) else None
+        if not self._use_pool(count):
+            for index, doc in enumerate(documents):
+                if on_document_start is not None:
+                    on_document_start(index)
+                started = time.perf_counter()
+                row = self.extract_row(doc, fields)
+                yield row, time.perf_counter() - started
+            return
+
+        pool: ProcessPoolExecutor | None = _fallback_pool(self.processes)
+        recognizers = registry()
+        source = iter(documents)
+        pending: Deque[Tuple[List[Dict[str, str]], Future | None]] = deque()
+        submitted = 0
+        while True:
+            while len(pending) < 2 * self.processes:
+                chunk = list(itertools.islice(source, self.chunk_size))
+                if not chunk:
+                    break
+                if on_document_start is not None:
+                    for index in range(submitted, submitted + len(chunk)):
+                        on_document_start(index)
+                submitted += len(chunk)
+                future = None
+                if pool is not None:
+                    try:
+                        future = pool.submit(_fallback_rows, chunk, fields, recognizers)
+                    except BrokenProcessPool:
+                        _discard_fallback_pool(self.processes, pool)
+                        pool = None
+                pending.append((chunk, future))
+            if not pending:
+                return
+            chunk, future = pending.popleft()
+            rows = None
+            if future is not None:
+                try:
+                    rows = future.result()
+                except BrokenProcessPool:
+                    _discard_fallback_pool(self.processes, pool)
+                    pool = None
+            yield from rows if rows is not None else _fallback_rows(chunk, fields)
+
+    def extract_row(self, doc: Dict[str, str], fields: List[str]) -> Dict[str, str]:
+        """One record for ``doc`` from the typed recognizers alone.
+
+        Fields sharing a recognizer take its 1st, 2nd, ... unique match in order.
+        """
+        row: Dict[str, str] = {"document": doc["name"]}
+        kinds = [recognizer_for(field) for field in fields]
+        wanted: Dict[str, int | None] = {}
+        for kind in kinds:
+            wanted[kind] = (wanted.get(kind) or 0) + 1
+        found = self.scan(doc, wanted)
+        taken: Dict[str, int] = {}
+        for field, kind in zip(fields, kinds):
+            position = taken.get(kind, 0)
+            taken[kind] = position + 1
+            values = found.get(kind, [])
+            row[field] = values[position] if position < len(values) else ""
+        return row
+
+    def entities(self, doc: Dict[str, str], limit: int | None = None, kind: str = "name") -> List[str]:
+        """Unique ``kind`` entities in first-seen order.
+
+        Scanning stops as soon as ``limit`` unique entities are found;
+        ``limit=None`` scans the whole document.
+        """
+        return self.scan(doc, {kind: limit})[kind]
+
+    @staticmethod
+    def scan(doc: Dict[str, str], wanted: Dict[str, int | None]) -> Dict[str, List[str]]:
+        """Single-pass scan for ``wanted[kind]`` unique matches of each recognizer kind (``None`` = all)."""
+        scanner = scanner_for(wanted)
+        if isinstance(doc, Document) and doc.stream_backed:
+            with doc.buffer() as buffer:
+                return scanner.scan(buffer, wanted)
+        return scanner.scan(doc.get("text", ""), wanted)
+
+
+_fallback_pools: Dict[int, ProcessPoolExecutor] = {}
+_fallback_pools_lock = threading.Lock()
+
+
+def _fallback_pool(processes: int) -> ProcessPoolExecutor:
+    """Process pool shared by every fallback run with the same worker count."""
+    with _fallback_pools_lock:
+        pool = _fallback_pools.get(processes)
+        if pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(method))
+            _fallback_pools[processes] = pool
+        return pool
+
+
+def _discard_fallback_pool(processes: int, pool: ProcessPoolExecutor | None) -> None:
+    """Forget a broken pool so the next run creates a new one."""
+    if pool is None:
+        return
+    with _fallback_pools_lock:
+        if _fallback_pools.get(processes) is pool:
+            del _fallback_pools[processes]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _fallback_rows(
+    documents: List[Dict[str, str]],
+    fields: List[str],
+    recognizers: Tuple[Recognizer, ...] | None = None,
+) -> List[Tuple[Dict[str, str], float]]:
+    """Process-pool task: scan one chunk of documents in-process with the parent's ``recognizers``."""
+    if recognizers is not None:
+        use_registry(recognizers)
+    extractor = RegexFallbackExtractor(processes=0)
+    rows: List[Tuple[Dict[str, str], float]] = []
+    for doc in documents:
+        started = time.perf_counter()
+        rows.append((extractor.extract_row(doc, fields), time.perf_counter() - started))
+    return rows
@@ -0,0 +1,467 @@
+"""Dictionary-backed extraction for closed-set fields (SKUs, customer names, subsidiaries, ...)."""
+
+from __future__ import annotations
+
+from collections import deque
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from urllib.parse import quote, unquote
+
+from extractor import (
+    BaseExtractor,
+    DocumentCallback,
+    DocumentOutcome,
+    DocumentStartCallback,
+    ExtractionResult,
+)
+from json_state import load_state, save_state, write_atomic
+from settings import env_flag, env_int, env_path
+
+
+class AhoCorasick:
+    """Pure-Python Aho-Corasick automaton over ``(term, field, value)`` entries.
+
+    :meth:`scan` walks the text once, so its cost depends on the text length
+    and the number of matches, not on how many terms were compiled. With
+    ``case_fold`` both terms and text are ``str.casefold``-ed; match offsets
+    always refer to the original text. :meth:`to_state`/:meth:`from_state`
+    round-trip the compiled tables through plain JSON types.
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, entries: Iterable[Tuple[str, str, str]], case_fold: bool = True) -> None:
+        self.case_fold = case_fold
+        self.payloads: List[Tuple[str, str, int]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[int]] = [[]]
+
+        for term, field, value in entries:
+            key = self._fold(term)
+            if not key:
+                continue
+            state = 0
+            for char in key:
+                following = self._goto[state].get(char)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto.append({})
+                    self._out.append([])
+                    self._goto[state][char] = following
+                state = following
+            self._out[state].append(len(self.payloads))
+            self.payloads.append((field, value, len(key)))
+
+        self.max_length = max((length for _, _, length in self.payloads), default=1)
+        self._fail = [0] * len(self._goto)
+        self._link = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[following] = target
+                self._link[following] = target if self._out[target] else self._link[target]
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def to_state(self) -> Dict[str, object]:
+        return {
+            "version": self.FORMAT_VERSION,
+            "case_fold": self.case_fold,
+            "payloads": self.payloads,
+            "goto": self._goto,
+            "out": self._out,
+            "fail": self._fail,
+            "link": self._link,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, object]) -> "AhoCorasick":
+        """Rebuild from :meth:`to_state` output; raises ``ValueError`` on anything inconsistent."""
+        if not isinstance(state, dict) or state.get("version") != cls.FORMAT_VERSION:
+            raise ValueError("unsupported automaton format")
+        goto, out, fail, link = state["goto"], state["out"], state["fail"], state["link"]
+        payloads = [(str(field), str(value), int(length)) for field, value, length in state["payloads"]]
+        states = len(goto)
+        if not states or not len(out) == len(fail) == len(link) == states:
+            raise ValueError("automaton tables differ in size")
+        if not all(isinstance(row, dict) for row in goto) or not all(isinstance(row, list) for row in out):
+            raise ValueError("malformed automaton tables")
+        for table in (fail, link, *(row.values() for row in goto)):
+            if any(not isinstance(target, int) or not 0 <= target < states for target in table):
+                raise ValueError("automaton state out of range")
+        if any(not isinstance(index, int) or not 0 <= index < len(payloads) for row in out for index in row):
+            raise ValueError("automaton payload out of range")
+        if any(length < 1 for _, _, length in payloads):
+            raise ValueError("automaton payload has no length")
+
+        automaton = cls((), case_fold=bool(state["case_fold"]))
+        automaton.payloads = payloads
+        automaton._goto, automaton._out, automaton._fail, automaton._link = goto, out, fail, link
+        automaton.max_length = max((length for _, _, length in payloads), default=1)
+        return automaton
+
+    def scan(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(start, end, payload_index)`` for every (possibly overlapping) match."""
+        goto, fail, out, link = self._goto, self._fail, self._out, self._link
+        payloads = self.payloads
+        size = self.max_length
+        origins = [0] * size
+        position = 0
+        state = 0
+        for index, original in enumerate(text):
+            for char in self._fold(original):
+                origins[position % size] = index
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                match_state = state if out[state] else link[state]
+                while match_state:
+                    for payload in out[match_state]:
+                        start = origins[(position - payloads[payload][2] + 1) % size]
+                        yield start, index + 1, payload
+                    match_state = link[match_state]
+                position += 1
+
+    def _fold(self, text: str) -> str:
+        return text.casefold() if self.case_fold else text
+
+
+class GazetteerExtractor(BaseExtractor):
+    """Fills fields from term lists with one Aho-Corasick pass per document.
+
+    Each field has its own term list and automaton, compiled on first use
+    and again only after :meth:`add_terms` changes that field, so one upload
+    never recompiles the other lists. The compiled tables are cached as JSON
+    under ``cache_dir`` keyed by the field and a hash of its terms (restarts
+    with the same lists skip compilation); saving a field's new automaton
+    deletes the one it supersedes. Values are the listed spelling of each term,
+    joined with ``"; "`` like the model engine. With ``word_boundaries`` a
+    match must not be flanked by letters, digits or underscores. With
+    ``terms_dir``, :meth:`save_terms` writes a field's list there so it is
+    loaded again on the next start.
+    """
+
+    def __init__(
+        self,
+        terms: Dict[str, Iterable[str]] | None = None,
+        cache_dir: str | None = os.path.join(".cache", "gazetteers"),
+        case_fold: bool = True,
+        word_boundaries: bool = True,
+        terms_dir: str | None = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.case_fold = case_fold
+        self.word_boundaries = word_boundaries
+        self.terms_dir = terms_dir
+        self._terms: Dict[str, Tuple[str, List[str]]] = {}
+        self._automata: Dict[str, AhoCorasick] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for field, field_terms in (terms or {}).items():
+            self.add_terms(field, field_terms)
+
+    @classmethod
+    def from_env(cls) -> "GazetteerExtractor":
+        """Load ``<field>.txt`` term lists (one term per line) from ``EXTRACT_GAZETTEER_TERMS_DIR``."""
+        terms_dir = env_path("EXTRACT_GAZETTEER_TERMS_DIR", os.path.join(".cache", "gazetteer_terms"))
+        extractor = cls(
+            cache_dir=env_path("EXTRACT_GAZETTEER_CACHE_DIR", os.path.join(".cache", "gazetteers")),
+            case_fold=env_flag("EXTRACT_GAZETTEER_CASE_FOLD", True),
+            word_boundaries=env_flag("EXTRACT_GAZETTEER_WORD_BOUNDARIES", True),
+            terms_dir=terms_dir,
+        )
+        if terms_dir and os.path.isdir(terms_dir):
+            for filename in sorted(os.listdir(terms_dir)):
+                stem, extension = os.path.splitext(filename)
+                if extension.lower() in (".txt", ".csv"):
+                    with open(os.path.join(terms_dir, filename), encoding="utf-8", errors="ignore") as handle:
+                        extractor.add_terms(unquote(stem), handle)
+        return extractor
+
+    def add_terms(self, field: str, terms: Iterable[str]) -> int:
+        """Merge ``terms`` into ``field``'s list; returns the field's term count."""
+        key = field.strip().lower()
+        cleaned = {term.strip() for term in terms if term.strip()}
+        with self._lock:
+            name, existing = self._terms.get(key, (field.strip(), []))
+            merged = sorted(set(existing) | cleaned)
+            self._terms[key] = (name, merged)
+            self._automata.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            return len(merged)
+
+    def save_terms(self, field: str) -> str | None:
+        """Write ``field``'s term list to ``terms_dir``; returns the file path (``None`` without a directory).
+
+        The file name is the percent-encoded field name, so it cannot leave
+        ``terms_dir`` and :meth:`from_env` decodes it back to the same field.
+        """
+        with self._lock:
+            entry = self._terms.get(field.strip().lower())
+        if not self.terms_dir or entry is None:
+            return None
+        name, terms = entry
+        path = os.path.join(self.terms_dir, quote(name, safe=" -_").replace(".", "%2E") + ".txt")
+        write_atomic(path, "".join(f"{term}\n" for term in terms))
+        return path
+
+    def fields(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: len(terms) for name, terms in self._terms.values()}
+
+    def covered(self, fields: List[str]) -> List[str]:
+        """The subset of ``fields`` that have a term list."""
+        with self._lock:
+            return [field for field in fields if field.strip().lower() in self._terms]
+
+    def extract(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> ExtractionResult:
+        covered = self.covered(fields)
+        started = time.perf_counter()
+        automata = {field.strip().lower(): self._automaton(field.strip().lower()) for field in covered}
+        logs = [f"Gazetteer matching {len(covered)} of {len(fields)} field(s) against term lists."]
+        missing = [field for field in fields if field not in covered]
+        if missing:
+            logs.append(f"No term list for: {', '.join(missing)}.")
+
+        records: List[Dict[str, str]] = []
+        timings: List[Dict[str, object]] = []
+        for index, doc in enumerate(documents):
+            if on_document_start is not None:
+                on_document_start(index)
+            doc_started = time.perf_counter()
+            row = self.match_row(doc, fields, automata)
+            elapsed = time.perf_counter() - doc_started
+            records.append(row)
+            timings.append({"document": doc["name"], "seconds": round(elapsed, 4)})
+            if on_document is not None:
+                on_document(index, DocumentOutcome(row=row, logs=[], seconds=elapsed))
+
+        logs.append(f"Gazetteer scanned {len(documents)} document(s) in {time.perf_counter() - started:.2f}s.")
+        return ExtractionResult(records=records, logs=logs, engine="gazetteer", timings=timings)
+
+    def match_row(
+        self,
+        doc: Dict[str, str],
+        fields: List[str],
+        automata: Dict[str, AhoCorasick] | None = None,
+    ) -> Dict[str, str]:
+        """One record for ``doc``: leftmost-longest, non-overlapping matches per field.
+
+        ``automata`` maps lower-cased field names to compiled automata; missing ones are built on demand.
+        """
+        row: Dict[str, str] = {"document": doc["name"], **{field: "" for field in fields}}
+        wanted: Set[str] = {field.strip().lower() for field in self.covered(fields)}
+        if not wanted:
+            return row
+
+        text = doc.get("text", "")
+        by_field: Dict[str, List[Tuple[int, int, str]]] = {}
+        for field_key in wanted:
+            automaton = (automata or {}).get(field_key)
+            if automaton is None:
+                automaton = self._automaton(field_key)
+            for start, end, payload in automaton.scan(text):
+                if self.word_boundaries and not self._at_boundaries(text, start, end):
+                    continue
+                _field, value, _length = automaton.payloads[payload]
+                by_field.setdefault(field_key, []).append((start, end, value))
+
+        for field in fields:
+            matches = sorted(by_field.get(field.strip().lower(), []), key=lambda match: (match[0], -match[1]))
+            values: Dict[str, None] = {}
+            position = 0
+            for start, end, value in matches:
+                if start >= position:
+                    values[value] = None
+                    position = end
+            row[field] = "; ".join(values)
+        return row
+
+    @staticmethod
+    def _at_boundaries(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not (before.isalnum() or before == "_" or after.isalnum() or after == "_")
+
+    def _automaton(self, key: str) -> AhoCorasick:
+        """``key``'s automaton, from memory, the JSON cache or a fresh compile."""
+        with self._lock:
+            automaton = self._automata.get(key)
+            if automaton is not None:
+                return automaton
+            generation = self._generations.get(key, 0)
+            terms = list(self._terms.get(key, ("", []))[1])
+
+        digest = hashlib.sha256(f"{AhoCorasick.FORMAT_VERSION}:{self.case_fold}:{key}".encode("utf-8"))
+        for term in terms:
+            digest.update(f"{term}\n".encode("utf-8"))
+        prefix = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(self.cache_dir, f"{prefix}-{digest.hexdigest()}.json") if self.cache_dir else None
+
+        automaton = self._load(path)
+        if automaton is None:
+            automaton = AhoCorasick(((term, key, term) for term in terms), case_fold=self.case_fold)
+            self._save(path, automaton)
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._automata[key] = automaton
+        return automaton
+
+    @staticmethod
+    def _load(path: str | None) -> AhoCorasick | None:
+        state = load_state(path, version=AhoCorasick.FORMAT_VERSION)
+        if state is None:
+            return None
+        try:
+            return AhoCorasick.from_state(state)
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    @staticmethod
+    def _save(path: str | None, automaton: AhoCorasick) -> None:
+        """Cache ``automaton`` at ``path`` and delete the field's superseded cache files."""
+        if not path:
+            return
+        save_state(path, json.dumps(automaton.to_state(), ensure_ascii=False, separators=(",", ":")))
+        directory, filename = os.path.split(path)
+        prefix = filename.split("-", 1)[0] + "-"
+        try:
+            stale = [name for name in os.listdir(directory) if name.startswith(prefix) and name != filename]
+        except OSError:
+            return
+        for name in stale:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+class LearnedGazetteer:
+    """Per-field entity dictionary learned from model extractions.
+
+    :meth:`observe` records the values the model returned for each field.
+    Values seen at least ``min_count`` times become terms of a
+    :class:`GazetteerExtractor` that is recompiled at most every
+    ``rebuild_seconds``; :meth:`guess` matches them against new documents.
+    Whether a guess is trusted over the model is decided by
+    :class:`routing.ConfidenceRouter`. State is saved as JSON to ``path``.
+    """
+
+    def __init__(
+        self,
+        path: str | None = os.path.join(".cache", "learned_gazetteer.json"),
+        min_count: int = 2,
+        max_terms_per_field: int = 50_000,
+        rebuild_seconds: float = 30.0,
+        save_every: int = 25,
+    ) -> None:
+        self.path = path
+        self.min_count = max(1, min_count)
+        self.max_terms_per_field = max(1, max_terms_per_field)
+        self.rebuild_seconds = rebuild_seconds
+        self.save_every = max(1, save_every)
+        self._fields: Dict[str, Dict[str, object]] = {}
+        self._matcher: GazetteerExtractor | None = None
+        self._stale = True
+        self._built_at = float("-inf")
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> "LearnedGazetteer | None":
+        if not env_flag("EXTRACT_LEARNED_GAZETTEER", True):
+            return None
+        return cls(
+            path=env_path("EXTRACT_LEARNED_GAZETTEER_PATH", os.path.join(".cache", "learned_gazetteer.json")),
+            min_count=env_int("EXTRACT_LEARNED_MIN_COUNT", 2),
+        )
+
+    def guess(self, text: str, fields: List[str]) -> Dict[str, List[str]]:
+        """Known terms of ``fields`` found in ``text`` (empty lists where none matched)."""
+        matcher = self._current_matcher()
+        if matcher is None or not fields:
+            return {field: [] for field in fields}
+        row = matcher.match_row({"name": "", "text": text}, fields)
+        return {field: row[field].split("; ") if row[field] else [] for field in fields}
+
+    def observe(self, values: Dict[str, List[str]]) -> None:
+        """Learn from one document's model output."""
+        with self._lock:
+            for field, field_values in values.items():
+                state = self._fields.setdefault(field.strip().lower(), {"field": field, "terms": {}, "seen": 0})
+                state["seen"] += 1
+
+                terms: Dict[str, List[object]] = state["terms"]
+                for value in field_values:
+                    entry = terms.setdefault(value.casefold(), [value, 0])
+                    entry[1] += 1
+                    if entry[1] == self.min_count:
+                        self._stale = True
+                if len(terms) > self.max_terms_per_field:
+                    for key in sorted(terms, key=lambda key: terms[key][1])[: len(terms) - self.max_terms_per_field]:
+                        del terms[key]
+                    self._stale = True
+            self._unsaved += 1
+            save = self._unsaved >= self.save_every
+        if save:
+            self.save()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            fields = {
+                state["field"]: {
+                    "terms": sum(1 for _, count in state["terms"].values() if count >= self.min_count),
+                    "candidates": len(state["terms"]),
+                    "observations": state["seen"],
+                }
+                for state in self._fields.values()
+            }
+            return {"fields": fields}
+
+    def save(self) -> None:
+        with self._lock:
+            self._unsaved = 0
+            if not self.path:
+                return
+            payload = json.dumps({"version": 1, "fields": self._fields})
+        save_state(self.path, payload)
+
+    def _load(self) -> None:
+        payload = load_state(self.path, version=1)
+        if payload is not None:
+            self._fields = payload.get("fields", {})
+
+    def _current_matcher(self) -> GazetteerExtractor | None:
+        with self._lock:
+            rebuild = self._stale and time.monotonic() - self._built_at >= self.rebuild_seconds
+            if not rebuild:
+                return self._matcher
+            terms = {
+                state["field"]: [value for value, count in state["terms"].values() if count >= self.min_count]
+                for state in self._fields.values()
+            }
+            self._stale = False
+            self._built_at = time.monotonic()
+        matcher = GazetteerExtractor({field: values for field, values in terms.items() if values}, cache_dir=None)
+        with self._lock:
+            self._matcher = matcher
+        return matcher
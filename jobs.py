@@ -0,0 +1,237 @@
+"""Extraction jobs: an in-memory registry plus a background worker pool."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field as dataclass_field
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+import uuid
+
+from extractor import DocumentOutcome, ExtractionResult
+
+
+@dataclass
+class Job:
+    job_id: str
+    documents: List[Dict[str, str]]
+    fields: List[str]
+    records: List[Dict[str, str]] = dataclass_field(default_factory=list)
+    logs: List[str] = dataclass_field(default_factory=list)
+    engine: str = ""
+    created: float = dataclass_field(default_factory=time.time)
+    status: str = "queued"
+    error: str = ""
+    completed: int = 0
+    fallback_documents: int = 0
+    started: float | None = None
+    finished: float | None = None
+    timings: List[Dict[str, object]] = dataclass_field(default_factory=list, repr=False)
+    events: List[Dict[str, object]] = dataclass_field(default_factory=list, repr=False)
+    _partial: Dict[int, Dict[str, str]] = dataclass_field(default_factory=dict, repr=False)
+    _lock: threading.Condition = dataclass_field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def record_document_start(self, index: int) -> None:
+        with self._lock:
+            self._emit("started", {"index": index, "document": self._document_name(index)})
+
+    def record_document(self, index: int, outcome: DocumentOutcome) -> None:
+        with self._lock:
+            if index not in self._partial:
+                self.completed += 1
+                self.fallback_documents += int(outcome.fallback)
+            self._partial[index] = outcome.row
+            self._emit(
+                "fallback" if outcome.fallback else "finished",
+                {
+                    "index": index,
+                    "document": self._document_name(index),
+                    "seconds": round(outcome.seconds, 4),
+                    "cache": outcome.cache,
+                    "completed": self.completed,
+                    "total": len(self.documents),
+                },
+            )
+
+    def wait_events(self, cursor: int, timeout: float) -> Tuple[List[Dict[str, object]], bool]:
+        """Events after ``cursor`` (blocking up to ``timeout`` for new ones) and whether the job is done.
+
+        Stored events stay small; records are attached from the job's own
+        state as the events are read, so each record is held once.
+        """
+        with self._lock:
+            if cursor >= len(self.events) and not self.done:
+                self._lock.wait(timeout)
+            return [self._with_records(event) for event in self.events[cursor:]], self.done
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            if self.status == "completed":
+                records = list(self.records)
+            else:
+                records = [self._partial[index] for index in sorted(self._partial)]
+            return {
+                "jobId": self.job_id,
+                "status": self.status,
+                "fields": ["document", *self.fields],
+                "total": len(self.documents),
+                "completed": self.completed,
+                "fallbackDocuments": self.fallback_documents,
+                "records": records,
+                "logs": list(self.logs),
+                "engine": self.engine,
+                "error": self.error,
+                "elapsedSeconds": round((self.finished or time.time()) - (self.started or self.created), 3),
+            }
+
+    def _document_name(self, index: int) -> str:
+        if 0 <= index < len(self.documents):
+            return self.documents[index].get("name", "")
+        return ""
+
+    def _with_records(self, event: Dict[str, object]) -> Dict[str, object]:
+        """``event`` with the record(s) it reports; the caller must hold ``_lock``."""
+        data: Dict[str, object] = event["data"]
+        if event["event"] in ("finished", "fallback"):
+            index = data["index"]
+            if self.status == "completed" and index < len(self.records):
+                record = self.records[index]
+            else:
+                record = self._partial.get(index, {})
+            data = {**data, "record": record}
+        elif event["event"] == "completed":
+            data = {
+                **data,
+                "fields": ["document", *self.fields],
+                "records": self.records,
+                "logs": self.logs,
+                "timings": self.timings,
+            }
+        return {**event, "data": data}
+
+    def _emit(self, event: str, data: Dict[str, object]) -> None:
+        """Append an event; the caller must hold ``_lock``."""
+        self.events.append({"id": len(self.events), "event": event, "data": data})
+        self._lock.notify_all()
+
+
+class JobStore:
+    """Bounded, thread-safe store of recent jobs (oldest finished jobs evicted first).
+
+    Jobs keep their documents so later runs can add fields to them; besides
+    ``max_jobs`` the store is bounded by ``max_document_bytes`` of retained
+    document content (documents shared between jobs are counted once).
+    """
+
+    def __init__(
+        self,
+        max_jobs: int = 100,
+        ttl_seconds: float = 6 * 3600,
+        max_document_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.max_jobs = max(1, max_jobs)
+        self.ttl_seconds = ttl_seconds
+        self.max_document_bytes = max(0, max_document_bytes)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, documents: List[Dict[str, str]], fields: List[str]) -> Job:
+        job = Job(job_id=uuid.uuid4().hex, documents=documents, fields=list(fields))
+        with self._lock:
+            self._purge()
+            self._jobs[job.job_id] = job
+            evicted: List[Job] = []
+            for job_id in [job_id for job_id, old in self._jobs.items() if old.done]:
+                if len(self._jobs) <= self.max_jobs and self._document_bytes() <= self.max_document_bytes:
+                    break
+                evicted.append(self._jobs.pop(job_id))
+            self._close_documents(evicted)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def _document_bytes(self) -> int:
+        retained = {id(doc): doc for job in self._jobs.values() for doc in job.documents}
+        return sum(_document_size(doc) for doc in retained.values())
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.created < cutoff]
+        self._close_documents([self._jobs.pop(job_id) for job_id in expired])
+
+    def _close_documents(self, dropped: List[Job]) -> None:
+        """Release the spooled uploads of dropped jobs unless a retained job still shares them."""
+        retained = {id(doc) for job in self._jobs.values() for doc in job.documents}
+        for job in dropped:
+            for doc in job.documents:
+                close = getattr(doc, "close", None)
+                if id(doc) not in retained and close is not None:
+                    close()
+
+
+def _document_size(doc: Dict[str, str]) -> int:
+    size = getattr(doc, "size", None)
+    return size if isinstance(size, int) else len(doc.get("text", ""))
+
+
+JobWork = Callable[[Job], ExtractionResult]
+
+
+class JobRunner:
+    """Runs job work either inline (synchronous API) or on a shared background pool."""
+
+    def __init__(self, max_workers: int = 2) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="extract-job")
+
+    def submit(self, job: Job, work: JobWork) -> None:
+        def run_quietly() -> None:
+            try:
+                self.run(job, work)
+            except Exception:  # noqa: BLE001
+                pass
+
+        self._executor.submit(run_quietly)
+
+    def run(self, job: Job, work: JobWork) -> ExtractionResult:
+        """Execute ``work`` for ``job`` in the calling thread; failures are recorded and re-raised."""
+        with job._lock:
+            job.status = "running"
+            job.started = time.time()
+            job._emit("running", {"total": len(job.documents)})
+        try:
+            result = work(job)
+        except Exception as err:
+            with job._lock:
+                job.status = "failed"
+                job.error = str(err)
+                job.finished = time.time()
+                job._emit("failed", {"error": job.error})
+            raise
+
+        with job._lock:
+            job.records = result.records
+            job.logs = result.logs
+            job.engine = result.engine
+            job.timings = result.timings
+            job.completed = len(result.records)
+            job.status = "completed"
+            job.finished = time.time()
+            job._partial.clear()
+            job._emit(
+                "completed",
+                {
+                    "jobId": job.job_id,
+                    "engine": result.engine,
+                    "elapsedSeconds": round(job.finished - job.started, 3),
+                },
+            )
+        return result
@@ -0,0 +1,50 @@
+"""Versioned JSON state files written atomically (learned dictionaries, router agreement, ...)."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from typing import Dict
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Replace ``path`` with ``text`` via a temporary file, so readers never see a partial write.
+
+    Every call gets its own temporary file, so concurrent writers (threads included) never share one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def save_state(path: str | None, payload: str) -> None:
+    """Best-effort :func:`write_atomic` of an already serialized state; I/O errors are ignored."""
+    if not path:
+        return
+    try:
+        write_atomic(path, payload)
+    except OSError:
+        pass
+
+
+def load_state(path: str | None, version: int) -> Dict[str, object] | None:
+    """The JSON object at ``path`` if it carries ``"version": version``; ``None`` if missing or unreadable."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) and payload.get("version") == version else None
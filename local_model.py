@@ -0,0 +1,470 @@
+"""CPU-only sequence tagger distilled from cached Gemini extractions.
+
+Train it offline from an extraction cache populated with
+``EXTRACT_CACHE_STORE_TEXT=1``::
+
+    python -m local_model train --cache-path .cache/extractions.sqlite3
+
+Each run writes a new versioned artifact (``local-tagger-<UTC time>.json``)
+to the model directory; :meth:`LocalModelExtractor.from_env` loads the
+newest one.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from datetime import datetime, timezone
+import glob
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from extraction_cache import ExtractionCache
+from extractor import (
+    BaseExtractor,
+    DocumentCallback,
+    DocumentOutcome,
+    DocumentStartCallback,
+    ExtractionResult,
+    RegexFallbackExtractor,
+)
+from json_state import write_atomic
+from settings import env_path
+
+FORMAT_VERSION = 1
+ARTIFACT_PREFIX = "local-tagger-"
+TOKEN_PATTERN = re.compile(r"\w+(?:[.'@&/-]\w+)*|[^\w\s]")
+OUTSIDE = "O"
+
+Token = Tuple[str, int, int]
+Example = Tuple[List[Token], List[str], Set[str]]
+
+
+def tokenize(text: str) -> List[Token]:
+    """``(token, start, end)`` for every word or punctuation mark."""
+    return [(match.group(), match.start(), match.end()) for match in TOKEN_PATTERN.finditer(text)]
+
+
+def _shape(word: str) -> str:
+    shape = re.sub(r"[A-Z]+", "X", word)
+    shape = re.sub(r"[a-z]+", "x", shape)
+    return re.sub(r"\d+", "d", shape)
+
+
+class AveragedPerceptron:
+    """Multiclass perceptron over sparse string features with weight averaging."""
+
+    def __init__(self, weights: Dict[str, Dict[str, float]] | None = None) -> None:
+        self.weights: Dict[str, Dict[str, float]] = weights or {}
+        self._totals: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._stamps: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._instances = 0
+
+    def scores(self, features: Iterable[str], labels: Sequence[str]) -> Dict[str, float]:
+        scores = dict.fromkeys(labels, 0.0)
+        for feature in features:
+            weights = self.weights.get(feature)
+            if not weights:
+                continue
+            for label, weight in weights.items():
+                if label in scores:
+                    scores[label] += weight
+        return scores
+
+    def update(self, truth: str, guess: str, features: Iterable[str]) -> None:
+        self._instances += 1
+        if truth == guess:
+            return
+        for feature in features:
+            weights = self.weights.setdefault(feature, {})
+            for label, delta in ((truth, 1.0), (guess, -1.0)):
+                key = (feature, label)
+                current = weights.get(label, 0.0)
+                self._totals[key] += (self._instances - self._stamps[key]) * current
+                self._stamps[key] = self._instances
+                weights[label] = current + delta
+
+    def average(self, min_weight: float = 1e-3) -> None:
+        """Replace weights by their average over all updates and drop near-zero ones."""
+        averaged: Dict[str, Dict[str, float]] = {}
+        for feature, weights in self.weights.items():
+            kept: Dict[str, float] = {}
+            for label, weight in weights.items():
+                key = (feature, label)
+                total = self._totals[key] + (self._instances - self._stamps[key]) * weight
+                value = round(total / max(self._instances, 1), 4)
+                if abs(value) >= min_weight:
+                    kept[label] = value
+            if kept:
+                averaged[feature] = kept
+        self.weights = averaged
+
+
+class LocalTagger:
+    """Greedy BIO tagger with one ``B-``/``I-`` label pair per field.
+
+    Training only considers the labels of the fields a cache entry was
+    extracted for, so it teaches those fields and says nothing about the
+    others.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str] | None = None,
+        weights: Dict[str, Dict[str, float]] | None = None,
+        metadata: Dict[str, object] | None = None,
+    ) -> None:
+        self.fields = fields or {}
+        self.model = AveragedPerceptron(weights)
+        self.metadata = metadata or {}
+
+    @property
+    def version(self) -> str:
+        return str(self.metadata.get("version", "untrained"))
+
+    def knows(self, field: str) -> bool:
+        return field.strip().lower() in self.fields
+
+    def evaluation(self, field: str) -> Dict[str, float]:
+        return self.metadata.get("evaluation", {}).get(field.strip().lower(), {})
+
+    @staticmethod
+    def labels(keys: Iterable[str]) -> List[str]:
+        labels = [OUTSIDE]
+        for key in sorted(keys):
+            labels.extend((f"B-{key}", f"I-{key}"))
+        return labels
+
+    @staticmethod
+    def features(tokens: Sequence[Token], index: int, previous: str, before_previous: str) -> List[str]:
+        word = tokens[index][0]
+        lower = word.lower()
+        features = [
+            "bias",
+            f"w={lower}",
+            f"suf={lower[-3:]}",
+            f"pre={lower[:1]}",
+            f"shape={_shape(word)}",
+            f"t-1={previous}",
+            f"t-2,t-1={before_previous},{previous}",
+            f"t-1,w={previous},{lower}",
+            f"w-1={tokens[index - 1][0].lower() if index > 0 else '<s>'}",
+            f"w+1={tokens[index + 1][0].lower() if index + 1 < len(tokens) else '</s>'}",
+        ]
+        if word[:1].isupper():
+            features.append("title")
+        if word.isupper() and len(word) > 1:
+            features.append("upper")
+        if any(char.isdigit() for char in word):
+            features.append("digit")
+        return features
+
+    def tag(self, tokens: Sequence[Token], keys: Iterable[str]) -> List[Tuple[str, float]]:
+        """``(label, probability)`` per token, decoded left to right."""
+        labels = self.labels(keys)
+        output: List[Tuple[str, float]] = []
+        previous, before_previous = "<s>", "<s>"
+        for index in range(len(tokens)):
+            scores = self.model.scores(self.features(tokens, index, previous, before_previous), labels)
+            for label in labels:
+                if label.startswith("I-") and previous[2:] != label[2:]:
+                    scores[label] = -math.inf
+            best = max(scores, key=scores.get)
+            top = scores[best]
+            norm = sum(math.exp(score - top) for score in scores.values() if score != -math.inf)
+            output.append((best, 1.0 / norm))
+            before_previous, previous = previous, best
+        return output
+
+    def predict(self, text: str, fields: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """Unique values per known field with the lowest token probability of each span."""
+        keys = {field.strip().lower(): field for field in fields if self.knows(field)}
+        found: Dict[str, Dict[str, float]] = {field: {} for field in keys.values()}
+        if not keys:
+            return {}
+        tokens = tokenize(text)
+        span: Tuple[str, int, int, float] | None = None
+
+        def close() -> None:
+            if span is not None:
+                key, start, end, confidence = span
+                value = text[start:end]
+                values = found[keys[key]]
+                values[value] = max(values.get(value, 0.0), confidence)
+
+        # Decode with every trained field so a mention of an unrequested field is not forced into a requested one.
+        for (_, start, end), (label, probability) in zip(tokens, self.tag(tokens, self.fields)):
+            if label.startswith("I-") and span is not None:
+                span = (span[0], span[1], end, min(span[3], probability))
+                continue
+            close()
+            span = (label[2:], start, end, probability) if label.startswith("B-") and label[2:] in keys else None
+        close()
+        return {field: list(values.items()) for field, values in found.items()}
+
+    def train(self, examples: List[Example], epochs: int = 5, seed: int = 0) -> None:
+        order = list(examples)
+        shuffle = random.Random(seed).shuffle
+        for _ in range(epochs):
+            shuffle(order)
+            for tokens, gold, keys in order:
+                labels = self.labels(keys)
+                previous, before_previous = "<s>", "<s>"
+                for index, truth in enumerate(gold):
+                    features = self.features(tokens, index, previous, before_previous)
+                    scores = self.model.scores(features, labels)
+                    guess = max(scores, key=scores.get)
+                    self.model.update(truth, guess, features)
+                    before_previous, previous = previous, truth
+        self.model.average()
+
+    def save(self, directory: str) -> str:
+        path = os.path.join(directory, f"{ARTIFACT_PREFIX}{self.version}.json")
+        payload = {"format": FORMAT_VERSION, "fields": self.fields, "weights": self.model.weights, **self.metadata}
+        write_atomic(path, json.dumps(payload))
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "LocalTagger":
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+        if payload.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported local model format in {path}: {payload.get('format')!r}")
+        fields = payload.pop("fields")
+        weights = payload.pop("weights")
+        return cls(fields=fields, weights=weights, metadata=payload)
+
+
+def latest_artifact(directory: str) -> str | None:
+    """Newest artifact in ``directory``; versions are UTC timestamps, so names sort by age."""
+    paths = sorted(glob.glob(os.path.join(directory, f"{ARTIFACT_PREFIX}*.json")))
+    return paths[-1] if paths else None
+
+
+def training_examples(cache: ExtractionCache) -> Iterator[Tuple[Example, Dict[str, str]]]:
+    """BIO-labelled token sequences for every cache entry that kept its document text.
+
+    Each extracted value is labelled at every whole-word occurrence in the
+    text; values that cannot be found are skipped. Also yields the field
+    display names seen in each entry.
+    """
+    for value in cache.iter_values():
+        text = value.get("text")
+        if not isinstance(text, str) or not text.strip():
+            continue
+        keys = set(value.get("fields", []))
+        tokens = tokenize(text)
+        starts = {start: index for index, (_, start, _) in enumerate(tokens)}
+        gold = [OUTSIDE] * len(tokens)
+        names: Dict[str, str] = {}
+        for klass, extracted in value.get("extractions", []):
+            key = klass.strip().lower()
+            if key not in keys or not extracted.strip():
+                continue
+            names.setdefault(key, klass)
+            for match in re.finditer(rf"(?<!\w){re.escape(extracted.strip())}(?!\w)", text):
+                first = starts.get(match.start())
+                if first is None:
+                    continue
+                last = first
+                while last + 1 < len(tokens) and tokens[last + 1][2] <= match.end():
+                    last += 1
+                if any(label != OUTSIDE for label in gold[first : last + 1]):
+                    continue
+                gold[first] = f"B-{key}"
+                for index in range(first + 1, last + 1):
+                    gold[index] = f"I-{key}"
+        names.update({key: key for key in keys if key not in names})
+        yield (tokens, gold, keys), names
+
+
+def evaluate(tagger: LocalTagger, examples: List[Example]) -> Dict[str, Dict[str, float]]:
+    """Per-field precision/recall of predicted value sets against the held-out labels."""
+    counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for tokens, gold, keys in examples:
+        text_tokens = [token for token, _, _ in tokens]
+        expected: Dict[str, Set[str]] = defaultdict(set)
+        current: List[str] = []
+        key = ""
+        for token, label in zip(text_tokens + [""], gold + [OUTSIDE]):
+            if label.startswith("I-") and current:
+                current.append(token)
+                continue
+            if current:
+                expected[key].add(" ".join(current).casefold())
+            current, key = ([token], label[2:]) if label.startswith("B-") else ([], "")
+        predicted = tagger.predict(" ".join(text_tokens), sorted(keys))
+        for field in keys:
+            guessed = {value.casefold() for value, _ in predicted.get(field, [])}
+            correct = len(guessed & expected[field])
+            counts[field][0] += correct
+            counts[field][1] += len(guessed)
+            counts[field][2] += len(expected[field])
+    return {
+        field: {
+            "precision": round(correct / predicted, 4) if predicted else 0.0,
+            "recall": round(correct / expected, 4) if expected else 0.0,
+            "predicted": predicted,
+            "support": expected,
+        }
+        for field, (correct, predicted, expected) in counts.items()
+    }
+
+
+def train(
+    cache: ExtractionCache,
+    model_dir: str,
+    epochs: int = 5,
+    min_examples: int = 20,
+    holdout: float = 0.1,
+) -> str:
+    """Train a tagger from ``cache``, evaluate it on a held-out slice and write a new artifact."""
+    examples: List[Example] = []
+    fields: Dict[str, str] = {}
+    for example, names in training_examples(cache):
+        examples.append(example)
+        for key, name in names.items():
+            fields.setdefault(key, name)
+    if len(examples) < min_examples:
+        raise ValueError(
+            f"Only {len(examples)} cached document(s) with text; need {min_examples}. "
+            "Run extractions with EXTRACT_CACHE_STORE_TEXT=1 first."
+        )
+
+    random.Random(0).shuffle(examples)
+    held_out = examples[: int(len(examples) * holdout)]
+    training = examples[len(held_out) :]
+    started = time.perf_counter()
+    tagger = LocalTagger(fields=fields)
+    tagger.train(training, epochs=epochs)
+    tagger.metadata = {
+        "version": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "examples": len(training),
+        "held_out": len(held_out),
+        "epochs": epochs,
+        "training_seconds": round(time.perf_counter() - started, 2),
+    }
+    tagger.metadata["evaluation"] = evaluate(tagger, held_out) if held_out else {}
+    return tagger.save(model_dir)
+
+
+class LocalModelExtractor(BaseExtractor):
+    """Extractor backed by a trained :class:`LocalTagger`.
+
+    Fields the model was never trained on are filled by
+    :class:`RegexFallbackExtractor`. :meth:`candidates` scores the model's
+    values for :class:`routing.ConfidenceRouter`.
+    """
+
+    MIN_EVALUATED = 5
+
+    def __init__(self, tagger: LocalTagger) -> None:
+        self.tagger = tagger
+
+    @classmethod
+    def from_env(cls) -> "LocalModelExtractor | None":
+        """The newest artifact in ``EXTRACT_LOCAL_MODEL_DIR``, or ``None`` when there is none."""
+        directory = env_path("EXTRACT_LOCAL_MODEL_DIR", os.path.join(".cache", "models"))
+        path = latest_artifact(directory) if directory else None
+        if path is None:
+            return None
+        try:
+            return cls(LocalTagger.load(path))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def precision(self, field: str) -> float:
+        """Held-out precision of ``field``; 0 when fewer than ``MIN_EVALUATED`` values were predicted."""
+        evaluation = self.tagger.evaluation(field)
+        if evaluation.get("predicted", 0) < self.MIN_EVALUATED:
+            return 0.0
+        return float(evaluation.get("precision", 0.0))
+
+    def candidates(self, text: str, fields: List[str]) -> Dict[str, Tuple[List[str], float]]:
+        """Predicted values per known field, scored by held-out precision and the weakest span probability."""
+        scored: Dict[str, Tuple[List[str], float]] = {}
+        for field, values in self.tagger.predict(text, fields).items():
+            if values:
+                confidence = min([self.precision(field), *(probability for _, probability in values)])
+                scored[field] = ([value for value, _ in values], confidence)
+        return scored
+
+    def extract(
+        self,
+        documents: List[Dict[str, str]],
+        fields: List[str],
+        api_key_override: str | None = None,
+        on_document: DocumentCallback | None = None,
+        on_document_start: DocumentStartCallback | None = None,
+    ) -> ExtractionResult:
+        known = [field for field in fields if self.tagger.knows(field)]
+        unknown = [field for field in fields if field not in known]
+        logs = [f"Running local tagger {self.tagger.version} for {len(known)} of {len(fields)} field(s)."]
+        if unknown:
+            logs.append(f"Not in the local model, using fallback recognizers for: {', '.join(unknown)}.")
+        regex = RegexFallbackExtractor(processes=0)
+
+        records: List[Dict[str, str]] = []
+        timings: List[Dict[str, object]] = []
+        for index, doc in enumerate(documents):
+            if on_document_start is not None:
+                on_document_start(index)
+            started = time.perf_counter()
+            predicted = self.tagger.predict(doc.get("text", ""), known)
+            row = regex.extract_row(doc, unknown) if unknown else {"document": doc["name"]}
+            row.update({field: "; ".join(value for value, _ in predicted.get(field, [])) for field in known})
+            row = {"document": doc["name"], **{field: row.get(field, "") for field in fields}}
+            elapsed = time.perf_counter() - started
+            records.append(row)
+            timings.append({"document": doc["name"], "seconds": round(elapsed, 4)})
+            if on_document is not None:
+                on_document(index, DocumentOutcome(row=row, logs=[], seconds=elapsed, fallback=True))
+
+        logs.append(f"Local tagger generated {len(records)} record(s).")
+        return ExtractionResult(records=records, logs=logs, engine="local-tagger", timings=timings)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "version": self.tagger.version,
+            "fields": {name: self.tagger.evaluation(key) for key, name in self.tagger.fields.items()},
+        }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m local_model", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="Train a new artifact from the extraction cache.")
+    train_parser.add_argument(
+        "--cache-path",
+        default=os.getenv("EXTRACT_CACHE_PATH", os.path.join(".cache", "extractions.sqlite3")),
+    )
+    train_parser.add_argument(
+        "--model-dir",
+        default=os.getenv("EXTRACT_LOCAL_MODEL_DIR", os.path.join(".cache", "models")),
+    )
+    train_parser.add_argument("--epochs", type=int, default=5)
+    train_parser.add_argument("--min-examples", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    cache = ExtractionCache(path=args.cache_path, ttl_seconds=math.inf)
+    try:
+        path = train(cache, args.model_dir, epochs=args.epochs, min_examples=args.min_examples)
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 1
+    tagger = LocalTagger.load(path)
+    print(f"Wrote {path} ({tagger.metadata['examples']} training document(s)).")
+    for field, scores in sorted(tagger.metadata.get("evaluation", {}).items()):
+        name = tagger.fields.get(field, field)
+        print(f"  {name}: precision {scores['precision']:.2f}, recall {scores['recall']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""Process-wide admission control for Gemini calls."""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+import re
+import threading
+import time
+from typing import Deque, Dict, Iterator, List
+
+from settings import env_flag, env_float, env_int
+
+
+class TokenBucket:
+    """Continuously refilling budget of ``rate_per_minute`` units (``0`` means unlimited)."""
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None) -> None:
+        self.rate_per_minute = max(0.0, rate_per_minute)
+        self.capacity = capacity if capacity is not None else self.rate_per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate_per_minute <= 0
+
+    def level(self, now: float) -> float:
+        if self.unlimited:
+            return float("inf")
+        elapsed = max(0.0, now - self._updated)
+        self._level = min(self.capacity, self._level + elapsed * self.rate_per_minute / 60.0)
+        self._updated = now
+        return self._level
+
+    def clamp(self, amount: float) -> float:
+        return amount if self.unlimited else min(amount, self.capacity)
+
+    def seconds_until(self, amount: float, now: float) -> float:
+        if self.unlimited:
+            return 0.0
+        missing = self.clamp(amount) - self.level(now)
+        return max(0.0, missing * 60.0 / self.rate_per_minute)
+
+    def consume(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._level = self.level(now) - self.clamp(amount)
+
+
+# A status code in an error message only counts where APIs put it: at the start ("429 RESOURCE_EXHAUSTED"),
+# after a colon ("API error: 503 ...") or after "status"/"code"/"HTTP" -- never inside other numbers or text.
+STATUS_IN_MESSAGE = re.compile(r"(?:^\W*|:\s*|\b(?:status|code|http|error)\W{0,3})([1-5]\d\d)\b", re.IGNORECASE)
+RATE_LIMIT_MESSAGE = re.compile(
+    r"\bRESOURCE_EXHAUSTED\b|\b(?:rate[ -]?limit(?:ed)?|quota (?:exceeded|exhausted)"
+    r"|exceeded your (?:current )?quota|too many requests)\b",
+    re.IGNORECASE,
+)
+TIMEOUT_MESSAGE = re.compile(r"\b(?:timed out|DEADLINE_EXCEEDED|deadline exceeded)\b", re.IGNORECASE)
+
+
+def error_status(err: BaseException) -> int | str | None:
+    """HTTP status (or gRPC status name) of ``err`` from its attributes, else from its message."""
+    for source in (err, getattr(err, "response", None)):
+        for attr in ("code", "status_code", "status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int) and not isinstance(value, bool) and 100 <= value < 600:
+                return value
+            if isinstance(value, str) and value.isdigit() and len(value) == 3:
+                return int(value)
+            if isinstance(value, str) and value.isupper():
+                return value
+    match = STATUS_IN_MESSAGE.search(str(err))
+    return int(match.group(1)) if match else None
+
+
+def is_rate_limit_error(err: BaseException) -> bool:
+    """True for quota/rate-limit rejections (HTTP 429, ``RESOURCE_EXHAUSTED``): the service is up but busy."""
+    if error_status(err) in (429, "RESOURCE_EXHAUSTED"):
+        return True
+    return bool(RATE_LIMIT_MESSAGE.search(str(err)))
+
+
+def is_throttle_error(err: BaseException) -> bool:
+    """True for rate-limit rejections, overload (503/504) and timeouts, the signals that mean "back off"."""
+    if isinstance(err, TimeoutError) or "Timeout" in type(err).__name__ or is_rate_limit_error(err):
+        return True
+    if error_status(err) in (503, 504, "UNAVAILABLE", "DEADLINE_EXCEEDED"):
+        return True
+    return bool(TIMEOUT_MESSAGE.search(str(err)))
+
+
+class AimdController:
+    """TCP-style additive-increase / multiplicative-decrease concurrency window.
+
+    Every healthy completion grows the window by ``increase / window`` (about
+    ``+increase`` per window's worth of calls). A throttle or timeout multiplies
+    it by ``decrease``, at most once per ``cooldown_seconds`` so a burst of
+    failures from calls already in flight counts as a single congestion event.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        minimum: float = 1,
+        maximum: float = 16,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_target_seconds: float = 60.0,
+        max_error_rate: float = 0.1,
+        cooldown_seconds: float = 2.0,
+        history_size: int = 50,
+    ) -> None:
+        self.minimum = max(1.0, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target_seconds = latency_target_seconds
+        self.max_error_rate = max_error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self._window = min(max(initial, self.minimum), self.maximum)
+        self._error_rate = 0.0
+        self._last_decrease = float("-inf")
+        self._history: Deque[Dict[str, object]] = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        with self._lock:
+            return max(1, int(self._window))
+
+    def on_success(self, latency_seconds: float) -> None:
+        with self._lock:
+            self._error_rate *= 0.9
+            if latency_seconds > self.latency_target_seconds or self._error_rate > self.max_error_rate:
+                return
+            before = self._window
+            self._window = min(self.maximum, self._window + self.increase / self._window)
+            if int(self._window) != int(before):
+                self._record(before, "increase")
+
+    def on_congestion(self, reason: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._error_rate = self._error_rate * 0.9 + 0.1
+            if now - self._last_decrease < self.cooldown_seconds:
+                return
+            before = self._window
+            self._window = max(self.minimum, self._window * self.decrease)
+            self._last_decrease = now
+            self._record(before, f"decrease: {reason[:120]}")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            history: List[Dict[str, object]] = list(self._history)
+            return {
+                "window": round(self._window, 3),
+                "limit": max(1, int(self._window)),
+                "minimum": self.minimum,
+                "maximum": self.maximum,
+                "error_rate": round(self._error_rate, 4),
+                "history": history,
+            }
+
+    def _record(self, before: float, reason: str) -> None:
+        self._history.append(
+            {"at": round(time.time(), 3), "from": round(before, 3), "to": round(self._window, 3), "reason": reason}
+        )
+
+
+@dataclass(eq=False)
+class _Waiter:
+    flow: str
+    requests: float
+    tokens: float
+    weight: int
+
+
+class GeminiGovernor:
+    """Shared requests-per-minute, tokens-per-minute and concurrency limiter.
+
+    Callers queue per *flow* (one flow per extraction request) and flows are
+    served round-robin, so a large batch only gets every other turn while an
+    interactive run is waiting instead of holding the whole budget. Each slot
+    carries a weight (the number of parallel model calls it will make); with an
+    :class:`AimdController` the concurrency cap follows its window instead of
+    staying at ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 1000,
+        tokens_per_minute: float = 1_000_000,
+        max_concurrency: int = 16,
+        controller: AimdController | None = None,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.controller = controller
+        self._cond = threading.Condition()
+        self._flows: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._in_flight = 0
+        self._granted = 0
+        self._wait_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "GeminiGovernor":
+        max_concurrency = env_int("GEMINI_MAX_CONCURRENCY", 16)
+        controller = None
+        if env_flag("GEMINI_ADAPTIVE_CONCURRENCY", True):
+            controller = AimdController(
+                initial=min(4, max_concurrency),
+                maximum=max_concurrency,
+                latency_target_seconds=env_float("GEMINI_LATENCY_TARGET_SECONDS", 60.0),
+            )
+        return cls(
+            requests_per_minute=env_float("GEMINI_REQUESTS_PER_MINUTE", 1000),
+            tokens_per_minute=env_float("GEMINI_TOKENS_PER_MINUTE", 1_000_000),
+            max_concurrency=max_concurrency,
+            controller=controller,
+        )
+
+    @property
+    def concurrency_limit(self) -> int:
+        if self.controller is not None:
+            return min(self.controller.limit, self.max_concurrency)
+        return self.max_concurrency
+
+    @contextmanager
+    def slot(self, flow: str, requests: float = 1, tokens: float = 0, weight: int = 1) -> Iterator[int]:
+        """Hold an admission for the block; yields the granted weight, which may be below ``weight``.
+
+        Callers must not run more parallel calls than the granted weight.
+        """
+        granted = self.acquire(flow, requests, tokens, weight)
+        started = time.monotonic()
+        try:
+            yield granted
+        except Exception as err:
+            self.release(granted, error=err)
+            raise
+        else:
+            self.release(granted, latency_seconds=time.monotonic() - started)
+
+    def acquire(self, flow: str, requests: float = 1, tokens: float = 0, weight: int = 1) -> int:
+        """Block until admitted; returns the weight actually held, to pass back to :meth:`release`."""
+        waiter = _Waiter(flow=flow, requests=requests, tokens=tokens, weight=max(1, weight))
+        started = time.monotonic()
+        with self._cond:
+            self._flows.setdefault(flow, deque()).append(waiter)
+            try:
+                while True:
+                    delay = self._admission_delay(waiter)
+                    if delay == 0.0:
+                        break
+                    self._cond.wait(timeout=delay)
+            except BaseException:
+                self._remove(waiter)
+                self._cond.notify_all()
+                raise
+
+            now = time.monotonic()
+            self.requests.consume(requests, now)
+            self.tokens.consume(tokens, now)
+            self._remove(waiter, rotate=True)
+            granted = min(waiter.weight, self.concurrency_limit)
+            self._in_flight += granted
+            self._granted += 1
+            self._wait_seconds += now - started
+            self._cond.notify_all()
+            return granted
+
+    def release(
+        self,
+        weight: int = 1,
+        latency_seconds: float | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        if self.controller is not None:
+            if error is not None and is_throttle_error(error):
+                self.controller.on_congestion(str(error) or type(error).__name__)
+            elif error is None and latency_seconds is not None:
+                self.controller.on_success(latency_seconds)
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - weight)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "in_flight": self._in_flight,
+                "concurrency_limit": self.concurrency_limit,
+                "max_concurrency": self.max_concurrency,
+                "waiting": sum(len(queue) for queue in self._flows.values()),
+                "active_flows": len(self._flows),
+                "granted": self._granted,
+                "average_wait_seconds": round(self._wait_seconds / self._granted, 4) if self._granted else 0.0,
+                "requests_available": None if self.requests.unlimited else round(self.requests.level(now), 2),
+                "tokens_available": None if self.tokens.unlimited else round(self.tokens.level(now)),
+                "aimd": self.controller.stats() if self.controller is not None else None,
+            }
+
+    def _admission_delay(self, waiter: _Waiter) -> float | None:
+        """``0.0`` when ``waiter`` may go now, else how long to sleep (``None`` = until notified)."""
+        head_flow = next(iter(self._flows))
+        if self._flows[head_flow][0] is not waiter:
+            return None
+        limit = self.concurrency_limit
+        if self._in_flight and self._in_flight + min(waiter.weight, limit) > limit:
+            return None
+
+        now = time.monotonic()
+        delay = max(self.requests.seconds_until(waiter.requests, now), self.tokens.seconds_until(waiter.tokens, now))
+        return delay if delay > 0 else 0.0
+
+    def _remove(self, waiter: _Waiter, rotate: bool = False) -> None:
+        queue = self._flows.get(waiter.flow)
+        if queue is None:
+            return
+        if waiter in queue:
+            queue.remove(waiter)
+        if not queue:
+            del self._flows[waiter.flow]
+        elif rotate:
+            self._flows.move_to_end(waiter.flow)
+
+
+_shared_governor: GeminiGovernor | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_governor() -> GeminiGovernor:
+    """Return the process-wide governor, created from the environment on first use."""
+    global _shared_governor
+    with _shared_lock:
+        if _shared_governor is None:
+            _shared_governor = GeminiGovernor.from_env()
+        return _shared_governor
@@ -0,0 +1,198 @@
+"""Typed entity recognizers for the deterministic fallback engine."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import functools
+import re
+from typing import Dict, Iterable, List, Tuple, Union
+
+_MONTH = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?"
+    r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+
+
+@dataclass(frozen=True)
+class Recognizer:
+    """A named pattern plus the field-name words that select it.
+
+    ``aliases`` are nouns that can head a field name ("Invoice *Date*",
+    "*Amount* Due"); ``modifiers`` are weaker words ("*Due*", "*Issued*")
+    that only decide when no alias matches. ``pattern`` must not contain
+    capturing groups of its own; it becomes one named group of the combined
+    scanner.
+    """
+
+    name: str
+    pattern: str
+    aliases: Tuple[str, ...] = ()
+    modifiers: Tuple[str, ...] = ()
+
+
+RECOGNIZERS: List[Recognizer] = [
+    Recognizer(
+        "email",
+        r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+        ("email", "e-mail", "mail"),
+    ),
+    Recognizer(
+        "url",
+        r"(?:https?://|www\.)[^\s<>\"']*[^\s<>\"'.,;:!?)]",
+        ("url", "link", "website", "site", "homepage", "uri"),
+    ),
+    Recognizer(
+        "date",
+        r"\b(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}"
+        rf"|{_MONTH}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}|\d{{1,2}}\s+{_MONTH}\.?,?\s+\d{{4}})\b",
+        ("date", "day", "dob", "birthday", "deadline", "expiry"),
+        ("due", "born", "issued", "expires"),
+    ),
+    Recognizer(
+        "phone",
+        r"(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?!\w)",
+        ("phone", "telephone", "tel", "mobile", "cell", "fax", "contact number"),
+    ),
+    Recognizer(
+        "money",
+        r"(?:(?:\$|€|£|¥)\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:million|billion|thousand|[KMB]n?)\b)?"
+        r"|\b\d[\d,]*(?:\.\d+)?\s?(?:USD|EUR|GBP|JPY|INR|dollars|euros|pounds)\b)",
+        (
+            "amount", "price", "cost", "total", "salary", "revenue", "fee", "payment", "budget", "money", "value",
+            "balance", "subtotal",
+        ),
+    ),
+    Recognizer(
+        "percent",
+        r"\b\d+(?:\.\d+)?\s?(?:%|percent\b)",
+        ("percent", "percentage", "rate", "ratio", "share", "growth", "margin", "%"),
+    ),
+    # Names touching a non-ASCII character (e.g. "Zoë") are skipped whole rather than cut to "Zo".
+    Recognizer(
+        "name",
+        r"(?<![^\x00-\x7f])\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b(?![^\x00-\x7f])",
+        ("name", "person", "organization", "company", "location", "city", "country", "entity"),
+    ),
+]
+
+DEFAULT_RECOGNIZER = "name"
+
+
+def register_recognizer(recognizer: Recognizer) -> None:
+    """Add or replace a recognizer; new ones are tried before ``name`` in the combined scan."""
+    for index, existing in enumerate(RECOGNIZERS):
+        if existing.name == recognizer.name:
+            RECOGNIZERS[index] = recognizer
+            break
+    else:
+        RECOGNIZERS.insert(len(RECOGNIZERS) - 1, recognizer)
+    _scanner.cache_clear()
+
+
+def registry() -> Tuple[Recognizer, ...]:
+    """Snapshot of :data:`RECOGNIZERS` that can be sent to another process."""
+    return tuple(RECOGNIZERS)
+
+
+def use_registry(recognizers: Iterable[Recognizer]) -> None:
+    """Make :data:`RECOGNIZERS` equal ``recognizers`` (worker processes mirror the parent's registry)."""
+    recognizers = list(recognizers)
+    if recognizers != RECOGNIZERS:
+        RECOGNIZERS[:] = recognizers
+        _scanner.cache_clear()
+
+
+# A trailing preposition names a party: "Issued By", "Billed To", "Shipped From".
+PARTY_SUFFIXES = ("by", "to", "from")
+
+
+def recognizer_for(field: str) -> str:
+    """Pick the recognizer for ``field`` from its head noun (``name`` when nothing matches).
+
+    The head is the last alias in the field name, looking only before "of"
+    when that part has one ("Date of Birth"), so "Amount Due" is money and
+    "Payment Date" a date. Without an alias, the first modifier decides
+    ("Due", "Issued"). Field names ending in by/to/from are parties.
+    """
+    words = re.findall(r"[a-z0-9%-]+", field.strip().lower())
+    if len(words) > 1 and words[-1] in PARTY_SUFFIXES:
+        return DEFAULT_RECOGNIZER
+    if "of" in words[1:]:
+        head = _last_alias(words[: words.index("of", 1)])
+        if head is not None:
+            return head
+    head = _last_alias(words)
+    if head is not None:
+        return head
+    for word in words:
+        for recognizer in RECOGNIZERS:
+            if word in recognizer.modifiers:
+                return recognizer.name
+    return DEFAULT_RECOGNIZER
+
+
+def _last_alias(words: List[str]) -> str | None:
+    """The recognizer whose name or alias ends closest to the end of ``words`` (registry order breaks ties)."""
+    best: Tuple[int, str] | None = None
+    for recognizer in RECOGNIZERS:
+        for alias in (recognizer.name, *recognizer.aliases):
+            parts = alias.split()
+            for start in range(len(words) - len(parts), -1, -1):
+                if words[start : start + len(parts)] == parts:
+                    end = start + len(parts)
+                    if best is None or end > best[0]:
+                        best = (end, recognizer.name)
+                    break
+    return best[1] if best is not None else None
+
+
+Text = Union[str, bytes, memoryview]
+
+
+class CombinedScanner:
+    """One alternation of named groups over the active recognizers, scanned in a single pass.
+
+    Recognizers earlier in :data:`RECOGNIZERS` win when two match at the same
+    position, so specific patterns (emails, dates) beat capitalized names.
+    Both the ``str`` and the UTF-8 ``bytes`` pattern use ASCII ``\\w``/``\\b``
+    semantics, so a document gives the same matches whichever form is scanned.
+    """
+
+    def __init__(self, kinds: Tuple[str, ...]) -> None:
+        active = [recognizer for recognizer in RECOGNIZERS if recognizer.name in kinds]
+        source = "|".join(f"(?P<{recognizer.name}>{recognizer.pattern})" for recognizer in active)
+        self.kinds = tuple(recognizer.name for recognizer in active)
+        self.pattern = re.compile(source, re.ASCII)
+        self.bytes_pattern = re.compile(source.encode("utf-8"))
+
+    def scan(self, text: Text, wanted: Dict[str, int | None]) -> Dict[str, List[str]]:
+        """Unique matches per kind in first-seen order.
+
+        Stops once every kind has ``wanted[kind]`` values; a ``None`` count
+        means that kind needs a full scan.
+        """
+        found: Dict[str, Dict[str, None]] = {kind: {} for kind in wanted}
+        remaining = {kind for kind, count in wanted.items() if count is None or count > 0}
+        pattern = self.pattern if isinstance(text, str) else self.bytes_pattern
+        if remaining:
+            for match in pattern.finditer(text):
+                kind = match.lastgroup
+                if kind not in remaining:
+                    continue
+                value = match.group()
+                found[kind][value.decode("utf-8", errors="ignore") if isinstance(value, bytes) else value] = None
+                if wanted[kind] is not None and len(found[kind]) >= wanted[kind]:
+                    remaining.discard(kind)
+                    if not remaining:
+                        break
+        return {kind: list(values) for kind, values in found.items()}
+
+
+@functools.lru_cache(maxsize=64)
+def _scanner(kinds: Tuple[str, ...]) -> CombinedScanner:
+    return CombinedScanner(kinds)
+
+
+def scanner_for(kinds: Iterable[str]) -> CombinedScanner:
+    """Compiled scanner for ``kinds``, cached per distinct set of kinds."""
+    return _scanner(tuple(sorted(set(kinds))))
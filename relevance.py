@@ -0,0 +1,206 @@
+"""Cheap passage scoring that trims long documents before they are sent to the model."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+import re
+from typing import Dict, List, Tuple
+
+from recognizers import DEFAULT_RECOGNIZER, recognizer_for, scanner_for
+from settings import env_flag, env_float, env_int
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+WORD = re.compile(r"\w+")
+STOPWORDS = {"the", "and", "for", "of", "to", "in", "on", "at", "by", "with", "from", "name", "number", "date"}
+
+
+@dataclass
+class Passages:
+    """The selected passages of a document joined into one model input.
+
+    ``spans`` holds ``(start, end)`` in the original text for each passage and
+    ``offsets`` where each one starts in :attr:`text`.
+    """
+
+    text: str
+    spans: List[Tuple[int, int]]
+    offsets: List[int]
+    total: int
+
+    SEPARATOR = "\n\n"
+
+    def original_offset(self, offset: int) -> int | None:
+        """Map a character offset in :attr:`text` back to the original document (``None`` inside a separator)."""
+        index = bisect.bisect_right(self.offsets, offset) - 1
+        if index < 0:
+            return None
+        start, end = self.spans[index]
+        original = start + offset - self.offsets[index]
+        return original if original < end else None
+
+
+class RelevanceFilter:
+    """Keeps the paragraphs of a long document that look relevant to the requested fields.
+
+    Documents of at least ``min_chars`` characters are split into paragraphs
+    (long paragraphs into runs of sentences of at most ``max_passage_chars``).
+    Each passage scores one point per typed-recognizer match for the fields'
+    recognizers (emails, dates, amounts, ...), one per field-name keyword,
+    and capitalized phrases not at a sentence start scaled to one point per
+    ``name_words`` words. Unless a field maps to the ``name`` recognizer, that
+    name signal is capped at ``max_name_share`` of ``threshold``, so name
+    density alone (boilerplate is full of capitalized terms) never qualifies
+    a passage; for name fields it is the field's own evidence and counts in
+    full. Passages scoring at least ``threshold`` are sent to
+    the model in their original order. When nothing qualifies, or the
+    selection would keep more than ``max_keep_ratio`` of the text, the whole
+    document is sent.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        min_chars: int = 20_000,
+        max_passage_chars: int = 2000,
+        name_words: int = 50,
+        max_keep_ratio: float = 0.8,
+        max_name_share: float = 0.5,
+    ) -> None:
+        self.threshold = threshold
+        self.min_chars = max(0, min_chars)
+        self.max_passage_chars = max(200, max_passage_chars)
+        self.name_words = max(1, name_words)
+        self.max_keep_ratio = max_keep_ratio
+        self.max_name_share = max_name_share
+
+    @classmethod
+    def from_env(cls) -> "RelevanceFilter | None":
+        if not env_flag("EXTRACT_PREFILTER", True):
+            return None
+        return cls(
+            threshold=env_float("EXTRACT_PREFILTER_THRESHOLD", 1.0),
+            min_chars=env_int("EXTRACT_PREFILTER_MIN_CHARS", 20_000),
+            max_passage_chars=env_int("EXTRACT_PREFILTER_PASSAGE_CHARS", 2000),
+        )
+
+    def settings(self) -> Dict[str, float]:
+        """Every parameter that affects :meth:`select` (part of the cache key of trimmed results)."""
+        return {
+            "threshold": self.threshold,
+            "min_chars": self.min_chars,
+            "max_passage_chars": self.max_passage_chars,
+            "name_words": self.name_words,
+            "max_keep_ratio": self.max_keep_ratio,
+            "max_name_share": self.max_name_share,
+        }
+
+    def select(self, text: str, fields: List[str]) -> Passages | None:
+        """The relevant passages of ``text``, or ``None`` when the whole text should be sent."""
+        if len(text) < self.min_chars or not fields:
+            return None
+        spans = self.split(text)
+        if len(spans) < 2:
+            return None
+        scores = self.score(text, spans, fields)
+        kept = [span for span, score in zip(spans, scores) if score >= self.threshold]
+        kept_chars = sum(end - start for start, end in kept)
+        if not kept or kept_chars > self.max_keep_ratio * len(text):
+            return None
+
+        parts: List[str] = []
+        offsets: List[int] = []
+        position = 0
+        for start, end in kept:
+            if parts:
+                parts.append(Passages.SEPARATOR)
+                position += len(Passages.SEPARATOR)
+            offsets.append(position)
+            parts.append(text[start:end])
+            position += end - start
+        return Passages(text="".join(parts), spans=kept, offsets=offsets, total=len(spans))
+
+    def split(self, text: str) -> List[Tuple[int, int]]:
+        """``(start, end)`` of each non-blank paragraph, long ones cut at sentence ends."""
+        spans: List[Tuple[int, int]] = []
+        start = 0
+        for match in [*PARAGRAPH_BREAK.finditer(text), None]:
+            end = match.start() if match is not None else len(text)
+            if text[start:end].strip():
+                spans.extend(self._split_paragraph(text, start, end))
+            if match is not None:
+                start = match.end()
+        return spans
+
+    def _split_paragraph(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        if end - start <= self.max_passage_chars:
+            return [(start, end)]
+        spans: List[Tuple[int, int]] = []
+        current = start
+        boundary: Tuple[int, int] | None = None
+        for match in SENTENCE_END.finditer(text, start, end):
+            if match.start() - current > self.max_passage_chars and boundary is not None:
+                spans.append((current, boundary[0]))
+                current = boundary[1]
+            boundary = (match.start(), match.end())
+        if end - current > self.max_passage_chars and boundary is not None and boundary[0] > current:
+            spans.append((current, boundary[0]))
+            current = boundary[1]
+        # A run-on "sentence" longer than the limit is cut at whitespace.
+        while end - current > self.max_passage_chars:
+            cut = text.rfind(" ", current + self.max_passage_chars // 2, current + self.max_passage_chars)
+            cut = cut if cut != -1 else current + self.max_passage_chars
+            spans.append((current, cut))
+            current = cut
+        spans.append((current, end))
+        return [(left, right) for left, right in spans if text[left:right].strip()]
+
+    def score(self, text: str, spans: List[Tuple[int, int]], fields: List[str]) -> List[float]:
+        """One relevance score per span, from a single scan of ``text`` per signal."""
+        starts = [start for start, _ in spans]
+        kinds = {recognizer_for(field) for field in fields}
+        typed = kinds - {DEFAULT_RECOGNIZER}
+        scores = [0.0] * len(spans)
+        names = [0] * len(spans)
+
+        def locate(position: int) -> int:
+            index = bisect.bisect_right(starts, position) - 1
+            return index if index >= 0 and position < spans[index][1] else -1
+
+        for match in scanner_for(typed | {DEFAULT_RECOGNIZER}).pattern.finditer(text):
+            index = locate(match.start())
+            if index < 0:
+                continue
+            if match.lastgroup != DEFAULT_RECOGNIZER:
+                scores[index] += 1.0
+            elif not self._sentence_start(text, match.start()):
+                names[index] += 1
+
+        keywords = self.keywords(fields)
+        if keywords:
+            pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, sorted(keywords))) + r")\b", re.IGNORECASE)
+            for match in pattern.finditer(text):
+                index = locate(match.start())
+                if index >= 0:
+                    scores[index] += 1.0
+
+        name_cap = float("inf") if DEFAULT_RECOGNIZER in kinds else self.max_name_share * self.threshold
+        for index, (start, end) in enumerate(spans):
+            if names[index]:
+                words = len(WORD.findall(text, start, end))
+                scores[index] += min(name_cap, names[index] * self.name_words / max(words, self.name_words))
+        return scores
+
+    @staticmethod
+    def keywords(fields: List[str]) -> List[str]:
+        """Distinct words of the field names, minus short words and generic ones like "name"."""
+        words = {word for field in fields for word in WORD.findall(field.lower())}
+        return [word for word in words if len(word) > 2 and word not in STOPWORDS]
+
+    @staticmethod
+    def _sentence_start(text: str, position: int) -> bool:
+        index = position - 1
+        while index >= 0 and text[index] in " \t\"'(":
+            index -= 1
+        return index < 0 or text[index] in ".!?\n\r:"
@@ -0,0 +1,387 @@
+"""Retry, circuit-breaking and hedging helpers for model calls."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager
+import bisect
+import random
+import re
+import threading
+import time
+from typing import Callable, ContextManager, Deque, Dict, Iterator, List, TypeVar
+
+from rate_limit import error_status, is_throttle_error
+from settings import env_float, env_int
+
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while its circuit breaker is open."""
+
+
+TRANSIENT_MESSAGE = re.compile(
+    r"\b(?:UNAVAILABLE|INTERNAL|service unavailable|internal (?:server )?error|bad gateway"
+    r"|connection (?:reset|refused|aborted|error|closed)|all connection attempts failed"
+    r"|name or service not known|temporary failure in name resolution|nodename nor servname"
+    r"|network is unreachable|no route to host|server disconnected)\b",
+    re.IGNORECASE,
+)
+# Connection-class exceptions of HTTP clients that do not derive from OSError (httpx, aiohttp, ...).
+CONNECTION_ERROR_NAME = re.compile(r"Connect|Network|Transport|Disconnected|RemoteProtocol")
+CLIENT_ERROR_STATUSES = {
+    "INVALID_ARGUMENT",
+    "FAILED_PRECONDITION",
+    "OUT_OF_RANGE",
+    "NOT_FOUND",
+    "PERMISSION_DENIED",
+    "UNAUTHENTICATED",
+}
+
+
+def _error_chain(err: BaseException, depth: int = 5) -> Iterator[BaseException]:
+    """``err`` and the exceptions it was raised from (client libraries often wrap transport errors)."""
+    seen = set()
+    current: BaseException | None = err
+    while current is not None and id(current) not in seen and len(seen) < depth:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
+
+
+def is_transient_error(err: BaseException) -> bool:
+    """True for failures worth retrying: throttling, timeouts, 5xx, network and connection problems."""
+    for cause in _error_chain(err):
+        if is_throttle_error(cause) or isinstance(cause, OSError):
+            return True
+        if any(CONNECTION_ERROR_NAME.search(klass.__name__) for klass in type(cause).__mro__):
+            return True
+        status = error_status(cause)
+        if isinstance(status, int) and 500 <= status <= 504:
+            return True
+        if status in ("UNAVAILABLE", "INTERNAL"):
+            return True
+        if TRANSIENT_MESSAGE.search(str(cause)):
+            return True
+    return False
+
+
+def is_client_error(err: BaseException) -> bool:
+    """True only for definite client errors (4xx other than 408/429, or the gRPC equivalents).
+
+    Those prove the service answered and rejected this input; anything
+    unclassified is not evidence that the service is healthy.
+    """
+    status = error_status(err)
+    if isinstance(status, int):
+        return 400 <= status < 500 and status not in (408, 429)
+    return status in CLIENT_ERROR_STATUSES
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient errors."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=env_int("GEMINI_RETRY_ATTEMPTS", 3),
+            base_delay=env_float("GEMINI_RETRY_BASE_DELAY", 0.5),
+            max_delay=env_float("GEMINI_RETRY_MAX_DELAY", 8.0),
+        )
+
+    def should_retry(self, err: BaseException, attempt: int) -> bool:
+        return attempt < self.max_attempts and is_transient_error(err)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures -> half-open probe after ``reset_seconds``.
+
+    While open, :meth:`allow` refuses immediately so callers can degrade without
+    waiting on the network. In half-open state a single probe is let through;
+    its success closes the circuit and its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._rejected = 0
+        self._trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._trips += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def record_rate_limited(self) -> None:
+        """A rate-limited call: the service is up, so no failure is counted; a half-open probe may be retried."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "trips": self._trips,
+                "rejected": self._rejected,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(model_id: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``model_id``."""
+    with _breakers_lock:
+        breaker = _breakers.get(model_id)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                model_id,
+                failure_threshold=env_int("GEMINI_BREAKER_FAILURES", 5),
+                reset_seconds=env_float("GEMINI_BREAKER_RESET_SECONDS", 30.0),
+            )
+            _breakers[model_id] = breaker
+        return breaker
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram plus a sliding window for percentiles."""
+
+    BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 60.0, float("inf"))
+
+    def __init__(self, window: int = 500) -> None:
+        self._counts: List[int] = [0] * len(self.BUCKETS)
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            self._recent.append(seconds)
+
+    def percentile(self, percentile: float, min_samples: int = 20) -> float | None:
+        with self._lock:
+            if len(self._recent) < min_samples:
+                return None
+            ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, max(0, int(round(percentile / 100.0 * len(ordered))) - 1))
+        return ordered[index]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            buckets = {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(self.BUCKETS, self._counts)
+            }
+            samples = len(self._recent)
+        return {
+            "buckets": buckets,
+            "samples": samples,
+            "p50": self.percentile(50, min_samples=1),
+            "p95": self.percentile(95, min_samples=1),
+            "p99": self.percentile(99, min_samples=1),
+        }
+
+
+class _Superseded(Exception):
+    """A hedged attempt admitted after the other attempt had already succeeded."""
+
+
+@contextmanager
+def _admitted() -> Iterator[int]:
+    yield 1
+
+
+class Hedger:
+    """Issues a duplicate call when the first one outlives a latency percentile.
+
+    ``run(call, admit=...)`` separates admission (e.g. a governor slot, which
+    may queue) from the model call itself: only ``call(granted)`` is timed,
+    and the hedge timer starts once the primary call has been admitted, so
+    queueing never looks like a slow model. Latencies are recorded per unit
+    of ``scale`` (for example per wave of chunks, optionally computed from
+    the granted weight) so long documents are not compared against short
+    ones. Hedges are capped at ``budget`` extra calls per primary call and go
+    through their own admission; the first successful result wins, a hedge
+    still queued when the primary succeeds gives its slot back unused and a
+    late result is discarded. Hedged calls run on their own threads, so
+    there is no pool size to cap concurrency. ``percentile=None`` only
+    records latencies.
+    """
+
+    def __init__(
+        self,
+        percentile: float | None = None,
+        budget: float = 0.05,
+        histogram: LatencyHistogram | None = None,
+    ) -> None:
+        self.percentile = percentile
+        self.budget = max(0.0, budget)
+        self.histogram = histogram or LatencyHistogram()
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Hedger":
+        percentile = env_float("GEMINI_HEDGE_PERCENTILE", 0.0)
+        return cls(
+            percentile=percentile if 0 < percentile < 100 else None,
+            budget=env_float("GEMINI_HEDGE_BUDGET", 0.05),
+        )
+
+    def run(
+        self,
+        call: Callable[[int], T],
+        scale: float | Callable[[int], float] = 1.0,
+        admit: Callable[[], ContextManager[int]] | None = None,
+    ) -> T:
+        """Run ``call(granted)`` inside ``admit()`` (which yields the granted weight), hedging slow calls."""
+        admit = admit or _admitted
+        with self._lock:
+            self._calls += 1
+        threshold = self.histogram.percentile(self.percentile) if self.percentile else None
+        if threshold is None:
+            return self._attempt(call, scale, admit)
+
+        settled = threading.Event()
+        admitted = threading.Event()
+        granted: List[int] = []
+        primary = self._spawn(self._attempt, call, scale, admit, settled, admitted, granted)
+        admitted.wait()
+        timeout = threshold * self._scale(scale, granted[0] if granted else 1)
+        done, _ = wait([primary], timeout=timeout)
+        if done or not self._take_budget():
+            return primary.result()
+
+        hedge = self._spawn(self._attempt, call, scale, admit, settled)
+        pending = {primary, hedge}
+        first_error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    if error is None:
+                        if future is hedge:
+                            with self._lock:
+                                self._hedge_wins += 1
+                        return future.result()
+                    if not isinstance(error, _Superseded):
+                        first_error = first_error or error
+        finally:
+            settled.set()
+        assert first_error is not None
+        raise first_error
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = {
+                "enabled": self.percentile is not None,
+                "percentile": self.percentile,
+                "budget": self.budget,
+                "calls": self._calls,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+            }
+        stats["threshold_seconds"] = self.histogram.percentile(self.percentile) if self.percentile else None
+        stats["latency"] = self.histogram.stats()
+        return stats
+
+    def _attempt(
+        self,
+        call: Callable[[int], T],
+        scale: float | Callable[[int], float],
+        admit: Callable[[], ContextManager[int]],
+        settled: threading.Event | None = None,
+        admitted: threading.Event | None = None,
+        granted_out: List[int] | None = None,
+    ) -> T:
+        try:
+            with admit() as granted:
+                if granted_out is not None:
+                    granted_out.append(granted)
+                if admitted is not None:
+                    admitted.set()
+                if settled is not None and settled.is_set():
+                    raise _Superseded()
+                started = time.perf_counter()
+                result = call(granted)
+                self.histogram.record((time.perf_counter() - started) / self._scale(scale, granted))
+                return result
+        finally:
+            if admitted is not None:
+                admitted.set()
+
+    @staticmethod
+    def _scale(scale: float | Callable[[int], float], granted: int) -> float:
+        return max(1.0, scale(granted) if callable(scale) else scale)
+
+    @staticmethod
+    def _spawn(function: Callable[..., T], *args: object) -> "Future[T]":
+        future: Future = Future()
+
+        def target() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(function(*args))
+            except BaseException as err:  # noqa: BLE001
+                future.set_exception(err)
+
+        threading.Thread(target=target, name="model-hedge", daemon=True).start()
+        return future
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.budget * self._calls:
+                return False
+            self._hedges += 1
+            return True
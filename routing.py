@@ -0,0 +1,224 @@
+"""Per-field routing between cheap local extractors and the Gemini model."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field as dataclass_field
+import json
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from json_state import load_state, save_state
+from recognizers import DEFAULT_RECOGNIZER, recognizer_for, scanner_for
+from settings import env_flag, env_float, env_int, env_path
+
+if TYPE_CHECKING:
+    from gazetteer import LearnedGazetteer
+    from local_model import LocalModelExtractor
+
+SOURCES = ("learned", "local", "regex")
+
+
+@dataclass
+class RouteDecision:
+    """What the local sources proposed for one document and which fields they keep from the model."""
+
+    candidates: Dict[str, Dict[str, List[str]]] = dataclass_field(default_factory=dict)
+    local: Dict[str, List[str]] = dataclass_field(default_factory=dict)
+    sources: Dict[str, str] = dataclass_field(default_factory=dict)
+    audited: bool = False
+    seconds: float = 0.0
+
+
+class ConfidenceRouter:
+    """Fills a field locally when a cheap source is confident enough, else leaves it for the model.
+
+    Sources are the learned gazetteer, the distilled local tagger and the
+    typed regex recognizers (``name`` is never routed). A source's confidence
+    for a field is its decayed agreement with the model on documents where
+    it proposed values for that field, capped by the source's own score
+    (the tagger's held-out precision and span probability). Below
+    ``min_observations`` a source has no confidence. Fields whose best
+    non-empty candidate reaches ``threshold`` skip the model; an
+    ``audit_rate`` sample of such documents goes to the model anyway so
+    agreement keeps being measured. Agreement is saved as JSON to ``path``.
+    """
+
+    def __init__(
+        self,
+        learned: LearnedGazetteer | None = None,
+        local_model: LocalModelExtractor | None = None,
+        threshold: float = 0.9,
+        min_observations: int = 20,
+        audit_rate: float = 0.05,
+        path: str | None = os.path.join(".cache", "router.json"),
+        save_every: int = 25,
+    ) -> None:
+        self.learned = learned
+        self.local_model = local_model
+        self.threshold = threshold
+        self.min_observations = max(1, min_observations)
+        self.audit_rate = min(1.0, max(0.0, audit_rate))
+        self.path = path
+        self.save_every = max(1, save_every)
+        self._agreement: Dict[str, Dict[str, List[float]]] = {}
+        self._documents = {"local": 0, "partial": 0, "model": 0, "audited": 0}
+        self._fields = {"local": 0, "model": 0}
+        self._by_source = dict.fromkeys(SOURCES, 0)
+        self._seconds = {"local": 0.0, "model": 0.0}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def from_env(
+        cls,
+        learned: LearnedGazetteer | None = None,
+        local_model: LocalModelExtractor | None = None,
+    ) -> "ConfidenceRouter | None":
+        if not env_flag("EXTRACT_ROUTING", True):
+            return None
+        return cls(
+            learned=learned,
+            local_model=local_model,
+            threshold=env_float("EXTRACT_ROUTER_CONFIDENCE", 0.9),
+            min_observations=env_int("EXTRACT_ROUTER_MIN_OBSERVATIONS", 20),
+            audit_rate=env_float("EXTRACT_ROUTER_AUDIT_RATE", 0.05),
+            path=env_path("EXTRACT_ROUTER_STATE_PATH", os.path.join(".cache", "router.json")),
+        )
+
+    def route(self, text: str, fields: List[str]) -> RouteDecision:
+        """Score every source on ``fields`` and keep the confident ones local."""
+        started = time.perf_counter()
+        decision = RouteDecision(candidates={field: {} for field in fields})
+        scores: Dict[str, Dict[str, float]] = {field: {} for field in fields}
+
+        if self.learned is not None:
+            for field, values in self.learned.guess(text, fields).items():
+                if values:
+                    decision.candidates[field]["learned"] = values
+                    scores[field]["learned"] = 1.0
+        if self.local_model is not None:
+            for field, (values, confidence) in self.local_model.candidates(text, fields).items():
+                if values:
+                    decision.candidates[field]["local"] = values
+                    scores[field]["local"] = confidence
+        kinds = {field: recognizer_for(field) for field in fields}
+        typed = {kind for kind in kinds.values() if kind != DEFAULT_RECOGNIZER}
+        if typed:
+            found = scanner_for(typed).scan(text, dict.fromkeys(typed))
+            for field, kind in kinds.items():
+                if found.get(kind):
+                    decision.candidates[field]["regex"] = found[kind]
+                    scores[field]["regex"] = 1.0
+
+        for field in fields:
+            best_source, best = "", 0.0
+            for source, score in scores[field].items():
+                confidence = min(score, self.agreement(field, source))
+                if confidence > best:
+                    best_source, best = source, confidence
+            if best_source and best >= self.threshold:
+                decision.local[field] = decision.candidates[field][best_source]
+                decision.sources[field] = best_source
+
+        if decision.local and random.random() < self.audit_rate:
+            decision.audited = True
+            decision.local, decision.sources = {}, {}
+        decision.seconds = time.perf_counter() - started
+        self._record_route(decision, len(fields))
+        return decision
+
+    def agreement(self, field: str, source: str) -> float:
+        """Decayed agreement rate of ``source`` on ``field``; 0 until ``min_observations``."""
+        with self._lock:
+            state = self._agreement.get(field.strip().lower(), {}).get(source)
+            if state is None or state[0] < self.min_observations:
+                return 0.0
+            return state[2] / max(state[1], 1e-9)
+
+    def observe(self, decision: RouteDecision, values: Dict[str, List[str]], model_seconds: float) -> None:
+        """Score each source's candidates against the model's values for the fields it was sent."""
+        with self._lock:
+            self._seconds["model"] += model_seconds
+            for field, field_values in values.items():
+                returned = {value.casefold() for value in field_values}
+                for source, candidate in decision.candidates.get(field, {}).items():
+                    state = self._agreement.setdefault(field.strip().lower(), {}).setdefault(source, [0, 0.0, 0.0])
+                    state[0] += 1
+                    state[1] = state[1] * 0.99 + 1.0
+                    state[2] = state[2] * 0.99 + float({value.casefold() for value in candidate} == returned)
+            self._unsaved += 1
+            save = self._unsaved >= self.save_every
+        if save:
+            self.save()
+
+    def record_model_time(self, seconds: float) -> None:
+        """Model time for a document whose fields were not observed (e.g. the call failed)."""
+        with self._lock:
+            self._seconds["model"] += seconds
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            documents = dict(self._documents)
+            routed = documents["local"] + documents["partial"] + documents["model"]
+            fields = dict(self._fields)
+            agreement = {
+                field: {
+                    source: {"observations": state[0], "agreement": round(state[2] / max(state[1], 1e-9), 4)}
+                    for source, state in sources.items()
+                }
+                for field, sources in self._agreement.items()
+            }
+            return {
+                "threshold": self.threshold,
+                "documents": documents,
+                "fields": fields,
+                "by_source": dict(self._by_source),
+                "savings_rate": round(documents["local"] / routed, 4) if routed else 0.0,
+                "field_savings_rate": round(fields["local"] / max(fields["local"] + fields["model"], 1), 4),
+                "local_seconds": round(self._seconds["local"], 4),
+                "model_seconds": round(self._seconds["model"], 4),
+                "agreement": agreement,
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            self._unsaved = 0
+            if not self.path:
+                return
+            payload = json.dumps({"version": 1, "agreement": self._agreement})
+        save_state(self.path, payload)
+
+    def _record_route(self, decision: RouteDecision, fields: int) -> None:
+        local = len(decision.local)
+        with self._lock:
+            if local == fields:
+                self._documents["local"] += 1
+            else:
+                self._documents["partial" if local else "model"] += 1
+            self._documents["audited"] += int(decision.audited)
+            self._fields["local"] += local
+            self._fields["model"] += fields - local
+            for source in decision.sources.values():
+                self._by_source[source] += 1
+            self._seconds["local"] += decision.seconds
+
+    def _load(self) -> None:
+        payload = load_state(self.path, version=1)
+        if payload is not None:
+            self._agreement = payload.get("agreement", {})
+
+
+def route_summary(routes: List[Tuple[str, float, float]]) -> str:
+    """One log line for ``(route, local_seconds, model_seconds)`` per routed document."""
+    local = sum(1 for route, _, _ in routes if route == "local")
+    partial = sum(1 for route, _, _ in routes if route == "partial")
+    model = len(routes) - local - partial
+    return (
+        f"Routing: {local} document(s) fully local, {partial} partial, {model} sent whole to the model "
+        f"({local / len(routes):.0%} of model calls saved); local scoring {sum(r[1] for r in routes):.2f}s, "
+        f"model {sum(r[2] for r in routes if r[0] != 'local'):.2f}s."
+    )
@@ -0,0 +1,31 @@
+"""Environment-variable parsing shared by every ``from_env`` constructor."""
+
+from __future__ import annotations
+
+import os
+
+
+def env_float(name: str, default: float) -> float:
+    """``float`` value of ``name``; ``default`` when unset or unparsable."""
+    try:
+        return float(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    """``int`` value of ``name`` (``"16.0"`` is accepted); ``default`` when unset or unparsable."""
+    return int(env_float(name, default))
+
+
+def env_flag(name: str, default: bool) -> bool:
+    """``False`` for ``0``/``false``/``no``, ``True`` for any other value, ``default`` when unset or blank."""
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value not in ("0", "false", "no", "off")
+
+
+def env_path(name: str, default: str) -> str | None:
+    """Path from ``name`` (``default`` when unset); an empty value disables the feature (``None``)."""
+    return os.getenv(name, default) or None
@@ -1,7 +1,8 @@
 const state = {
   fields: [],
   result: null,
-  progressTimer: null,
+  lastRun: null,
+  events: null,
 };
 
 const fieldInput = document.getElementById('field-input');
@@ -34,6 +35,12 @@ function setProgress(value, status) {
   statusText.textContent = status;
 }
 
+function rowHtml(row, cols) {
+  let html = '<tr>';
+  cols.forEach((col) => (html += `<td>${row[col] || ''}</td>`));
+  return `${html}</tr>`;
+}
+
 function renderTable(records) {
   if (!records.length) {
     tableWrap.innerHTML = '<p>No records yet.</p>';
@@ -46,33 +53,91 @@ function renderTable(records) {
   html += '</tr></thead><tbody>';
 
   records.forEach((row) => {
-    html += '<tr>';
-    cols.forEach((col) => (html += `<td>${row[col] || ''}</td>`));
-    html += '</tr>';
+    html += rowHtml(row, cols);
   });
 
   html += '</tbody></table>';
   tableWrap.innerHTML = html;
 }
 
-function startProgressAnimation() {
-  let value = 8;
-  setProgress(value, 'Running');
-  clearInterval(state.progressTimer);
+// Live progress adds one row per finished document (in completion order); the final result redraws in order.
+function appendRow(record) {
+  const body = tableWrap.querySelector('tbody');
+  if (!body) {
+    renderTable([record]);
+    return;
+  }
+  body.insertAdjacentHTML('beforeend', rowHtml(record, Object.keys(record)));
+}
 
-  state.progressTimer = setInterval(() => {
-    value = Math.min(value + Math.floor(Math.random() * 8), 92);
-    setProgress(value, 'Running');
-  }, 350);
+function filesSignature(files) {
+  return [...files].map((file) => `${file.name}:${file.size}:${file.lastModified}`).join('|');
 }
 
-function stopProgressAnimation(done = true) {
-  clearInterval(state.progressTimer);
-  if (done) {
-    setProgress(100, 'Completed');
+// Only extend a prior run when fields were added to it and it fully reached the model;
+// after a fallback run (e.g. no API key yet) everything is extracted again.
+function incrementalFields(files) {
+  const run = state.lastRun;
+  if (!run || run.degraded || run.signature !== filesSignature(files)) return null;
+  if (!run.fields.every((field) => state.fields.includes(field))) return null;
+  const added = state.fields.filter((field) => !run.fields.includes(field));
+  return added.length ? added : null;
+}
+
+function closeEvents() {
+  if (state.events) {
+    state.events.close();
+    state.events = null;
   }
 }
 
+function followJob(jobId, total, signature) {
+  closeEvents();
+  let fallbackDocuments = 0;
+  const source = new EventSource(`/api/jobs/${jobId}/events`);
+  state.events = source;
+  tableWrap.innerHTML = '';
+
+  const parse = (event) => JSON.parse(event.data);
+  const onDocumentDone = (data, label) => {
+    appendRow(data.record);
+    setProgress(Math.round((100 * data.completed) / Math.max(1, data.total)), `Running (${data.completed}/${data.total})`);
+    const cache = data.cache ? `, cache ${data.cache}` : '';
+    appendLog(`${label} ${data.document} in ${data.seconds.toFixed(2)}s${cache}.`);
+  };
+
+  source.addEventListener('running', () => setProgress(0, `Running (0/${total})`));
+  source.addEventListener('started', (event) => appendLog(`Started ${parse(event).document}.`));
+  source.addEventListener('finished', (event) => onDocumentDone(parse(event), 'Finished'));
+  source.addEventListener('fallback', (event) => {
+    fallbackDocuments += 1;
+    onDocumentDone(parse(event), 'Fallback used for');
+  });
+  source.addEventListener('completed', (event) => {
+    const payload = parse(event);
+    closeEvents();
+    setProgress(100, 'Completed');
+    appendLog(`Extraction completed successfully using: ${payload.engine}.`);
+    payload.logs.forEach((entry) => appendLog(entry));
+
+    state.result = { runId: payload.jobId, ...payload };
+    state.lastRun = {
+      runId: payload.jobId,
+      fields: payload.fields.filter((field) => field !== 'document'),
+      signature,
+      degraded: fallbackDocuments > 0 || !payload.engine.includes('langextract'),
+    };
+    jsonOutput.textContent = JSON.stringify(state.result, null, 2);
+    renderTable(payload.records);
+    document.getElementById('download-csv').disabled = false;
+  });
+  source.addEventListener('failed', (event) => {
+    closeEvents();
+    setProgress(0, 'Error');
+    appendLog(`Error: ${parse(event).error}`);
+  });
+}
+
 document.getElementById('add-field').addEventListener('click', () => {
   const value = fieldInput.value.trim();
   if (!value) return;
@@ -96,34 +161,35 @@ document.getElementById('run-btn').addEventListener('click', async () => {
   }
 
   appendLog('Preparing extraction request...');
-  startProgressAnimation();
+  setProgress(0, 'Queued');
 
   const apiKeyInput = document.getElementById('api-key');
   const formData = new FormData();
-  [...docsInput.files].forEach((file) => formData.append('documents', file));
-  formData.append('fields', JSON.stringify(state.fields));
+  const addedFields = incrementalFields(docsInput.files);
+  if (addedFields) {
+    appendLog(`Reusing previous run; extracting ${addedFields.length} added field(s) only.`);
+    formData.append('priorRunId', state.lastRun.runId);
+    formData.append('fields', JSON.stringify(addedFields));
+  } else {
+    [...docsInput.files].forEach((file) => formData.append('documents', file));
+    formData.append('fields', JSON.stringify(state.fields));
+  }
   if (apiKeyInput.value.trim()) {
     formData.append('apiKey', apiKeyInput.value.trim());
   }
 
   try {
-    const res = await fetch('/api/extract', { method: 'POST', body: formData });
+    const res = await fetch('/api/jobs', { method: 'POST', body: formData });
     const payload = await res.json();
 
     if (!res.ok) {
       throw new Error(payload.error || 'Extraction failed.');
     }
 
-    stopProgressAnimation(true);
-    appendLog(`Extraction completed successfully using: ${payload.engine}.`);
-    payload.logs.forEach((entry) => appendLog(entry));
-
-    state.result = payload;
-    jsonOutput.textContent = JSON.stringify(payload, null, 2);
-    renderTable(payload.records);
-    document.getElementById('download-csv').disabled = false;
+    appendLog(`Job ${payload.jobId} queued for ${payload.total} document(s).`);
+    followJob(payload.jobId, payload.total, filesSignature(docsInput.files));
   } catch (err) {
-    stopProgressAnimation(false);
+    closeEvents();
     setProgress(0, 'Error');
     appendLog(`Error: ${err.message}`);
   }
@@ -155,8 +221,10 @@ document.getElementById('download-csv').addEventListener('click', async () => {
 });
 
 document.getElementById('clear-btn').addEventListener('click', () => {
+  closeEvents();
   state.fields = [];
   state.result = null;
+  state.lastRun = null;
   renderFields();
   logs.textContent = 'System ready.';
   jsonOutput.textContent = '{}';
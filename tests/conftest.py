@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in a scratch directory with confidence routing off, so ``.cache`` state never leaks between tests."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EXTRACT_ROUTING", "0")
+    return tmp_path
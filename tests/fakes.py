@@ -0,0 +1,62 @@
+"""Stand-ins for the ``langextract`` module and its annotated documents."""
+
+import re
+import threading
+
+from extractor import LangExtractAdapter
+from rate_limit import GeminiGovernor
+
+FIELD_LIST = re.compile(r"one of these field names: (.*?)\. Do not invent")
+
+
+class Interval:
+    def __init__(self, start_pos):
+        self.start_pos = start_pos
+
+
+class Extraction:
+    def __init__(self, extraction_class, extraction_text, start=None):
+        self.extraction_class = extraction_class
+        self.extraction_text = extraction_text
+        self.char_interval = Interval(start) if start is not None else None
+
+
+class Annotated:
+    def __init__(self, extractions):
+        self.extractions = extractions
+
+
+class FakeLangExtract:
+    """Extracts every ``(field, value)`` of ``facts`` whose value occurs in the text, for the prompted fields.
+
+    ``aligned=False`` drops the character offsets, like extractions LangExtract could not align.
+    Every call is recorded in ``calls`` as ``(text, fields, options)``.
+    """
+
+    def __init__(self, facts, aligned=True, latency=0.0):
+        self.facts = facts
+        self.aligned = aligned
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def extract(self, text, prompt_description="", **options):
+        fields = FIELD_LIST.search(prompt_description).group(1).split(", ")
+        with self._lock:
+            self.calls.append((text, fields, options))
+        if self.latency:
+            threading.Event().wait(self.latency)
+        extractions = []
+        for field, value in self.facts:
+            if field in fields:
+                for match in re.finditer(re.escape(value), text):
+                    extractions.append(Extraction(field, value, match.start() if self.aligned else None))
+        return Annotated(extractions)
+
+
+def make_adapter(lx, **options):
+    """A ``LangExtractAdapter`` wired to ``lx`` with an unthrottled governor of its own."""
+    options.setdefault("governor", GeminiGovernor(requests_per_minute=0, tokens_per_minute=0))
+    adapter = LangExtractAdapter(**options)
+    adapter._langextract = lx
+    return adapter
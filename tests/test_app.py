@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+
+from fakes import FakeLangExtract, make_adapter
+from jobs import JobStore
+
+pytest.importorskip("flask")
+pytest.importorskip("pandas")
+
+FACTS = [("Person", "Alice"), ("Person", "Bob")]
+TEXTS = {"a.txt": "Alice wrote this.", "b.txt": "Bob wrote that.", "c.txt": "Nobody did."}
+
+
+@pytest.fixture
+def client(workdir, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "extractor", make_adapter(FakeLangExtract(FACTS)))
+    monkeypatch.setattr(app, "jobs", JobStore())
+    app.app.config["TESTING"] = True
+    return app.app.test_client()
+
+
+def upload(fields=("Person",)):
+    return {
+        "fields": json.dumps(list(fields)),
+        "apiKey": "key",
+        "documents": [(io.BytesIO(text.encode("utf-8")), name) for name, text in TEXTS.items()],
+    }
+
+
+def sse_events(body):
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in lines:
+            events.append((int(lines["id"]), lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_job_events_stream_each_record_then_the_completed_run(client):
+    job_id = client.post("/api/jobs", data=upload(), content_type="multipart/form-data").get_json()["jobId"]
+
+    events = sse_events(client.get(f"/api/jobs/{job_id}/events").get_data(as_text=True))
+
+    finished = sorted((data["index"], data["record"]["Person"]) for _id, name, data in events if name == "finished")
+    assert finished == [(0, "Alice"), (1, "Bob"), (2, "")]
+    assert events[-1][1] == "completed" and len(events[-1][2]["records"]) == 3
+    assert [event_id for event_id, _name, _data in events] == list(range(len(events)))
+
+
+def test_job_events_resume_after_last_event_id(client):
+    job_id = client.post("/api/jobs", data=upload(), content_type="multipart/form-data").get_json()["jobId"]
+    events = sse_events(client.get(f"/api/jobs/{job_id}/events").get_data(as_text=True))
+
+    resumed = sse_events(
+        client.get(f"/api/jobs/{job_id}/events", headers={"Last-Event-ID": str(events[-2][0])}).get_data(as_text=True)
+    )
+
+    assert [(event_id, name) for event_id, name, _data in resumed] == [(events[-1][0], "completed")]
+
+
+def test_ndjson_streams_one_record_per_line_then_a_summary(client):
+    response = client.post(
+        "/api/extract",
+        data=upload(),
+        content_type="multipart/form-data",
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.mimetype == "application/x-ndjson"
+    assert [(line["index"], line["record"]["document"], line["record"]["Person"]) for line in lines[:-1]] == [
+        (0, "a.txt", "Alice"),
+        (1, "b.txt", "Bob"),
+        (2, "c.txt", ""),
+    ]
+    assert lines[-1]["type"] == "summary" and lines[-1]["documents"] == 3
+
+
+def test_ndjson_rejects_incremental_runs(client):
+    data = {"fields": json.dumps(["Person"]), "priorRunId": "abc"}
+
+    response = client.post("/api/extract", data=data, headers={"Accept": "application/x-ndjson"})
+
+    assert response.status_code == 400
@@ -0,0 +1,80 @@
+import time
+
+from extraction_cache import ExtractionCache
+from fakes import FakeLangExtract, make_adapter
+
+FACTS = [("Person", "Alice"), ("Org", "Acme"), ("Location", "Paris")]
+DOCUMENTS = [{"name": "a.txt", "text": "Alice joined Acme in Paris."}]
+
+
+def test_repeat_run_is_served_from_the_cache(workdir):
+    lx = FakeLangExtract(FACTS)
+    adapter = make_adapter(lx, cache=ExtractionCache())
+
+    first = adapter.extract(DOCUMENTS, ["Person", "Org"], "key")
+    second = adapter.extract(DOCUMENTS, ["Person", "Org"], "key")
+
+    assert len(lx.calls) == 1
+    assert second.records == first.records == [{"document": "a.txt", "Person": "Alice", "Org": "Acme"}]
+    assert "Cache: 1 hit(s), 0 partial hit(s), 0 miss(es)." in second.logs
+
+
+def test_disk_tier_survives_a_restart(workdir):
+    path = str(workdir / "cache.sqlite3")
+    make_adapter(FakeLangExtract(FACTS), cache=ExtractionCache(path)).extract(DOCUMENTS, ["Person"], "key")
+    lx = FakeLangExtract(FACTS)
+
+    result = make_adapter(lx, cache=ExtractionCache(path)).extract(DOCUMENTS, ["Person"], "key")
+
+    assert lx.calls == []
+    assert result.records[0]["Person"] == "Alice"
+
+
+def test_changed_text_misses_the_cache(workdir):
+    lx = FakeLangExtract(FACTS)
+    adapter = make_adapter(lx, cache=ExtractionCache())
+
+    adapter.extract(DOCUMENTS, ["Person"], "key")
+    adapter.extract([{"name": "a.txt", "text": "Alice left Acme."}], ["Person"], "key")
+
+    assert len(lx.calls) == 2
+
+
+def test_entries_expire_and_the_lru_tiers_stay_bounded(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.sqlite3"), max_memory_entries=2, max_disk_bytes=200, ttl_seconds=60)
+    for number in range(5):
+        cache.set(f"k{number}", {"fields": ["person"], "extractions": [["person", "x" * 40]]})
+
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["disk_bytes"] <= 200
+    assert cache.get("k4") is not None and cache.get("k0") is None
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("k4") is None
+
+
+def test_field_subset_is_projected_without_a_model_call(workdir):
+    lx = FakeLangExtract(FACTS)
+    adapter = make_adapter(lx, cache=ExtractionCache())
+    adapter.extract(DOCUMENTS, ["Person", "Org", "Location"], "key")
+
+    result = adapter.extract(DOCUMENTS, ["org", "Person"], "key")
+
+    assert len(lx.calls) == 1
+    assert result.records == [{"document": "a.txt", "org": "Acme", "Person": "Alice"}]
+
+
+def test_only_unseen_fields_are_requested_and_merged(workdir):
+    lx = FakeLangExtract(FACTS)
+    adapter = make_adapter(lx, cache=ExtractionCache())
+    adapter.extract(DOCUMENTS, ["Person"], "key")
+
+    result = adapter.extract(DOCUMENTS, ["Person", "Location"], "key")
+    again = adapter.extract(DOCUMENTS, ["Location", "Person"], "key")
+
+    assert [fields for _text, fields, _options in lx.calls] == [["Person"], ["Location"]]
+    assert result.records == [{"document": "a.txt", "Person": "Alice", "Location": "Paris"}]
+    assert again.records == [{"document": "a.txt", "Location": "Paris", "Person": "Alice"}]
+    assert "Cache: 0 hit(s), 1 partial hit(s), 0 miss(es)." in result.logs
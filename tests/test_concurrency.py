@@ -0,0 +1,35 @@
+import threading
+
+from fakes import FakeLangExtract, make_adapter
+
+
+def documents(count):
+    return [{"name": f"doc{index}.txt", "text": f"Report {index} by Alice."} for index in range(count)]
+
+
+def test_documents_run_concurrently_in_input_order(workdir):
+    lx = FakeLangExtract([("Person", "Alice")], latency=0.1)
+    adapter = make_adapter(lx, max_concurrent_documents=4, pack_max_document_chars=0)
+    finished = []
+    lock = threading.Lock()
+
+    def on_document(index, outcome):
+        with lock:
+            finished.append(index)
+
+    result = adapter.extract(documents(4), ["Person"], "key", on_document=on_document)
+
+    assert [row["document"] for row in result.records] == [f"doc{index}.txt" for index in range(4)]
+    assert [row["Person"] for row in result.records] == ["Alice"] * 4
+    assert sorted(finished) == [0, 1, 2, 3]
+    assert "with up to 4 concurrent model call(s)" in result.logs[-1]
+
+
+def test_document_timings_exclude_queue_wait(workdir):
+    lx = FakeLangExtract([("Person", "Alice")], latency=0.1)
+    adapter = make_adapter(lx, max_concurrent_documents=1, pack_max_document_chars=0)
+
+    result = adapter.extract(documents(4), ["Person"], "key")
+
+    seconds = [timing["seconds"] for timing in result.timings]
+    assert all(0.1 <= value < 0.18 for value in seconds), seconds
@@ -0,0 +1,100 @@
+import io
+import mmap
+import pickle
+import tempfile
+import tracemalloc
+
+from documents import Document
+from extraction_cache import ExtractionCache
+from extractor import CallSizing, RegexFallbackExtractor
+from fakes import FakeLangExtract, make_adapter
+from recognizers import scanner_for
+
+
+def spooled(data, max_size=1024):
+    stream = tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+b")
+    stream.write(data)
+    stream.seek(0)
+    return stream
+
+
+def test_stream_document_reads_like_a_text_document():
+    raw = "Zoë paid €12 to Ann Lee.\n".encode("utf-8") * 3 + b"\xff"
+    document = Document("a.txt", stream=io.BytesIO(raw), chunk_bytes=1024)
+
+    assert document["name"] == "a.txt"
+    assert document["text"] == "Zoë paid €12 to Ann Lee.\n" * 3
+    assert "".join(document.iter_text()) == document["text"]
+    assert document.size == len(raw)
+    assert dict(document) == {"name": "a.txt", "text": document["text"]}
+
+
+def test_disk_spooled_document_exposes_an_mmap_buffer():
+    document = Document("big.txt", stream=spooled(b"Ann Lee " * 1000))
+
+    with document.buffer() as buffer:
+        assert isinstance(buffer, mmap.mmap)
+        assert buffer[:7] == b"Ann Lee"
+
+    copy = pickle.loads(pickle.dumps(document))
+    assert copy["text"] == document["text"] and copy.size == document.size
+
+
+def test_cache_key_of_the_raw_buffer_matches_the_text_key():
+    document = Document("a.txt", stream=spooled("Zoë and Ann".encode("utf-8")))
+    params = {"extraction_passes": 1}
+
+    with document.buffer() as buffer:
+        from_buffer = ExtractionCache.make_key(buffer, "model", "prompt", params)
+
+    assert from_buffer == ExtractionCache.make_key("Zoë and Ann", "model", "prompt", params)
+
+
+def test_extract_decodes_only_the_documents_in_flight(workdir, monkeypatch):
+    monkeypatch.setenv("EXTRACT_PREFILTER", "0")
+    size = 2_000_000
+    documents = [Document(f"d{index}.txt", stream=spooled(b"Alice. " + b"word " * (size // 5))) for index in range(8)]
+    lx = FakeLangExtract([("Person", "Alice")])
+    lx.calls = type("Discard", (list,), {"append": lambda self, item: None})()
+    adapter = make_adapter(lx, max_concurrent_documents=2, cache=ExtractionCache(path=None))
+    adapter.sizing_policy.choose = lambda length, overrides=None: CallSizing(10 * size, 1, 1)
+
+    tracemalloc.start()
+    try:
+        result = adapter.extract(documents, ["Person"], "key")
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert [row["Person"] for row in result.records] == ["Alice"] * 8
+    assert peak < 4 * size
+
+
+SAMPLE = (
+    "Zoë Ångström paid €1,200.00 (5%) to Ann Lee on 2024-03-05; "
+    "mail ann@example.com or visit https://acme.io.\n"
+)
+SAMPLE_FIELDS = ["Person", "Amount", "Rate", "Date", "Email", "Website"]
+
+
+def test_str_and_bytes_scans_agree():
+    scanner = scanner_for(["name", "money", "percent", "date", "email", "url"])
+    wanted = {kind: None for kind in scanner.kinds}
+
+    assert scanner.scan(SAMPLE.encode("utf-8"), wanted) == scanner.scan(SAMPLE, wanted)
+
+
+def test_regex_fallback_scans_the_mmap_without_decoding_the_text(monkeypatch):
+    expected = RegexFallbackExtractor(processes=0).extract([{"name": "a.txt", "text": SAMPLE * 200}], SAMPLE_FIELDS)
+    document = Document("a.txt", stream=spooled(SAMPLE.encode("utf-8") * 200))
+    getitem = Document.__getitem__
+
+    def name_only(self, key):
+        assert key != "text", "the fallback decoded the whole document"
+        return getitem(self, key)
+
+    monkeypatch.setattr(Document, "__getitem__", name_only)
+    result = RegexFallbackExtractor(processes=0).extract([document], SAMPLE_FIELDS)
+
+    assert result.records == expected.records
+    assert result.records[0]["Email"] == "ann@example.com"
@@ -0,0 +1,60 @@
+import os
+import signal
+import time
+
+import pytest
+
+import extractor
+import recognizers
+from extractor import RegexFallbackExtractor
+from recognizers import Recognizer, register_recognizer
+
+DOCUMENTS = [
+    {"name": f"doc{index}.txt", "text": f"Invoice INV-{index:04d} for Ann Lee, due 2024-03-{index % 28 + 1:02d}."}
+    for index in range(12)
+]
+FIELDS = ["Invoice Number", "Customer", "Due Date"]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A private copy of the recognizer registry, restored after the test."""
+    monkeypatch.setattr(recognizers, "RECOGNIZERS", list(recognizers.RECOGNIZERS))
+    recognizers._scanner.cache_clear()
+    yield recognizers.RECOGNIZERS
+    recognizers._scanner.cache_clear()
+
+
+def in_thread(fields=FIELDS):
+    return RegexFallbackExtractor(processes=0).extract(DOCUMENTS, fields).records
+
+
+def pooled(fields=FIELDS):
+    return RegexFallbackExtractor(processes=2, chunk_size=3).extract(DOCUMENTS, fields).records
+
+
+def test_pool_matches_in_thread_results():
+    assert pooled() == in_thread()
+
+
+def test_custom_recognizers_apply_in_pool_workers(registry):
+    register_recognizer(Recognizer("invoice", r"\bINV-\d{4}\b", ("invoice",)))
+
+    records = pooled()
+
+    assert records == in_thread()
+    assert [row["Invoice Number"] for row in records[:2]] == ["INV-0000", "INV-0001"]
+
+
+def test_broken_pool_is_replaced():
+    pooled()
+    pool = extractor._fallback_pools[2]
+    os.kill(next(iter(pool._processes)), signal.SIGKILL)
+    deadline = time.monotonic() + 10
+    while not pool._broken and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert pooled() == in_thread()
+    assert 2 not in extractor._fallback_pools
+    assert pooled() == in_thread()
+    assert extractor._fallback_pools[2] is not pool
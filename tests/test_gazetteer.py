@@ -0,0 +1,93 @@
+import os
+
+from fakes import FakeLangExtract, make_adapter
+from gazetteer import AhoCorasick, GazetteerExtractor, LearnedGazetteer
+
+
+def test_scan_finds_overlapping_terms_with_original_offsets():
+    automaton = AhoCorasick([("he", "F", "he"), ("she", "F", "she"), ("hers", "F", "hers")])
+    text = "uSHErs"
+
+    matches = sorted((start, end, automaton.payloads[payload][1]) for start, end, payload in automaton.scan(text))
+
+    assert matches == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_match_row_keeps_leftmost_longest_whole_words(tmp_path):
+    gazetteer = GazetteerExtractor(
+        {"Customer": ["Acme", "Acme Corp"], "SKU": ["AB-1"]}, cache_dir=str(tmp_path)
+    )
+    doc = {"name": "a.txt", "text": "Acme Corp ordered AB-1 and AB-12; Acmeish is not a match. acme again."}
+
+    row = gazetteer.match_row(doc, ["Customer", "SKU", "Total"])
+
+    assert row == {"document": "a.txt", "Customer": "Acme Corp; Acme", "SKU": "AB-1", "Total": ""}
+
+
+def test_adding_terms_recompiles_only_that_field_and_prunes_its_old_cache(tmp_path):
+    gazetteer = GazetteerExtractor({"Customer": ["Acme"], "SKU": ["AB-1"]}, cache_dir=str(tmp_path))
+    gazetteer.extract([{"name": "a", "text": "Acme AB-1"}], ["Customer", "SKU"])
+    sku_automaton = gazetteer._automata["sku"]
+    assert len(os.listdir(tmp_path)) == 2
+
+    gazetteer.add_terms("Customer", ["Globex"])
+    result = gazetteer.extract([{"name": "a", "text": "Globex AB-1"}], ["Customer", "SKU"])
+
+    assert result.records[0]["Customer"] == "Globex"
+    assert gazetteer._automata["sku"] is sku_automaton
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_cached_automata_are_reused_after_a_restart(tmp_path, monkeypatch):
+    GazetteerExtractor({"Customer": ["Acme"]}, cache_dir=str(tmp_path)).match_row(
+        {"name": "a", "text": "Acme"}, ["Customer"]
+    )
+    loaded = []
+    from_state = AhoCorasick.from_state.__func__
+
+    def counting_from_state(cls, state):
+        loaded.append(state)
+        return from_state(cls, state)
+
+    monkeypatch.setattr(AhoCorasick, "from_state", classmethod(counting_from_state))
+
+    row = GazetteerExtractor({"Customer": ["Acme"]}, cache_dir=str(tmp_path)).match_row(
+        {"name": "a", "text": "ACME"}, ["Customer"]
+    )
+
+    assert row["Customer"] == "Acme"
+    assert len(loaded) == 1
+
+
+def test_learned_terms_are_guessed_once_seen_often_enough():
+    learned = LearnedGazetteer(path=None, min_count=2, rebuild_seconds=0)
+    learned.observe({"Customer": ["Acme Corp"]})
+    assert learned.guess("Invoice for Acme Corp.", ["Customer"]) == {"Customer": []}
+
+    learned.observe({"Customer": ["ACME CORP", "Globex"]})
+
+    assert learned.guess("Invoice for acme corp and Globex.", ["Customer", "Total"]) == {
+        "Customer": ["Acme Corp"],
+        "Total": [],
+    }
+    assert learned.stats()["fields"]["Customer"] == {"terms": 1, "candidates": 2, "observations": 2}
+
+
+def test_learned_terms_survive_a_restart(tmp_path):
+    path = str(tmp_path / "learned.json")
+    learned = LearnedGazetteer(path=path, min_count=1, rebuild_seconds=0)
+    learned.observe({"Customer": ["Acme Corp"]})
+    learned.save()
+
+    restored = LearnedGazetteer(path=path, min_count=1, rebuild_seconds=0)
+
+    assert restored.guess("Signed by Acme Corp.", ["Customer"]) == {"Customer": ["Acme Corp"]}
+
+
+def test_model_extractions_feed_the_learned_gazetteer(workdir):
+    learned = LearnedGazetteer(path=None, min_count=1, rebuild_seconds=0)
+    adapter = make_adapter(FakeLangExtract([("Customer", "Acme Corp")]), learned=learned)
+
+    adapter.extract([{"name": "a.txt", "text": "Acme Corp paid."}], ["Customer"], "key")
+
+    assert learned.guess("Later, Acme Corp paid again.", ["Customer"]) == {"Customer": ["Acme Corp"]}
@@ -0,0 +1,37 @@
+import pytest
+
+from extractor import ExtractionPipelineError
+from fakes import FakeLangExtract, make_adapter
+
+FACTS = [("Person", "Alice"), ("Org", "Acme"), ("Location", "Paris")]
+DOCUMENTS = [
+    {"name": "a.txt", "text": "Alice joined Acme in Paris."},
+    {"name": "b.txt", "text": "Acme opened an office."},
+]
+
+
+def test_added_fields_are_the_only_ones_prompted_and_are_merged(workdir):
+    lx = FakeLangExtract(FACTS)
+    adapter = make_adapter(lx)
+    prior = adapter.extract(DOCUMENTS, ["Person", "Org"], "key").records
+    lx.calls.clear()
+    streamed = {}
+
+    result = adapter.extract_added_fields(
+        DOCUMENTS, prior, ["Location"], "key", on_document=lambda index, outcome: streamed.update({index: outcome.row})
+    )
+
+    assert {field for _text, fields, _options in lx.calls for field in fields} == {"Location"}
+    assert result.records == [
+        {"document": "a.txt", "Person": "Alice", "Org": "Acme", "Location": "Paris"},
+        {"document": "b.txt", "Person": "", "Org": "Acme", "Location": ""},
+    ]
+    assert streamed[0] == result.records[0]
+    assert result.logs[0].startswith("Incremental run: extracting 1 added field(s) into 2 existing record(s).")
+
+
+def test_prior_records_must_match_the_documents(workdir):
+    adapter = make_adapter(FakeLangExtract(FACTS))
+
+    with pytest.raises(ExtractionPipelineError):
+        adapter.extract_added_fields(DOCUMENTS, [{"document": "a.txt"}], ["Location"], "key")
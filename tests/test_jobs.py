@@ -0,0 +1,107 @@
+from extractor import DocumentOutcome, ExtractionResult
+from jobs import JobRunner, JobStore
+
+DOCUMENTS = [{"name": f"doc{index}.txt", "text": f"Alice wrote report {index}."} for index in range(3)]
+
+
+def run_job(job):
+    def work(job):
+        for index, doc in enumerate(job.documents):
+            job.record_document_start(index)
+            job.record_document(index, DocumentOutcome(row={"document": doc["name"], "Person": "Alice"}, logs=[]))
+        records = [{"document": doc["name"], "Person": "Alice"} for doc in job.documents]
+        return ExtractionResult(records=records, logs=["done"], engine="test", timings=[])
+
+    return JobRunner().run(job, work)
+
+
+def test_stored_events_do_not_copy_records():
+    job = JobStore().create(DOCUMENTS, ["Person"])
+    run_job(job)
+
+    assert [event["event"] for event in job.events] == ["running"] + ["started", "finished"] * 3 + ["completed"]
+    assert all("record" not in event["data"] and "records" not in event["data"] for event in job.events)
+
+
+def test_read_events_carry_their_records():
+    job = JobStore().create(DOCUMENTS, ["Person"])
+    run_job(job)
+
+    events, done = job.wait_events(0, timeout=0)
+
+    assert done
+    finished = [event["data"] for event in events if event["event"] == "finished"]
+    assert [data["record"]["document"] for data in finished] == ["doc0.txt", "doc1.txt", "doc2.txt"]
+    assert events[-1]["data"]["records"] == job.records
+    assert events[-1]["data"]["fields"] == ["document", "Person"]
+
+
+def test_snapshot_reports_partial_then_final_records():
+    job = JobStore().create(DOCUMENTS, ["Person"])
+    job.record_document(1, DocumentOutcome(row={"document": "doc1.txt", "Person": "Alice"}, logs=[]))
+
+    partial = job.snapshot()
+    run_job(job)
+
+    assert partial["completed"] == 1 and [row["document"] for row in partial["records"]] == ["doc1.txt"]
+    assert job.snapshot()["status"] == "completed" and len(job.snapshot()["records"]) == 3
+
+
+def test_submitted_jobs_run_in_the_background():
+    store = JobStore()
+    job = store.create(DOCUMENTS, ["Person"])
+
+    JobRunner().submit(job, lambda job: ExtractionResult(records=[{"document": "x"}], logs=[], engine="test"))
+    _events, done = job.wait_events(0, timeout=5)
+    while not done:
+        _events, done = job.wait_events(len(job.events), timeout=5)
+
+    assert store.get(job.job_id) is job
+    assert job.snapshot()["status"] == "completed"
+
+
+def test_failed_work_is_recorded_on_the_job():
+    job = JobStore().create(DOCUMENTS, ["Person"])
+
+    def fail(job):
+        raise RuntimeError("boom")
+
+    JobRunner().submit(job, fail)
+    while not job.done:
+        job.wait_events(len(job.events), timeout=5)
+
+    assert job.status == "failed" and job.error == "boom"
+
+
+class Upload(dict):
+    def __init__(self, name, size):
+        super().__init__(name=name, text="")
+        self.size = size
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_store_evicts_oldest_finished_jobs_and_closes_their_documents():
+    store = JobStore(max_jobs=2, max_document_bytes=1000)
+    running = store.create([Upload("a", 400)], ["Person"])
+    finished = [store.create([Upload(name, 400)], ["Person"]) for name in ("b", "c")]
+    for job in finished:
+        run_job(job)
+
+    newest = store.create([Upload("d", 100)], ["Person"])
+
+    assert store.get(running.job_id) is running
+    assert store.get(finished[0].job_id) is None and finished[0].documents[0].closed
+    assert store.get(finished[1].job_id) is None and finished[1].documents[0].closed
+    assert store.get(newest.job_id) is newest and not running.documents[0].closed
+
+
+def test_expired_finished_jobs_are_purged():
+    store = JobStore(ttl_seconds=0)
+    job = store.create([Upload("a", 10)], ["Person"])
+    run_job(job)
+
+    assert store.get(job.job_id) is None
+    assert job.documents[0].closed
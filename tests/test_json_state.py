@@ -0,0 +1,26 @@
+import json
+import threading
+
+from json_state import load_state, write_atomic
+
+
+def test_concurrent_writers_never_leave_a_partial_or_stray_file(tmp_path):
+    path = tmp_path / "state.json"
+    errors = []
+
+    def writer(number):
+        try:
+            for _ in range(50):
+                write_atomic(str(path), json.dumps({"version": 1, "writer": number, "pad": "x" * 20000}))
+        except OSError as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=writer, args=(number,)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert load_state(str(path), version=1)["writer"] in range(8)
+    assert [entry.name for entry in tmp_path.iterdir()] == ["state.json"]
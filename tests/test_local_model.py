@@ -0,0 +1,64 @@
+import random
+
+from extraction_cache import ExtractionCache
+from local_model import LocalModelExtractor, LocalTagger, latest_artifact, train
+
+VENDORS = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises", "Hooli"]
+PEOPLE = ["Alice Brown", "Bob Smith", "Carol White", "Dan Green", "Eve Black", "Frank Moore"]
+
+
+def invoice(vendor, person, number):
+    return (
+        f"Invoice {number} issued by {vendor} to {person}. Please remit payment to {vendor} "
+        f"within 30 days. Contact {person} with questions."
+    )
+
+
+def filled_cache(tmp_path, count=120):
+    rng = random.Random(1)
+    cache = ExtractionCache(path=str(tmp_path / "extractions.sqlite3"), store_text=True)
+    for index in range(count):
+        vendor, person = rng.choice(VENDORS), rng.choice(PEOPLE)
+        cache.set(
+            f"key-{index}",
+            {
+                "fields": ["vendor", "customer"],
+                "extractions": [["Vendor", vendor], ["Customer", person]],
+                "text": invoice(vendor, person, 1000 + index),
+            },
+        )
+    return cache
+
+
+def test_train_then_predict_round_trip(tmp_path):
+    path = train(filled_cache(tmp_path), str(tmp_path / "models"), epochs=5)
+
+    assert latest_artifact(str(tmp_path / "models")) == path
+    tagger = LocalTagger.load(path)
+    assert tagger.knows("Vendor") and tagger.knows("customer")
+    for field in ("vendor", "customer"):
+        assert tagger.evaluation(field)["precision"] >= 0.95
+
+    predicted = tagger.predict(invoice("Hooli", "Frank Moore", 5), ["Vendor", "Customer"])
+    assert [value for value, _ in predicted["Vendor"]] == ["Hooli"]
+    assert [value for value, _ in predicted["Customer"]] == ["Frank Moore"]
+
+
+def test_extractor_falls_back_to_recognizers_for_unknown_fields(tmp_path):
+    model = LocalModelExtractor(LocalTagger.load(train(filled_cache(tmp_path), str(tmp_path / "models"))))
+    text = invoice("Globex", "Bob Smith", 7) + " Reply to billing@globex.com."
+
+    result = model.extract([{"name": "a.txt", "text": text}], ["Vendor", "Email"])
+
+    assert result.engine == "local-tagger"
+    assert result.records[0] == {"document": "a.txt", "Vendor": "Globex", "Email": "billing@globex.com"}
+
+
+def test_train_requires_enough_examples(tmp_path):
+    cache = filled_cache(tmp_path, count=3)
+    try:
+        train(cache, str(tmp_path / "models"), min_examples=20)
+    except ValueError as err:
+        assert "need 20" in str(err)
+    else:
+        raise AssertionError("training on 3 documents should fail")
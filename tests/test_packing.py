@@ -0,0 +1,57 @@
+import math
+
+from fakes import FakeLangExtract, make_adapter
+
+FACTS = [("Person", "Alice"), ("Person", "Bob"), ("City", "Paris")]
+
+
+def snippets(sizes):
+    return [{"name": f"doc{index}.txt", "text": ("Note. " + "x " * size)[:size]} for index, size in enumerate(sizes)]
+
+
+def test_each_bundle_is_a_single_model_request(workdir):
+    lx = FakeLangExtract([])
+    adapter = make_adapter(lx, pack_max_document_chars=1000, pack_bundle_chars=4000)
+    result = adapter.extract(snippets([200, 500, 800] * 67), ["Person"], "key")
+
+    assert 1 < len(lx.calls) < 200
+    for text, _fields, options in lx.calls:
+        assert len(text) <= 4000
+        assert math.ceil(len(text) / options["max_char_buffer"]) == 1
+    assert any("shared model call(s)" in entry for entry in result.logs)
+
+
+def test_aligned_extractions_map_back_to_their_document(workdir):
+    lx = FakeLangExtract(FACTS)
+    adapter = make_adapter(lx)
+    documents = [
+        {"name": "a.txt", "text": "Alice flew to Paris."},
+        {"name": "b.txt", "text": "Bob stayed home."},
+        {"name": "c.txt", "text": "Alice met Bob."},
+    ]
+
+    result = adapter.extract(documents, ["Person", "City"], "key")
+
+    assert len(lx.calls) == 1
+    assert [(row["Person"], row["City"]) for row in result.records] == [
+        ("Alice", "Paris"),
+        ("Bob", ""),
+        ("Alice; Bob", ""),
+    ]
+
+
+def test_ambiguous_unaligned_extractions_rerun_documents_unpacked(workdir):
+    lx = FakeLangExtract(FACTS, aligned=False)
+    adapter = make_adapter(lx)
+    documents = [
+        {"name": "a.txt", "text": "Alice flew to Paris."},
+        {"name": "b.txt", "text": "Nobody here knows Alice."},
+        {"name": "c.txt", "text": "Carol stayed in Rome."},
+    ]
+
+    result = adapter.extract(documents, ["Person", "City"], "key")
+
+    assert [row["City"] for row in result.records] == ["Paris", "", ""]
+    assert [row["Person"] for row in result.records] == ["Alice", "Alice", ""]
+    rerun = sorted(text for text, _fields, _options in lx.calls[1:])
+    assert rerun == ["Alice flew to Paris.", "Nobody here knows Alice."]
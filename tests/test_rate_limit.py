@@ -0,0 +1,199 @@
+import threading
+import time
+
+from rate_limit import AimdController, GeminiGovernor
+
+
+class ThrottledError(RuntimeError):
+    code = 429
+
+
+class FakeModelServer:
+    """Answers after ``latency`` seconds and rejects calls with a 429 above ``capacity`` concurrent ones.
+
+    ``curve(excess)`` is the rejection probability for ``excess`` calls over capacity; the default
+    rejects every call over it. Rejections are deterministic (every n-th call) so the test is stable.
+    """
+
+    def __init__(self, capacity, latency=0.004, curve=None):
+        self.capacity = capacity
+        self.latency = latency
+        self.curve = curve or (lambda excess: 1.0 if excess > 0 else 0.0)
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.throttled = 0
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, parallel=1):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += parallel
+            self.peak = max(self.peak, self.in_flight)
+            self._credit += self.curve(self.in_flight - self.capacity)
+            reject = self._credit >= 1.0
+            if reject:
+                self._credit -= 1.0
+                self.throttled += 1
+        try:
+            time.sleep(self.latency)
+            if reject:
+                raise ThrottledError("429 RESOURCE_EXHAUSTED")
+        finally:
+            with self._lock:
+                self.in_flight -= parallel
+
+
+def simulate(server, governor, clients=24, seconds=1.5):
+    deadline = time.monotonic() + seconds
+    limits = []
+
+    def client():
+        while time.monotonic() < deadline:
+            try:
+                with governor.slot("sim") as granted:
+                    server.call(granted)
+            except ThrottledError:
+                pass
+            limits.append((time.monotonic(), governor.concurrency_limit))
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return limits
+
+
+def settled(limits):
+    """Limits observed in the second half of the run."""
+    midpoint = limits[len(limits) // 2][0]
+    return [limit for at, limit in limits if at >= midpoint]
+
+
+def make_governor(initial=12, maximum=16):
+    controller = AimdController(initial=initial, maximum=maximum, cooldown_seconds=0.05)
+    return GeminiGovernor(requests_per_minute=0, tokens_per_minute=0, max_concurrency=maximum, controller=controller)
+
+
+def test_window_shrinks_on_429_and_converges_to_capacity():
+    server = FakeModelServer(capacity=6)
+    governor = make_governor(initial=12)
+
+    limits = simulate(server, governor)
+
+    history = governor.controller.stats()["history"]
+    assert server.throttled > 0
+    assert any(entry["reason"].startswith("decrease") for entry in history)
+    tail = settled(limits)
+    # AIMD saw-tooths between half the capacity and a little above it.
+    assert 3 <= sum(tail) / len(tail) <= 7.5
+    assert min(tail) >= 2 and max(tail) <= 10
+
+
+def test_gentle_throttle_curve_settles_higher_than_a_hard_limit():
+    hard = settled(simulate(FakeModelServer(capacity=4), make_governor(initial=4)))
+    gentle_server = FakeModelServer(capacity=4, curve=lambda excess: 0.01 * max(0, excess))
+    gentle = settled(simulate(gentle_server, make_governor(initial=4)))
+
+    assert sum(gentle) / len(gentle) > sum(hard) / len(hard) + 2
+
+
+def test_slot_yields_the_granted_weight():
+    governor = GeminiGovernor(requests_per_minute=0, tokens_per_minute=0, max_concurrency=3)
+
+    with governor.slot("a", weight=8) as granted:
+        assert granted == 3
+        assert governor.stats()["in_flight"] == 3
+    assert governor.stats()["in_flight"] == 0
+
+
+def test_model_call_never_runs_more_workers_than_granted(tmp_path, monkeypatch):
+    from extractor import CallSizing, LangExtractAdapter, RunContext
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EXTRACT_ROUTING", "0")
+    calls = []
+
+    class FakeLangExtract:
+        @staticmethod
+        def extract(text, **options):
+            calls.append(options)
+            return []
+
+    governor = GeminiGovernor(requests_per_minute=0, tokens_per_minute=0, max_concurrency=16)
+    governor.controller = AimdController(initial=2, maximum=16)
+    adapter = LangExtractAdapter(governor=governor)
+    adapter._langextract = FakeLangExtract()
+    adapter.sizing_policy.choose = lambda length, overrides=None: CallSizing(
+        max_char_buffer=1000, max_workers=8, batch_length=8
+    )
+
+    adapter._call_model("x" * 8000, "prompt", RunContext(fields=["A"], prompt_description="prompt", api_key="k"))
+
+    assert calls[0]["max_workers"] == 2 and calls[0]["batch_length"] == 2
+
+
+def test_rate_limits_are_retried_without_opening_the_breaker(tmp_path, monkeypatch):
+    from extractor import LangExtractAdapter, RunContext
+    from resilience import RetryPolicy
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EXTRACT_ROUTING", "0")
+    responses = [ThrottledError("429 RESOURCE_EXHAUSTED")] * 3 + [[]]
+
+    class FakeLangExtract:
+        @staticmethod
+        def extract(text, **options):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+    governor = GeminiGovernor(requests_per_minute=0, tokens_per_minute=0)
+    adapter = LangExtractAdapter(
+        model_id="rate-limited-model",
+        governor=governor,
+        retry_policy=RetryPolicy(max_attempts=4, base_delay=0.0),
+    )
+    adapter.breaker.failure_threshold = 2
+    adapter._langextract = FakeLangExtract()
+
+    adapter._call_model("text", "prompt", RunContext(fields=["A"], prompt_description="prompt", api_key="k"))
+
+    assert responses == []
+    assert adapter.breaker.stats()["state"] == "closed"
+    assert adapter.breaker.stats()["trips"] == 0
+
+
+def test_sizing_latency_excludes_the_governor_wait(tmp_path, monkeypatch):
+    from extractor import LangExtractAdapter, RunContext
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EXTRACT_ROUTING", "0")
+
+    class FakeLangExtract:
+        @staticmethod
+        def extract(text, **options):
+            return []
+
+    governor = GeminiGovernor(requests_per_minute=0, tokens_per_minute=0, max_concurrency=1)
+    adapter = LangExtractAdapter(model_id="queued-model", governor=governor)
+    adapter._langextract = FakeLangExtract()
+    holder_admitted = threading.Event()
+
+    def hold_the_only_slot():
+        with governor.slot("other"):
+            holder_admitted.set()
+            time.sleep(0.3)
+
+    holder = threading.Thread(target=hold_the_only_slot)
+    holder.start()
+    holder_admitted.wait()
+    started = time.perf_counter()
+    adapter._call_model("text", "prompt", RunContext(fields=["A"], prompt_description="prompt", api_key="k"))
+    holder.join()
+
+    assert time.perf_counter() - started >= 0.25
+    assert adapter.sizing_policy.stats()["chunk_seconds_ewma"] < 0.1
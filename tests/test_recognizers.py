@@ -0,0 +1,83 @@
+import pytest
+
+from extractor import RegexFallbackExtractor
+from recognizers import CombinedScanner, recognizer_for
+
+
+@pytest.mark.parametrize(
+    "field, kind",
+    [
+        ("Amount Due", "money"),
+        ("Total Due", "money"),
+        ("Balance Due", "money"),
+        ("Issued By", "name"),
+        ("Billed To", "name"),
+        ("Invoice Date", "date"),
+        ("Due Date", "date"),
+        ("Payment Date", "date"),
+        ("Date of Birth", "date"),
+        ("Date Issued", "date"),
+        ("Due", "date"),
+        ("Company Website", "url"),
+        ("Contact Email", "email"),
+        ("Contact Number", "phone"),
+        ("Interest Rate", "percent"),
+        ("Share Price", "money"),
+        ("Customer Name", "name"),
+        ("Counterparty", "name"),
+    ],
+)
+def test_fields_map_to_the_recognizer_of_their_head_noun(field, kind):
+    assert recognizer_for(field) == kind
+
+
+def test_one_combined_scan_fills_typed_fields():
+    doc = {
+        "name": "invoice.txt",
+        "text": "Invoice from Acme Corp dated March 3, 2024. Total due: $1,250.00 by 2024-04-02. "
+        "Questions: billing@acme.com or +1 555 010 7788.",
+    }
+    fields = ["Invoice Date", "Amount Due", "Due Date", "Email", "Phone"]
+
+    row = RegexFallbackExtractor(processes=0).extract([doc], fields).records[0]
+
+    assert row == {
+        "document": "invoice.txt",
+        "Invoice Date": "March 3, 2024",
+        "Amount Due": "$1,250.00",
+        "Due Date": "2024-04-02",
+        "Email": "billing@acme.com",
+        "Phone": "+1 555 010 7788",
+    }
+
+
+
+class CountingPattern:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.consumed = 0
+
+    def finditer(self, text):
+        for match in self.pattern.finditer(text):
+            self.consumed += 1
+            yield match
+
+
+def test_scan_stops_once_enough_unique_entities_are_found():
+    scanner = CombinedScanner(("name",))
+    scanner.pattern = counting = CountingPattern(scanner.pattern)
+    text = "Ann Lee met Bob Ray. " * 1000
+
+    assert scanner.scan(text, {"name": 2}) == {"name": ["Ann Lee", "Bob Ray"]}
+    assert counting.consumed == 2
+
+    assert scanner.scan(text, {"name": None}) == {"name": ["Ann Lee", "Bob Ray"]}
+    assert counting.consumed == 2 + 2000
+
+
+def test_entities_honours_the_limit():
+    doc = {"name": "a.txt", "text": "Ann Lee met Bob Ray and Cy Young."}
+    extractor = RegexFallbackExtractor(processes=0)
+
+    assert extractor.entities(doc, limit=1) == ["Ann Lee"]
+    assert extractor.entities(doc) == ["Ann Lee", "Bob Ray", "Cy Young"]
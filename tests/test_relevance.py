@@ -0,0 +1,87 @@
+from extraction_cache import ExtractionCache
+from fakes import FakeLangExtract, make_adapter
+from relevance import RelevanceFilter
+
+FILLER = "The company continued to operate under the terms described in prior periods. "
+BOILERPLATE = (
+    "Pursuant to the Credit Agreement, the Borrower and the Administrative Agent acknowledge that "
+    "the Lenders under Section Four of the Security Agreement retain all rights. "
+)
+RELEVANT = "The agreement with Acme Holdings was signed on March 3, 2024 for $12,400.00 (billing@acme.com)."
+FIELDS = ["Counterparty", "Signing Date", "Total Amount", "Email"]
+TYPED_FIELDS = ["Signing Date", "Total Amount", "Email"]
+PEOPLE = "The meeting was chaired by Jonathan Whitaker and minuted by Margaret Olsen of the audit team."
+
+
+def document(paragraph, count=300, relevant_at=(40, 200)):
+    paragraphs = [RELEVANT if index in relevant_at else paragraph * 3 for index in range(count)]
+    return "\n\n".join(paragraphs)
+
+
+def test_keeps_only_relevant_passages_in_order():
+    text = document(FILLER)
+
+    passages = RelevanceFilter().select(text, FIELDS)
+
+    assert passages is not None
+    assert passages.total == 300
+    assert [text[start:end] for start, end in passages.spans] == [RELEVANT, RELEVANT]
+    offset = passages.text.index("billing", len(RELEVANT))
+    assert text[passages.original_offset(offset):].startswith("billing@acme.com")
+
+
+def test_name_density_alone_does_not_qualify_a_passage_for_typed_fields():
+    text = document(BOILERPLATE)
+
+    passages = RelevanceFilter().select(text, TYPED_FIELDS)
+
+    assert passages is not None
+    assert len(passages.spans) == 2
+
+
+def test_name_density_qualifies_passages_for_name_fields():
+    paragraphs = [FILLER * 3] * 300
+    paragraphs[50] = "Total due: $4,100.00."
+    paragraphs[120] = PEOPLE
+    text = "\n\n".join(paragraphs)
+
+    passages = RelevanceFilter().select(text, ["Person", "Total Amount"])
+
+    assert passages is not None
+    assert [text[start:end] for start, end in passages.spans] == ["Total due: $4,100.00.", PEOPLE]
+
+
+def test_short_documents_are_sent_whole():
+    assert RelevanceFilter().select(RELEVANT + "\n\n" + FILLER, FIELDS) is None
+
+
+def test_sends_whole_document_when_nothing_or_nearly_everything_qualifies():
+    assert RelevanceFilter().select(document(FILLER, relevant_at=()), FIELDS) is None
+    assert RelevanceFilter().select(document(FILLER, relevant_at=range(300)), FIELDS) is None
+
+
+def test_long_paragraphs_are_split_at_sentences():
+    text = " ".join(f"Sentence {index} is here." for index in range(1000))
+
+    spans = RelevanceFilter(max_passage_chars=500).split(text)
+
+    assert max(end - start for start, end in spans) <= 500
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+
+
+def test_trimmed_results_do_not_answer_whole_document_requests(workdir):
+    text = document(FILLER)
+    lx = FakeLangExtract([("Total Amount", "$12,400.00"), ("Person", "Jonathan Whitaker")])
+    adapter = make_adapter(lx, cache=ExtractionCache(path=None))
+    doc = {"name": "filing.txt", "text": text + "\n\n" + PEOPLE}
+
+    first = adapter.extract([doc], ["Total Amount"], "key")
+    again = adapter.extract([doc], ["Total Amount"], "key")
+    wider = adapter.extract([doc], ["Total Amount", "Person"], "key")
+
+    assert first.records[0]["Total Amount"] == "$12,400.00"
+    assert again.records == first.records
+    assert len(lx.calls) == 2
+    sent, fields, _ = lx.calls[1]
+    assert fields == ["Total Amount", "Person"] and PEOPLE in sent
+    assert wider.records[0]["Person"] == "Jonathan Whitaker"
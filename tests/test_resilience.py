@@ -0,0 +1,188 @@
+from contextlib import contextmanager
+import socket
+import threading
+import time
+
+import pytest
+
+from rate_limit import error_status, is_rate_limit_error, is_throttle_error
+from resilience import CircuitBreaker, Hedger, RetryPolicy, is_client_error, is_transient_error
+
+
+class ApiError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class Response:
+    status_code = 503
+
+
+class HttpError(Exception):
+    response = Response()
+
+
+@pytest.mark.parametrize(
+    "err",
+    [
+        ValueError("invalid JSON at position 503"),
+        ValueError("Input of 15000 tokens exceeds limit"),
+        KeyError("x1429"),
+        ApiError("bad request", code=400),
+        RuntimeError("Error code: 404 not found"),
+    ],
+)
+def test_numbers_inside_unrelated_messages_are_not_transient(err):
+    assert not is_transient_error(err)
+    assert not is_throttle_error(err)
+
+
+@pytest.mark.parametrize(
+    "err, status",
+    [
+        (RuntimeError("429 RESOURCE_EXHAUSTED. Quota exceeded."), 429),
+        (RuntimeError("Gemini API error: 503 UNAVAILABLE"), 503),
+        (RuntimeError("HTTP 502 Bad Gateway"), 502),
+        (ApiError("boom", code=500), 500),
+        (HttpError("boom"), 503),
+    ],
+)
+def test_status_codes_are_read_from_attributes_and_status_positions(err, status):
+    assert error_status(err) == status
+    assert is_transient_error(err)
+
+
+class ConnectError(Exception):
+    """Named like httpx's connection error, which does not derive from OSError."""
+
+
+class LibraryError(Exception):
+    """A client library's own exception type wrapping the transport error."""
+
+
+def wrapped(cause):
+    try:
+        raise cause
+    except Exception as err:
+        try:
+            raise LibraryError("request failed") from err
+        except LibraryError as outer:
+            return outer
+
+
+@pytest.mark.parametrize(
+    "err",
+    [
+        OSError(113, "No route to host"),
+        socket.gaierror(-2, "Name or service not known"),
+        ConnectError("All connection attempts failed"),
+        RuntimeError("[Errno 101] Network is unreachable"),
+        RuntimeError("Server disconnected without sending a response."),
+        wrapped(ConnectionResetError("peer reset")),
+    ],
+)
+def test_network_failures_are_transient(err):
+    assert is_transient_error(err)
+    assert not is_client_error(err)
+
+
+def test_only_definite_client_errors_count_as_answered():
+    assert is_client_error(ApiError("bad request", code=400))
+    assert is_client_error(ApiError("denied", code="PERMISSION_DENIED"))
+    assert not is_client_error(ApiError("busy", code=429))
+    assert not is_client_error(ValueError("could not parse the model output"))
+
+
+def test_outage_trips_the_breaker(workdir):
+    from extractor import RunContext
+    from fakes import make_adapter
+
+    class Unreachable:
+        @staticmethod
+        def extract(text, **options):
+            raise ConnectError("All connection attempts failed")
+
+    adapter = make_adapter(Unreachable(), model_id="unreachable-model", retry_policy=RetryPolicy(max_attempts=1))
+    adapter.breaker.failure_threshold = 2
+    run = RunContext(fields=["A"], prompt_description="prompt", api_key="k")
+
+    for _ in range(2):
+        with pytest.raises(ConnectError):
+            adapter._call_model("text", "prompt", run)
+
+    assert adapter.breaker.stats()["state"] == "open"
+
+
+def test_rate_limits_are_throttles_but_outages_are_not_rate_limits():
+    assert is_rate_limit_error(ApiError("boom", code=429))
+    assert is_rate_limit_error(RuntimeError("You exceeded your current quota"))
+    assert is_throttle_error(RuntimeError("The read operation timed out"))
+    assert not is_rate_limit_error(RuntimeError("Gemini API error: 503 UNAVAILABLE"))
+    assert is_throttle_error(RuntimeError("Gemini API error: 503 UNAVAILABLE"))
+
+
+def test_rate_limited_probe_does_not_wedge_a_half_open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.0)
+    breaker.record_failure()
+
+    assert breaker.allow()
+    breaker.record_rate_limited()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.stats()["state"] == "closed"
+
+
+def warmed_hedger(seconds=0.01, percentile=50.0, budget=1.0):
+    hedger = Hedger(percentile=percentile, budget=budget)
+    for _ in range(50):
+        hedger.histogram.record(seconds)
+    return hedger
+
+
+def test_hedge_timer_starts_after_admission():
+    hedger = warmed_hedger()
+
+    @contextmanager
+    def queued_admission():
+        time.sleep(0.2)
+        yield 1
+
+    assert hedger.run(lambda granted: "primary", admit=queued_admission) == "primary"
+    assert hedger.stats()["hedges"] == 0
+    assert hedger.histogram.percentile(99) < 0.1
+
+
+def test_hedge_wins_over_a_slow_primary():
+    hedger = warmed_hedger()
+    calls = []
+
+    def call(granted):
+        calls.append(granted)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    started = time.perf_counter()
+    assert hedger.run(call) == "hedge"
+    assert time.perf_counter() - started < 0.3
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_hedging_has_no_hidden_concurrency_cap():
+    hedger = warmed_hedger(seconds=1.0)
+    results = []
+
+    def client():
+        results.append(hedger.run(lambda granted: time.sleep(0.2) or granted))
+
+    threads = [threading.Thread(target=client) for _ in range(64)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 64
+    assert time.perf_counter() - started < 0.35
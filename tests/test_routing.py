@@ -0,0 +1,65 @@
+from routing import ConfidenceRouter, RouteDecision
+
+TEXT = "Questions go to billing@acme.com before Friday."
+
+
+def make_router(**options):
+    settings = {"threshold": 0.9, "min_observations": 5, "audit_rate": 0.0, "path": None}
+    settings.update(options)
+    return ConfidenceRouter(**settings)
+
+
+def regex_decision(value="billing@acme.com"):
+    return RouteDecision(candidates={"Email": {"regex": [value]}})
+
+
+def test_no_confidence_before_min_observations():
+    router = make_router()
+    for _ in range(4):
+        router.observe(regex_decision(), {"Email": ["billing@acme.com"]}, 0.1)
+
+    assert router.agreement("Email", "regex") == 0.0
+    assert router.route(TEXT, ["Email"]).local == {}
+
+
+def test_routes_locally_once_agreement_reaches_threshold():
+    router = make_router()
+    for _ in range(5):
+        router.observe(regex_decision(), {"Email": ["BILLING@acme.com"]}, 0.1)
+
+    decision = router.route(TEXT, ["Email", "Customer"])
+
+    assert router.agreement("Email", "regex") == 1.0
+    assert decision.local == {"Email": ["billing@acme.com"]}
+    assert decision.sources == {"Email": "regex"}
+    assert router.stats()["documents"]["partial"] == 1
+
+
+def test_disagreement_keeps_field_on_the_model():
+    router = make_router()
+    for index in range(20):
+        returned = "billing@acme.com" if index % 5 else "orders@acme.com"
+        router.observe(regex_decision(), {"Email": [returned]}, 0.1)
+
+    assert 0.75 < router.agreement("Email", "regex") < 0.9
+    assert router.route(TEXT, ["Email"]).local == {}
+
+
+def test_audit_sends_confident_documents_to_the_model():
+    router = make_router(audit_rate=1.0)
+    for _ in range(5):
+        router.observe(regex_decision(), {"Email": ["billing@acme.com"]}, 0.1)
+
+    decision = router.route(TEXT, ["Email"])
+
+    assert decision.audited and decision.local == {}
+
+
+def test_agreement_survives_a_restart(tmp_path):
+    path = str(tmp_path / "router.json")
+    router = make_router(path=path)
+    for _ in range(5):
+        router.observe(regex_decision(), {"Email": ["billing@acme.com"]}, 0.1)
+    router.save()
+
+    assert make_router(path=path).agreement("Email", "regex") == 1.0
@@ -0,0 +1,27 @@
+from extractor import CallSizing, SizingPolicy
+
+
+def test_tiny_documents_get_a_single_worker():
+    assert SizingPolicy().choose(300) == CallSizing(max_char_buffer=1000, max_workers=1, batch_length=1)
+
+
+def test_large_documents_fan_out_up_to_the_caps():
+    sizing = SizingPolicy(max_workers_cap=16, batch_length_cap=16).choose(3_000_000)
+
+    assert sizing.max_char_buffer == 1000
+    assert sizing.max_workers == 16 and sizing.batch_length == 16
+
+
+def test_observed_latency_narrows_the_fan_out():
+    policy = SizingPolicy(target_document_seconds=20.0)
+    policy.observe(10_000, CallSizing(max_char_buffer=1000, max_workers=10, batch_length=10), seconds=1.0)
+
+    assert policy.choose(40_000).max_workers == 2
+
+
+def test_overrides_are_clamped_to_the_server_caps():
+    policy = SizingPolicy(max_char_buffer_cap=4000, max_workers_cap=8, batch_length_cap=8)
+
+    sizing = policy.choose(100_000, {"max_char_buffer": 50_000, "max_workers": 64, "batch_length": 64})
+
+    assert sizing == CallSizing(max_char_buffer=4000, max_workers=8, batch_length=8)
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from extractor import ExtractionPipelineError, RegexFallbackExtractor
+from fakes import FakeLangExtract, make_adapter
+
+
+class SlowFirst(FakeLangExtract):
+    """Answers the first document last, so records finish out of order."""
+
+    def extract(self, text, prompt_description="", **options):
+        if text.startswith("Doc 0 "):
+            threading.Event().wait(0.2)
+        return super().extract(text, prompt_description, **options)
+
+
+def numbered(count, pulled):
+    for index in range(count):
+        pulled.append(index)
+        yield {"name": f"doc{index}.txt", "text": f"Doc {index} was written by Alice."}
+
+
+def test_records_stream_in_input_order(workdir):
+    adapter = make_adapter(SlowFirst([("Person", "Alice")]), max_concurrent_documents=4)
+
+    records = [record for record, _logs in adapter.extract_iter(numbered(6, []), ["Person"], "key")]
+
+    assert [record["document"] for record in records] == [f"doc{index}.txt" for index in range(6)]
+    assert all(record["Person"] == "Alice" for record in records)
+
+
+def test_documents_are_pulled_through_a_bounded_window(workdir, monkeypatch):
+    monkeypatch.setenv("EXTRACT_STREAM_WINDOW", "3")
+    adapter = make_adapter(FakeLangExtract([("Person", "Alice")]), max_concurrent_documents=2)
+    pulled = []
+
+    stream = adapter.extract_iter(numbered(100, pulled), ["Person"], "key")
+    first, _logs = next(stream)
+
+    assert first["document"] == "doc0.txt"
+    assert len(pulled) == 3
+    stream.close()
+
+
+def test_regex_fallback_streams_any_iterable():
+    pulled = []
+    stream = RegexFallbackExtractor(processes=0).extract_iter(numbered(1000, pulled), ["Person"])
+
+    record, _logs = next(stream)
+
+    assert record["document"] == "doc0.txt"
+    assert len(pulled) < 1000
+    stream.close()
+
+
+def test_empty_inputs_are_rejected(workdir):
+    adapter = make_adapter(FakeLangExtract([]))
+
+    with pytest.raises(ExtractionPipelineError):
+        list(adapter.extract_iter(iter([]), ["Person"], "key"))
+    with pytest.raises(ExtractionPipelineError):
+        list(adapter.extract_iter(numbered(1, []), [], "key"))